@@ -1,16 +1,17 @@
 """
 Agent module for Audit Bot AI.
-Contains base agent class and specialized agent implementations.
+Contains base agent class and the agent registry; specialized agent
+implementations are imported by the registry when first used.
 """
 
+from agents.agent_spec import AgentSpec
 from agents.base_agent import BaseAgent
-from agents.license_agent import LicenseReportAgent
-from agents.sod_risk_agent import SODRiskReportAgent
-from agents.user_agent import UserReportAgent
+from agents.registry import AgentRegistry, get_agent_registry, get_available_agents
 
 __all__ = [
+    "AgentRegistry",
+    "AgentSpec",
     "BaseAgent",
-    "LicenseReportAgent",
-    "SODRiskReportAgent",
-    "UserReportAgent",
+    "get_agent_registry",
+    "get_available_agents",
 ]
@@ -0,0 +1,71 @@
+"""
+Lightweight agent metadata, known before any agent module is imported.
+"""
+
+import importlib
+from typing import Any, Dict, List, Optional
+
+
+class AgentSpec:
+    """
+    What the UI and the API need to list an agent, plus where its class
+    lives. The class is only imported when the agent is first used.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        icon: str,
+        description: str,
+        placeholder: str,
+        suggested_messages: List[str],
+        factory: str,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize the spec.
+
+        Args:
+            name: Display name; also the agent's key everywhere
+            icon: Emoji icon representing the agent
+            description: Short description shown in the UI header
+            placeholder: Placeholder text for the chat input field
+            suggested_messages: Suggested questions shown in the sidebar
+            factory: "module:attribute" of the agent class (or factory function)
+            options: Keyword arguments passed to the factory after the spec
+        """
+        self.name = name
+        self.icon = icon
+        self.description = description
+        self.placeholder = placeholder
+        self.suggested_messages = list(suggested_messages)
+        self.factory = factory
+        self.options = dict(options or {})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentSpec":
+        """Build a spec from a catalogue entry."""
+        return cls(
+            name=data["name"],
+            icon=data.get("icon", "🤖"),
+            description=data.get("description", ""),
+            placeholder=data.get("placeholder", "Ask a question..."),
+            suggested_messages=data.get("suggested_messages", []),
+            factory=data["factory"],
+            options=data.get("options"),
+        )
+
+    def load_factory(self) -> Any:
+        """Import the agent's module and return its class."""
+        module_name, _, attribute = self.factory.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def to_dict(self) -> dict:
+        """Agent metadata for session state and the API."""
+        return {
+            "name": self.name,
+            "icon": self.icon,
+            "description": self.description,
+            "placeholder": self.placeholder,
+            "suggested_messages": self.suggested_messages,
+        }
@@ -5,55 +5,90 @@ Base Agent class that defines the interface for all SAP report agents.
 from abc import ABC, abstractmethod
 from typing import List
 
+from langchain_core.tools import BaseTool
+
+from agents.agent_spec import AgentSpec
+
 
 class BaseAgent(ABC):
     """
     Abstract base class for all SAP report agents.
-    Each agent must implement the abstract methods to provide
-    agent-specific configuration and data.
+    Display metadata comes from the agent's spec in the agent catalogue;
+    each agent implements the abstract methods to provide its data.
     """
 
+    def __init__(self, spec: AgentSpec):
+        """
+        Initialize the agent.
+
+        Args:
+            spec: The agent's catalogue metadata
+        """
+        self.spec = spec
+
     @property
-    @abstractmethod
     def name(self) -> str:
         """Display name of the agent shown in the UI."""
-        pass
+        return self.spec.name
 
     @property
-    @abstractmethod
     def icon(self) -> str:
         """Emoji icon representing the agent."""
-        pass
+        return self.spec.icon
 
     @property
-    @abstractmethod
     def description(self) -> str:
         """Short description shown in the UI header."""
-        pass
+        return self.spec.description
 
     @property
-    @abstractmethod
     def placeholder(self) -> str:
         """Placeholder text for the chat input field."""
-        pass
+        return self.spec.placeholder
 
     @property
-    @abstractmethod
     def suggested_messages(self) -> List[str]:
         """List of suggested questions shown in the sidebar."""
-        pass
+        return self.spec.suggested_messages
 
     @property
     @abstractmethod
     def data_context(self) -> str:
-        """The data context embedded in the system prompt."""
+        """The data-dependent context embedded at the end of the system prompt."""
         pass
 
+    @property
+    def domain_notes(self) -> str:
+        """
+        Static guidance about the report (column meanings, code mappings).
+        Part of the cacheable prompt prefix, so it must not depend on the data.
+        Override in subclass.
+        """
+        return ""
+
     @property
     def uses_pandas_agent(self) -> bool:
         """Whether this agent uses Pandas Agent for queries. Override in subclass."""
         return False
 
+    @property
+    def uses_orchestrator(self) -> bool:
+        """Whether questions are split across other agents and merged. Override in subclass."""
+        return False
+
+    def get_tools(self) -> List[BaseTool]:
+        """
+        Deterministic tools the LLM may call while answering.
+        Override in subclass to expose computations over the agent's data.
+        """
+        return []
+
+    def warm_up(self) -> None:
+        """
+        Build indexes the agent's tools need, so the first question does not
+        pay for them. Called once after the agent is built. Override in subclass.
+        """
+
     @property
     def base_instructions(self) -> str:
         """Common instructions for all agents."""
@@ -69,24 +104,20 @@ INSTRUCTIONS:
     def get_system_prompt(self) -> str:
         """
         Generate the complete system prompt for this agent.
-        Combines the agent-specific context with base instructions.
+        The static part (identity, instructions, domain notes) comes first so it
+        is byte-identical across calls and hits provider-side prompt caching;
+        the data context goes last.
         """
         return f"""
 You are "Audit Bot AI", a specialized chatbot for the brand "Audit Bots" (https://www.auditbots.com/).
 {self.description}
 
+{self.base_instructions}
+{self.domain_notes}
 DATA CONTEXT:
 {self.data_context}
-
-{self.base_instructions}
 """
 
     def to_dict(self) -> dict:
         """Convert agent configuration to dictionary for session state."""
-        return {
-            "name": self.name,
-            "icon": self.icon,
-            "description": self.description,
-            "placeholder": self.placeholder,
-            "suggested_messages": self.suggested_messages,
-        }
+        return self.spec.to_dict()
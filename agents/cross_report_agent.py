@@ -0,0 +1,73 @@
+"""
+Cross-Report Agent implementation.
+"""
+
+from typing import Dict, List
+
+from agents.agent_spec import AgentSpec
+from agents.base_agent import BaseAgent
+from agents.registry import get_agent_registry
+
+
+class CrossReportAgent(BaseAgent):
+    """
+    Agent answering questions that span several SAP reports.
+    The question is split into per-report sub-queries that run concurrently
+    against the report agents; their answers are merged into one response.
+    """
+
+    def __init__(self, spec: AgentSpec, report_agents: List[str]):
+        """
+        Initialize the agent.
+
+        Args:
+            spec: The agent's catalogue metadata
+            report_agents: Names of the single-report agents sub-queries are routed to
+        """
+        super().__init__(spec)
+        specs = get_agent_registry().specs()
+        # Specs only: a report agent is built when a sub-query is routed to it
+        self.report_agents: Dict[str, AgentSpec] = {
+            name: specs[name] for name in report_agents if name in specs
+        }
+
+    def report_agent(self, name: str) -> BaseAgent:
+        """The report agent a sub-query is routed to, built on first use."""
+        return get_agent_registry().get(name)
+
+    @property
+    def uses_orchestrator(self) -> bool:
+        return True
+
+    @property
+    def domain_notes(self) -> str:
+        """How sub-queries are planned and merged."""
+        return """
+PLANNING:
+- Split the user's question into self-contained sub-questions, each answerable by exactly one report agent.
+- Sub-questions run in parallel and cannot see each other's answers, so ask each agent for everything
+  the merge needs (e.g. user ids together with their license types) instead of chaining them.
+- Use one sub-question per agent where possible; skip agents that are not needed.
+- When the answer depends on matching users or license types across reports, ask each agent to show the
+  matching rows as a table that includes the user ids or license types, so the tables can be joined exactly.
+
+MERGING:
+- Combine the sub-answers into one answer to the original question, joining on shared keys such as
+  SAP user ids or license types. When an exact join of the sub-answers' tables is provided, take
+  cross-report figures from it.
+- State clearly when the reports cannot be joined precisely and what assumption you made.
+- Use only figures from the sub-answers. Do not hallucinate numbers.
+"""
+
+    @property
+    def data_context(self) -> str:
+        """The report agents available for sub-queries."""
+        agents = "\n".join(
+            f"- {name}: {agent.description} Example questions: "
+            + "; ".join(agent.suggested_messages)
+            for name, agent in self.report_agents.items()
+        )
+        return f"""
+Report agents available for sub-queries:
+{agents}
+"""
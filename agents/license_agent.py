@@ -2,54 +2,118 @@
 SAP License Report Agent implementation.
 """
 
-from typing import List
+from typing import Dict, List, Optional
+import pandas as pd
+from langchain_core.tools import BaseTool, StructuredTool
+
+from agents.agent_spec import AgentSpec
 from agents.base_agent import BaseAgent
+from services.dataset_registry import REPORT_LICENSES, report_path
+from services.dataset_store import get_dataset_store
+from services.license_calculator import (
+    LICENSE_NAME,
+    LicenseCostCalculator,
+    prepare_license_frame,
+)
+from services.result_store import display_table
+
+
+def load_license_data(file_path: str) -> pd.DataFrame:
+    """Load the License Summary as a typed frame through the dataset store."""
+    return get_dataset_store().load(file_path, transform=prepare_license_frame)
 
 
 class LicenseReportAgent(BaseAgent):
     """
     Agent specialized for SAP License Summary reports.
     Provides insights on license types, costs, and utilization.
+    All figures come from LicenseCostCalculator tools; the LLM only narrates.
     """
 
-    @property
-    def name(self) -> str:
-        return "SAP License Report Agent"
+    # Report type bound to a dataset file in the dataset registry
+    REPORT_TYPE = REPORT_LICENSES
+
+    def __init__(self, spec: AgentSpec):
+        """Initialize the agent; data is loaded on first use."""
+        super().__init__(spec)
+        self._calculator: Optional[LicenseCostCalculator] = None
 
     @property
-    def icon(self) -> str:
-        return "📊"
+    def data_file_path(self) -> str:
+        """Dataset file currently registered for this report."""
+        return report_path(self.REPORT_TYPE)
 
     @property
-    def description(self) -> str:
-        return "Your intelligent assistant for SAP License Summaries."
+    def dataframe(self) -> pd.DataFrame:
+        """The typed license frame, served from the shared dataset store."""
+        return load_license_data(self.data_file_path)
 
     @property
-    def placeholder(self) -> str:
-        return "Ask about your SAP License Summary..."
+    def calculator(self) -> LicenseCostCalculator:
+        """Cost calculator over the current license frame."""
+        licenses = self.dataframe
+        if self._calculator is None or self._calculator.licenses is not licenses:
+            self._calculator = LicenseCostCalculator(licenses)
+        return self._calculator
 
     @property
-    def suggested_messages(self) -> List[str]:
-        return [
-            "How many SAP license types are there?",
-            "How much is the license purchased cost?",
-            "What is the total unused license cost?",
-        ]
+    def domain_notes(self) -> str:
+        """Column semantics and tool guidance for the License Summary."""
+        return """
+Column semantics:
+- Unused License Count = Purchased License - Recommended License Count (when positive)
+- Additional License Count = Recommended License Count - Purchased License (when positive)
+- Net Cost = Recommended License Cost + Multiple Logons Cost
+
+TOOLS:
+Never calculate figures yourself. Call the license tools for every number:
+- `license_totals` for overall or per-subset totals
+- `license_breakdown` for per-type figures and cost shares
+- `license_what_if` for hypothetical purchased counts or right-sizing scenarios
+Narrate the tool results exactly as returned.
+Tables returned by `license_breakdown` and `license_what_if` are already shown to the user: do not re-type them, summarise the key figures instead.
+"""
 
     @property
     def data_context(self) -> str:
         """SAP License Summary data. Currency: USD ($)."""
-        return """
+        types = "\n".join(
+            f"- {code}: {name}"
+            for code, name in self.dataframe[LICENSE_NAME].items()
+        )
+        return f"""
 The following data represents SAP License Summary information for a customer.
 Currency: USD ($).
 
-headers = ['License Type', 'License Description / Name', 'Purchased License', 'License Unit Cost', 'Purchased License Cost', 'Recommended License Count', 'Recommended License Cost', 'Multiple Logons Count', 'Multiple Logons Cost', 'Net Cost', 'Additional License Count', 'Additional License Cost', 'Unused License Count', 'Unused License Cost', 'AI Note']
-
-rows = [
-    ['CA', 'SAP Application Developer', 30, 5000, 150000, 4, 20000, 2, 200, 20200, 0, 0, 26, 130000, 'Record Level'],
-    ['CB', 'SAP Application Professional', 300, 3500, 1050000, 2, 7000, 5, 500, 7500, 0, 0, 298, 1043000, 'Record Level'],
-    ['CC', 'SAP Application Limited Professional', 70, 2000, 140000, 25, 50000, 8, 800, 50800, 0, 0, 45, 90000, 'Record Level'],
-    ['CE', 'SAP Application ESS User', 250, 250, 62500, 290, 72500, 10, 1000, 73500, 40, 10000, 0, 0, 'Record Level'],
-    ['Total', 'NaN', 650, 10750, 1402500, 321, 149500, 25, 2500, 152000, 40, 10000, 369, 1263000, 'Summary Level']
-]
+License types in the report ({len(self.dataframe)}):
+{types}
 """
+
+    def get_tools(self) -> List[BaseTool]:
+        """Expose the cost calculator as LLM tools."""
+        calculator = self.calculator
+
+        def license_totals(license_types: Optional[List[str]] = None) -> str:
+            """Total purchased, recommended, net, additional and unused license counts and costs (USD). Optionally restrict to license type codes such as ['CA', 'CB']."""
+            totals = calculator.totals(license_types)
+            return "\n".join(f"{key}: {value:,}" for key, value in totals.items())
+
+        def license_breakdown(license_types: Optional[List[str]] = None) -> str:
+            """Per license type breakdown of counts, costs (USD) and each type's share of purchased and unused cost. Optionally restrict to license type codes."""
+            breakdown = calculator.breakdown(license_types)
+            table = display_table(breakdown, "License breakdown")
+            return f"{table}\n" + breakdown.to_markdown(intfmt=",")
+
+        def license_what_if(
+            purchased_counts: Optional[Dict[str, int]] = None,
+            right_size_types: Optional[List[str]] = None,
+        ) -> str:
+            """What-if scenario. purchased_counts sets a new purchased count per license type code, e.g. {'CB': 100}. right_size_types drops the purchased count of those types to the recommended count, removing unused licenses. Returns current vs scenario costs (USD) and savings."""
+            scenario = calculator.what_if(purchased_counts, right_size_types)
+            table = display_table(scenario, "What-if scenario")
+            return f"{table}\n" + scenario.to_markdown(intfmt=",")
+
+        return [
+            StructuredTool.from_function(func=func)
+            for func in (license_totals, license_breakdown, license_what_if)
+        ]
@@ -0,0 +1,135 @@
+"""
+Agent registry shared by the Streamlit app and the API server.
+
+Agents are discovered from the agent catalogue (config/agents.json) and from
+the `auditbot.agents` entry point group of installed packages. Listing them
+only reads their specs; an agent's module is imported and the agent built
+and warmed up the first time it is used, then cached for the process.
+"""
+
+import json
+import logging
+import threading
+from importlib.metadata import entry_points
+from typing import Dict, List, Optional
+
+from agents.agent_spec import AgentSpec
+from agents.base_agent import BaseAgent
+from config.settings import Settings
+
+
+logger = logging.getLogger("auditbot.agents")
+
+
+class AgentRegistry:
+    """Specs of every known agent and the agents built so far in this process."""
+
+    def __init__(
+        self,
+        catalog_path: str = Settings.AGENT_CATALOG_PATH,
+        entry_point_group: str = Settings.AGENT_ENTRY_POINT_GROUP,
+    ):
+        """
+        Initialize the registry; discovery happens on first use.
+
+        Args:
+            catalog_path: JSON list of agent specs
+            entry_point_group: Entry point group whose entries load to an
+                AgentSpec or a spec dict
+        """
+        self.catalog_path = catalog_path
+        self.entry_point_group = entry_point_group
+        self._lock = threading.Lock()
+        self._specs: Optional[Dict[str, AgentSpec]] = None
+        self._agents: Dict[str, BaseAgent] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    def _discover(self) -> Dict[str, AgentSpec]:
+        """Read the catalogue, then add specs published by installed plugins."""
+        specs: List[AgentSpec] = []
+        with open(self.catalog_path, encoding="utf-8") as handle:
+            specs += [AgentSpec.from_dict(entry) for entry in json.load(handle)]
+        for entry_point in entry_points(group=self.entry_point_group):
+            try:
+                published = entry_point.load()
+                specs.append(
+                    published if isinstance(published, AgentSpec) else AgentSpec.from_dict(published)
+                )
+            except Exception:
+                # A broken plugin must not take the other agents down
+                logger.exception("Skipping agent plugin %s", entry_point.name)
+        return {spec.name: spec for spec in specs}
+
+    def specs(self) -> Dict[str, AgentSpec]:
+        """
+        Specs of all known agents, discovered once per process.
+
+        Returns:
+            Dictionary mapping agent names to specs, in catalogue order
+        """
+        with self._lock:
+            if self._specs is None:
+                self._specs = self._discover()
+            return self._specs
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs()
+
+    def get(self, name: str) -> BaseAgent:
+        """
+        Return an agent, importing and building it on first use.
+
+        Args:
+            name: Agent name
+
+        Returns:
+            The process-wide agent instance
+
+        Raises:
+            KeyError: If no agent has this name
+        """
+        spec = self.specs()[name]
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is not None:
+                return agent
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+
+        # Per-agent lock so concurrent sessions wait for one build instead of repeating it
+        with build_lock:
+            with self._lock:
+                agent = self._agents.get(name)
+                if agent is not None:
+                    return agent
+            agent = spec.load_factory()(spec, **spec.options)
+            try:
+                agent.warm_up()
+            except Exception:
+                # The indexes are built on first use instead
+                logger.exception("Warm-up of agent %s failed", name)
+            with self._lock:
+                self._agents[name] = agent
+            return agent
+
+
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Return the process-wide agent registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+        return _registry
+
+
+def get_available_agents() -> Dict[str, BaseAgent]:
+    """
+    Build and return every known agent.
+    Only for tools that need all of them (e.g. the dataset server); the app
+    and the API list specs and build agents on demand.
+    """
+    registry = get_agent_registry()
+    return {name: registry.get(name) for name in registry.specs()}
@@ -0,0 +1,222 @@
+"""
+LLM tools over precomputed analytics shared by the SOD Risk and User agents.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from config.settings import Settings
+from services.dataset_registry import REPORT_SOD_RISKS, REPORT_USERS, report_path
+from services.fuzzy_index import get_entity_lookup
+from services.result_store import display_table
+from services.risk_profiles import get_risk_profiles
+from services.risk_scoring import RiskScoringEngine, get_risk_scores
+from services.temporal_index import UserTimeline, get_user_timeline, to_day
+
+
+# Columns of the ranking shown to the LLM, with display names
+RANKING_COLUMNS = {
+    "rank": "Rank",
+    "name": "Name",
+    "user_type": "User Type",
+    "score": "Risk Score",
+    "high_risks": "High Risks",
+    "medium_risks": "Medium Risks",
+    "executed_risks": "Executed Risks",
+    "sensitive_tcode_risks": "Sensitive TCode Risks",
+    "role_count": "Roles",
+    "locked": "Locked",
+    "expired": "Expired",
+}
+
+# Columns of the risk profile tables, with display names
+PROFILE_COLUMNS = {
+    "similarity": "Similarity",
+    "shared_risks": "Shared Risks",
+    "risks": "Risks",
+    "risks_unlike_peers": "Risks Unlike Peers",
+    "risk_weight": "Risk Weight",
+    "outlier_score": "Outlier Score",
+    "peer_group": "Peer Group",
+    "peer_group_size": "Peer Group Size",
+}
+
+
+def risk_ranking_tools() -> List[BaseTool]:
+    """Tools answering 'who are the riskiest users' from the precomputed ranking."""
+
+    def rank_risky_users(
+        top_n: int = 10,
+        user_type: Optional[str] = None,
+        exclude_locked: bool = False,
+        exclude_expired: bool = False,
+    ) -> str:
+        """Rank users by composite risk score (0-100) combining high/medium SOD risks, executed risks, sensitive TCode risks, role count, dialog user type, recent logon and locked/expired status. Optionally filter by user_type (e.g. 'DIALOG USER') and exclude locked or expired users."""
+        scores = get_risk_scores(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+        top = RiskScoringEngine.query(
+            scores, min(top_n, Settings.RISK_MAX_TOP_N), user_type, exclude_locked, exclude_expired
+        )
+        ranking = top[list(RANKING_COLUMNS)].rename(columns=RANKING_COLUMNS)
+        table = display_table(ranking, f"Top {len(ranking)} users by risk score")
+        # The user sees the full table; the LLM only needs the leaders to narrate
+        return f"{table}\nLeading rows:\n" + ranking.head(Settings.TOOL_OUTPUT_HEAD_ROWS).to_markdown()
+
+    def user_risk_score(user_id: str) -> str:
+        """Composite risk score, rank and score components of one SAP user id."""
+        scores = get_risk_scores(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+        matches = scores.index[scores.index.str.upper() == user_id.strip().upper()]
+        if matches.empty:
+            return f"No user with id {user_id!r} in the reports."
+        row = scores.loc[matches, list(RANKING_COLUMNS)].rename(columns=RANKING_COLUMNS)
+        return f"Out of {len(scores):,} users:\n" + row.to_markdown()
+
+    return [
+        StructuredTool.from_function(func=func)
+        for func in (rank_risky_users, user_risk_score)
+    ]
+
+
+def warm_entity_lookup() -> None:
+    """Build the entity lookup for the current report versions before the first lookup."""
+    get_entity_lookup(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+
+
+def entity_lookup_tools() -> List[BaseTool]:
+    """Tools resolving partial names and fuzzy descriptions to exact keys."""
+
+    def find_users(query: str, limit: int = 5) -> str:
+        """Resolve a partial or misspelled person name or user id (e.g. 'Sean', 'smith j') to candidate SAP User IDs, best match first. Use the returned ids to filter the data exactly."""
+        lookup = get_entity_lookup(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+        result = lookup.find_users(query, min(limit, Settings.LOOKUP_MAX_RESULTS))
+        return result.to_markdown() if not result.empty else f"No users match {query!r}."
+
+    def find_risks(query: str, limit: int = 5) -> str:
+        """Resolve a partial risk id or fuzzy risk description (e.g. 'purchase order goods receipt') to candidate Risk IDs and names, best match first. Use the returned ids to filter the data exactly."""
+        lookup = get_entity_lookup(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+        result = lookup.find_risks(query, min(limit, Settings.LOOKUP_MAX_RESULTS))
+        return result.to_markdown() if not result.empty else f"No risks match {query!r}."
+
+    return [
+        StructuredTool.from_function(func=func)
+        for func in (find_users, find_risks)
+    ]
+
+
+def _show_users(timeline: UserTimeline, positions: np.ndarray, title: str) -> str:
+    """Display the matching users as a table and summarise them for the LLM."""
+    if len(positions) == 0:
+        return f"No users: {title}."
+    users = timeline.rows(positions)
+    table = display_table(users, f"{title} ({len(users):,} users)")
+    return (
+        f"{len(users):,} users: {title}.\n{table}\nFirst rows:\n"
+        + users.head(Settings.TOOL_OUTPUT_HEAD_ROWS).fillna("-").to_markdown(index=False)
+    )
+
+
+def temporal_tools() -> List[BaseTool]:
+    """Range queries over the User Report's logon, creation and validity dates."""
+
+    def _timeline() -> UserTimeline:
+        return get_user_timeline(report_path(REPORT_USERS))
+
+    def dormant_users(
+        days: int = 90, as_of: Optional[str] = None, include_never_logged_on: bool = True
+    ) -> str:
+        """Users with no logon in the last `days` days (last logon more than `days` days before `as_of`). `as_of` is an ISO date and defaults to the report snapshot (latest logon in the report). Users who never logged on (blank 'User Last Logon') are included unless include_never_logged_on is false."""
+        timeline = _timeline()
+        try:
+            reference = to_day(as_of)
+        except ValueError:
+            return f"{as_of!r} is not a date; use YYYY-MM-DD."
+        reference = reference if reference is not None else timeline.snapshot
+        positions = timeline.dormant(days, reference, include_never_logged_on)
+        never = " or never logged on" if include_never_logged_on else ""
+        title = f"no logon in the {days} days before {reference}{never}"
+        return _show_users(timeline, positions, title)
+
+    def users_created_between(start: Optional[str] = None, end: Optional[str] = None) -> str:
+        """Users whose 'User Created On' is between `start` and `end` (ISO dates, both inclusive, either may be omitted)."""
+        timeline = _timeline()
+        try:
+            first, last = to_day(start), to_day(end)
+        except ValueError:
+            return "Dates must be given as YYYY-MM-DD."
+        positions = timeline.created_between(first, last)
+        title = f"created from {first or 'the start'} to {last or 'the end'}"
+        return _show_users(timeline, positions, title)
+
+    def users_expiring_between(start: Optional[str] = None, end: Optional[str] = None) -> str:
+        """Users whose validity ('User Valid To') ends between `start` and `end` (ISO dates, both inclusive, either may be omitted). For 'expires before D' pass only end=D; never-expiring users are never returned."""
+        timeline = _timeline()
+        try:
+            first, last = to_day(start), to_day(end)
+        except ValueError:
+            return "Dates must be given as YYYY-MM-DD."
+        positions = timeline.expiring_between(first, last)
+        title = f"validity ending from {first or 'the start'} to {last or 'the end'}"
+        return _show_users(timeline, positions, title)
+
+    def never_expiring_users() -> str:
+        """Users that never expire: blank 'User Valid To' (or the open-ended 31.12.9999)."""
+        timeline = _timeline()
+        return _show_users(timeline, timeline.never_expiring(), "never expiring")
+
+    return [
+        StructuredTool.from_function(func=func)
+        for func in (dormant_users, users_created_between, users_expiring_between, never_expiring_users)
+    ]
+
+
+def _show_profiles(frame: pd.DataFrame, title: str) -> str:
+    """Display a risk profile table and summarise it for the LLM."""
+    shown = frame.rename(columns=PROFILE_COLUMNS).reset_index()
+    table = display_table(shown, title)
+    return (
+        f"{title}.\n{table}\nLeading rows:\n"
+        + shown.head(Settings.TOOL_OUTPUT_HEAD_ROWS).to_markdown(index=False)
+    )
+
+
+def risk_profile_tools() -> List[BaseTool]:
+    """Similarity, peer-group and outlier queries over the sparse user x Risk ID matrix."""
+
+    def similar_risk_profiles(user_id: str, top_n: int = 10) -> str:
+        """Users whose set of SOD Risk IDs is most like a given SAP user id's ('who has a risk profile like X'). Similarity is the cosine of the risk profiles weighted by risk level and execution: 1 = identical, 0 = no shared risk."""
+        profiles = get_risk_profiles(report_path(REPORT_SOD_RISKS))
+        similar = profiles.similar(user_id, min(top_n, Settings.RISK_MAX_TOP_N))
+        if similar is None:
+            return f"User {user_id!r} has no risks in the SOD Risk Report."
+        if similar.empty:
+            return f"No other user shares a risk with {user_id}."
+        return _show_profiles(similar, f"{len(similar)} users with a risk profile like {user_id}")
+
+    def risk_peer_group(user_id: str) -> str:
+        """The peer group of a SAP user id: users linked to it through chains of highly similar SOD risk profiles, with each member's similarity to the user and the Risk IDs most common in the group."""
+        profiles = get_risk_profiles(report_path(REPORT_SOD_RISKS))
+        peers = profiles.peers(user_id)
+        if peers is None:
+            return f"User {user_id!r} has no risks in the SOD Risk Report."
+        if len(peers) == 1:
+            return f"{user_id} has no close peers: no other user's risk profile is similar enough."
+        summary = _show_profiles(peers, f"Peer group of {user_id} ({len(peers):,} users)")
+        common = profiles.common_risks(peers.index, Settings.TOOL_OUTPUT_HEAD_ROWS)
+        return f"{summary}\nMost common risks in the group:\n" + common.to_markdown(index=False)
+
+    def risk_profile_outliers(top_n: int = 10, min_risks: int = 1) -> str:
+        """Users whose SOD risk profile is least like their closest peers'. Outlier score (0-1) is 1 minus the mean similarity to their nearest users; 'Risks Unlike Peers' counts their risks none of those users hold. Optionally only users with at least `min_risks` risks."""
+        profiles = get_risk_profiles(report_path(REPORT_SOD_RISKS))
+        outliers = profiles.outliers[profiles.outliers["risks"] >= min_risks]
+        outliers = outliers.head(min(top_n, Settings.RISK_MAX_TOP_N))
+        if outliers.empty:
+            return f"No users with at least {min_risks} risks."
+        return _show_profiles(outliers, f"Top {len(outliers)} risk profile outliers")
+
+    return [
+        StructuredTool.from_function(func=func)
+        for func in (similar_risk_profiles, risk_peer_group, risk_profile_outliers)
+    ]
@@ -2,17 +2,26 @@
 SAP User Report Agent implementation with LangChain Pandas Agent.
 """
 
-from typing import List, Optional
+from typing import List
 import pandas as pd
-import streamlit as st
+from langchain_core.tools import BaseTool
 
 from agents.base_agent import BaseAgent
+from agents.report_tools import (
+    entity_lookup_tools,
+    risk_profile_tools,
+    risk_ranking_tools,
+    temporal_tools,
+    warm_entity_lookup,
+)
+from services.data_profiler import DataProfiler
+from services.dataset_registry import REPORT_USERS, report_path, report_source
+from services.dataset_store import get_dataset_store
 
 
-@st.cache_data
 def load_user_report_data(file_path: str) -> pd.DataFrame:
-    """Load and cache the User Report Excel file."""
-    return pd.read_excel(file_path)
+    """Load the User Report through the shared dataset store."""
+    return get_dataset_store().load(file_path)
 
 
 class UserReportAgent(BaseAgent):
@@ -22,142 +31,92 @@ class UserReportAgent(BaseAgent):
     Uses LangChain Pandas Agent for data analysis.
     """
 
-    # Path to the Excel data file
-    DATA_FILE_PATH = "documents/AI_Users_List_Report.xlsx"
-
-    def __init__(self):
-        """Initialize the agent and load the dataframe."""
-        self._dataframe: Optional[pd.DataFrame] = None
+    # Report type bound to a dataset file in the dataset registry
+    REPORT_TYPE = REPORT_USERS
 
     @property
-    def name(self) -> str:
-        return "SAP User Report Agent"
+    def data_file_path(self) -> str:
+        """Dataset file currently registered for this report."""
+        return report_path(self.REPORT_TYPE)
 
     @property
-    def icon(self) -> str:
-        return "👥"
+    def dataframe(self) -> pd.DataFrame:
+        """The report frame, served from the shared dataset store."""
+        return load_user_report_data(self.data_file_path)
 
     @property
-    def description(self) -> str:
-        return "Your intelligent assistant for SAP User Reports."
+    def uses_pandas_agent(self) -> bool:
+        """Flag indicating this agent uses Pandas Agent for queries."""
+        return True
 
     @property
-    def placeholder(self) -> str:
-        return "Ask about your SAP User Report..."
+    def dataset_version(self) -> str:
+        """Fingerprint of the loaded report file."""
+        return get_dataset_store().version(self.data_file_path)
 
     @property
-    def suggested_messages(self) -> List[str]:
-        return [
-            "How many total users are there?",
-            "How many dialog users are there?",
-            "How many locked users are there?",
-            "How many users never expire (VALID TO = BLANK)?",
-        ]
+    def domain_notes(self) -> str:
+        """Static column meanings and flag conventions for the User Report."""
+        return """
+=== COLUMN MEANINGS ===
+
+- User Status / User Type: type of SAP user (DIALOG USER, SERVICE USER, SYSTEM USER)
+- System / Client: SAP system identifier and client number
+- SAP User ID: unique user identifier
+- Logon: logon status
+- Active / User Locked / Expired: flags, 'X' = Yes, empty/null = No
+- Terminated: termination status
+- Current License / License Description: current license type code and its description
+- Law License / Rec License: law and recommended license codes
+- Last Name / First Name: user's name
+- User Count: count of users (always 1)
+- Role Count: number of roles assigned
+- Trx Count / Trx Range / Trx Star / Trx Wild / Trx Exec: transaction counts, ranges, star, wildcard and executed transactions
+- Risk Count / Risk Excuted Count: number of risks associated and executed
+- User Valid From / User Valid To: validity period; a blank 'User Valid To' means the user never expires
+- User Created On / User Last Logon: creation and last logon dates
+"""
 
-    @property
-    def dataframe(self) -> pd.DataFrame:
-        """Lazy load and cache the dataframe."""
-        if self._dataframe is None:
-            self._dataframe = load_user_report_data(self.DATA_FILE_PATH)
-        return self._dataframe
+    def get_tools(self) -> List[BaseTool]:
+        """Precomputed analytics the pandas agent can call instead of writing code."""
+        return (
+            risk_ranking_tools() + entity_lookup_tools() + temporal_tools() + risk_profile_tools()
+        )
 
-    @property
-    def uses_pandas_agent(self) -> bool:
-        """Flag indicating this agent uses Pandas Agent for queries."""
-        return True
+    def warm_up(self) -> None:
+        """Build the user and risk name lookup shared with the SOD Risk Report agent."""
+        warm_entity_lookup()
 
     @property
     def data_context(self) -> str:
         """
-        SAP User Report data context with column metadata and sample rows.
-        This provides context to the LLM about the data structure.
+        SAP User Report profile derived from the loaded frame.
+        Cached per dataset version and fitted to the data context token budget.
         """
-        return """
-The following data represents SAP User Report information from the file 'AI_Users_List_Report.xlsx'.
-This dataset contains 1,017 SAP user records with 28 columns.
-
-=== COLUMN METADATA ===
-
-| Column Name              | Data Type  | Description                                           | Unique Values / Notes                     |
-|--------------------------|------------|-------------------------------------------------------|-------------------------------------------|
-| User Status / User Type  | string     | Type of SAP user                                      | DIALOG USER (915), SERVICE USER (91), SYSTEM USER (11) |
-| System                   | string     | SAP system identifier                                 | PRD (all records)                         |
-| Client                   | integer    | SAP client number                                     | 300 (all records)                         |
-| SAP User ID              | string     | Unique user identifier                                | 1,017 unique values                       |
-| Logon                    | string     | Logon status                                          | INACTIVE (all records)                    |
-| Active                   | string     | Whether user is active (X = Yes)                      | X or empty/null                           |
-| User Locked              | string     | Whether user is locked (X = Yes)                      | X or empty/null (27 locked users)         |
-| Expired                  | string     | Whether user is expired (X = Yes)                     | X or empty/null (180 expired users)       |
-| Terminated               | float      | Termination status                                    | All values are null/NaN                   |
-| Current License          | string     | Current license type code                             | HD, 91, or null                           |
-| License Description      | string     | Description of the license                            | SAP S/4HANA Cloud for self-ser, Test, or null |
-| Law License              | string     | Law license code                                      | AX, AY, AZ, or null                       |
-| Rec License              | string     | Recommended license code                              | AX, AY, AZ, or null                       |
-| Last Name                | string     | User's last name                                      | 880 unique values                         |
-| First Name               | string     | User's first name                                     | 449 unique values                         |
-| User Count               | integer    | Count of users (always 1)                             | 1 (all records)                           |
-| Role Count               | integer    | Number of roles assigned                              | 0-68 range                                |
-| Trx Count                | integer    | Transaction count                                     | Various values                            |
-| Trx Range                | integer    | Transaction range                                     | 0, 1, 16, 17, 125, 126, 141               |
-| Trx Star                 | integer    | Star transactions                                     | 0 or 1                                    |
-| Trx Wild                 | integer    | Wildcard transactions                                 | 0-27 range                                |
-| Trx Exec                 | integer    | Executed transactions                                 | 0, 1, or 2                                |
-| Risk Count               | integer    | Number of risks associated                            | 0-17 range (791 users have risk > 0)      |
-| Risk Excuted Count       | integer    | Number of risks executed                              | 0 or 1 (only 3 users executed risk)       |
-| User Valid From          | datetime   | User validity start date                              | Mostly null                               |
-| User Valid To            | object     | User validity end date                                | 843 users have null (never expire)        |
-| User Created On          | datetime   | Date when user was created                            | Various dates                             |
-| User Last Logon          | datetime   | Last login date                                       | Various dates (106 null values)           |
-
-=== KEY STATISTICS ===
-
-- Total Users: 1,017
-- Dialog Users: 915
-- Service Users: 91
-- System Users: 11
-- Locked Users: 27
-- Expired Users: 180
-- Users Never Expire (VALID TO = BLANK): 843
-- Active Users (Active=X): 837
-- Users with Risk (Risk Count > 0): 791
-- Users Executed Risk: 3
-
-=== SAMPLE DATA (First 5 rows) ===
-
-| User Type   | System | Client | SAP User ID | Active | User Locked | Expired | Current License | Role Count | Risk Count | Risk Excuted Count |
-|-------------|--------|--------|-------------|--------|-------------|---------|-----------------|------------|------------|--------------------|
-| DIALOG USER | PRD    | 300    | 1702SEA01   | X      | NaN         | NaN     | HD              | 10         | 3          | 1                  |
-| DIALOG USER | PRD    | 300    | 1702SEA02   | X      | NaN         | NaN     | HD              | 10         | 3          | 1                  |
-| DIALOG USER | PRD    | 300    | 1702SEA03   | X      | NaN         | NaN     | HD              | 10         | 3          | 1                  |
-| DIALOG USER | PRD    | 300    | 1702SEA04   | X      | NaN         | NaN     | HD              | 10         | 3          | 0                  |
-| DIALOG USER | PRD    | 300    | 1702SEA05   | X      | NaN         | NaN     | HD              | 10         | 3          | 0                  |
-
-=== SAMPLE DATA (System Users) ===
-
-| User Type    | SAP User ID   | Active | Role Count | Risk Count | User Created On |
-|--------------|---------------|--------|------------|------------|-----------------|
-| SYSTEM USER  | SM_ADMIN_SMP  | X      | 5          | 0          | 2018-11-07      |
-| SYSTEM USER  | SM_SMP        | X      | 1          | 0          | 2018-11-07      |
-| SYSTEM USER  | TMSADM        | X      | 0          | 0          | 2018-10-16      |
-"""
+        return DataProfiler.describe(
+            self.dataframe,
+            fingerprint=self.dataset_version,
+            title=f"SAP User Report {report_source(self.REPORT_TYPE)!r}",
+        )
 
     def get_system_prompt(self) -> str:
-        """Generate system prompt with data context for Pandas Agent."""
+        """
+        Generate system prompt for Pandas Agent.
+        Static instructions first (cacheable prefix), data profile last.
+        """
         return f"""
 You are "Audit Bot AI", a specialized chatbot for the brand "Audit Bots" (https://www.auditbots.com).
 Your purpose is to help users access and understand SAP User Reports, including information about user types, statuses, validity periods, and risk analysis.
 
 You have access to a pandas DataFrame named 'df' containing SAP user data. Use Python code to analyze and query this data.
 
-{self.data_context}
-
 INSTRUCTIONS:
 1.  **Strict Scope**: ONLY answer questions related to the SAP User Report data or the "Audit Bot" brand.
 2.  **Refusal**: If a user asks about general topics (e.g., "What is the capital of France?", "Write a poem"), politely refuse and state that you are specialized for Audit Bot SAP data.
 3.  **Use the DataFrame**: For any data queries, use the pandas DataFrame 'df' to compute accurate answers.
 4.  **Accuracy**: Use the data provided exactly. Do not hallucinate numbers.
 5.  **Tone**: Professional, helpful, and concise.
-6.  **Format**: Format numbers with commas (e.g., 1,017) for readability. Use tables when showing multiple records.
+6.  **Format**: Format numbers with commas (e.g., 1,017) for readability. To show multiple records, call `display_table(frame, title)` in Python: the user sees it as an interactive table with downloads. Do not re-type its rows in your answer; write a short narrative instead.
 
 OUTPUT FORMATTING - VERY IMPORTANT:
 - **NEVER show "NaN" or "nan" in your responses**. Replace all NaN/null values with user-friendly text:
@@ -170,7 +129,22 @@ OUTPUT FORMATTING - VERY IMPORTANT:
 IMPORTANT NOTES:
 - When checking for "locked users", look for 'User Locked' column with value 'X'
 - When checking for "expired users", look for 'Expired' column with value 'X'  
-- When checking for "users that never expire", look for 'User Valid To' column with null/NaN values
+- For "users that never expire" (blank 'User Valid To'), call `never_expiring_users`
 - User types are in column 'User Status / User Type' with values: 'DIALOG USER', 'SERVICE USER', 'SYSTEM USER'
 - Active users have 'X' in the 'Active' column
+
+TOOLS:
+- For "riskiest users" or ranking questions, call `rank_risky_users` instead of writing pandas code.
+- For one user's overall risk score, call `user_risk_score`.
+- When a question names a person or describes a risk loosely, call `find_users` or `find_risks` first and filter 'df' by the returned ids instead of using `str.contains`.
+- For date-window questions call the date tools instead of parsing date columns: `dormant_users` (no logon in N days), `users_created_between`, `users_expiring_between` (validity ends in a period or before a date) and `never_expiring_users`. They display the users as a table.
+- For "users with a risk profile like X", peer groups or outliers compared to peers, call `similar_risk_profiles`, `risk_peer_group` or `risk_profile_outliers` instead of comparing Risk ID sets in pandas.
+
+WORKSPACE:
+- `ws` holds frames from earlier turns of this conversation; the question lists them when there are any.
+- For follow-ups ("break those down by user type", "only the locked ones"), start from `ws['name']` instead of re-filtering 'df'.
+- `ws['last']` is the last frame you returned in the previous turn. Save other reusable intermediate results with `ws.save('locked_dialog', frame, 'Locked DIALOG USERs')`.
+{self.domain_notes}
+DATA CONTEXT:
+{self.data_context}
 """
@@ -0,0 +1,311 @@
+"""
+Audit Bot AI - Headless HTTP API
+
+Exposes the agent registry to integrations (ticketing, GRC tooling) without
+Streamlit. Answers stream as server-sent events; batches run concurrently.
+Answers are coroutines on the shared LLM event loop, so an open stream does
+not hold a worker thread.
+
+Run with:
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from agents.base_agent import BaseAgent
+from agents.registry import get_agent_registry
+from config.settings import Settings
+from services.agent_runner import AgentRunner
+from services.async_runtime import aiterate, to_thread_iterator
+from services.llm_scheduler import SchedulerOverloaded, scheduling_context
+from services.result_store import TableResult, get_result_store, iter_csv, to_parquet_bytes
+from services.usage_ledger import GROUP_COLUMNS, get_usage_ledger
+
+
+# Usage groupings exposed over HTTP; question texts and other tenants stay private
+PUBLIC_GROUP_COLUMNS = tuple(
+    column for column in GROUP_COLUMNS if column not in ("tenant", "question")
+)
+
+
+# --- Request / Response Models ---
+class ChatMessage(BaseModel):
+    role: str = Field(pattern="^(user|assistant)$")
+    content: str
+
+
+class AskRequest(BaseModel):
+    question: str = Field(min_length=1)
+    history: List[ChatMessage] = Field(default_factory=list)
+    # Follow-ups with the same id reuse the agent's earlier results
+    conversation_id: Optional[str] = None
+
+
+class BatchItem(BaseModel):
+    agent: str
+    question: str = Field(min_length=1)
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(min_length=1, max_length=Settings.API_MAX_BATCH_SIZE)
+
+
+# --- Application State ---
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Fail fast when the OpenAI API key is missing."""
+    if not Settings.get_openai_api_key():
+        raise RuntimeError(
+            "OpenAI API Key not found. Please set `OPENAI_API_KEY` in the environment."
+        )
+    yield
+
+
+app = FastAPI(title=f"{Settings.APP_TITLE} API", lifespan=lifespan)
+AGENT_REGISTRY = get_agent_registry()
+# Blocking downloads run on a dedicated pool instead of the event loop
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=Settings.API_MAX_WORKERS, thread_name_prefix="api-download"
+)
+BATCHES: "OrderedDict[str, Dict]" = OrderedDict()
+# Strong references so running batch tasks are not garbage collected
+BATCH_TASKS: Set[asyncio.Task] = set()
+
+
+def check_agent(name: str) -> None:
+    """Raise 404 unless an agent of this name is registered."""
+    if name not in AGENT_REGISTRY:
+        raise HTTPException(status_code=404, detail=f"Unknown agent: {name}")
+
+
+async def get_agent(name: str) -> BaseAgent:
+    """
+    Look up an agent by name or raise 404. The first lookup imports and builds
+    the agent, which blocks, so it runs on a worker thread.
+    """
+    check_agent(name)
+    return await asyncio.to_thread(AGENT_REGISTRY.get, name)
+
+
+def get_tenant(request: Request) -> str:
+    """Fair-queuing key for the caller."""
+    return request.headers.get(Settings.TENANT_HEADER) or Settings.DEFAULT_TENANT
+
+
+async def answer_chunks(
+    agent: BaseAgent,
+    history: List[Dict[str, str]],
+    tenant: str,
+    conversation_id: Optional[str] = None,
+) -> AsyncIterator[Union[str, TableResult]]:
+    """Stream an answer produced on the shared LLM loop, attributed to the tenant."""
+    with scheduling_context(tenant):
+        async for chunk in aiterate(
+            AgentRunner.astream_response(
+                agent=agent,
+                chat_history=history,
+                conversation_id=f"{tenant}:{conversation_id}:{agent.name}" if conversation_id else None,
+            )
+        ):
+            yield chunk
+
+
+def sse(event: str, data: Dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def table_payload(table: TableResult) -> Dict:
+    """Table reference with its download URLs."""
+    return {
+        **table.to_dict(),
+        "csv_url": f"/results/{table.handle}.csv",
+        "parquet_url": f"/results/{table.handle}.parquet",
+    }
+
+
+def get_stored_frame(handle: str, request: Request):
+    """Look up a result table readable by the caller or raise 404."""
+    frame = get_result_store().get(handle, tenant=get_tenant(request))
+    if frame is None:
+        raise HTTPException(status_code=404, detail=f"Unknown result: {handle}")
+    return frame
+
+
+# --- Endpoints ---
+@app.get("/agents")
+async def list_agents() -> List[Dict]:
+    """List the available agents and their metadata."""
+    return [spec.to_dict() for spec in AGENT_REGISTRY.specs().values()]
+
+
+@app.post("/agents/{agent_name}/ask")
+async def ask(agent_name: str, body: AskRequest, request: Request) -> StreamingResponse:
+    """Ask an agent a question; the answer streams as server-sent events."""
+    agent = await get_agent(agent_name)
+    history = [message.model_dump() for message in body.history]
+    history.append({"role": "user", "content": body.question})
+    tenant = get_tenant(request)
+
+    async def events() -> AsyncIterator[str]:
+        answer = ""
+        try:
+            async for chunk in answer_chunks(agent, history, tenant, body.conversation_id):
+                if isinstance(chunk, TableResult):
+                    yield sse("table", table_payload(chunk))
+                    continue
+                answer += chunk
+                yield sse("delta", {"content": chunk})
+        except SchedulerOverloaded:
+            yield sse("error", {"detail": SchedulerOverloaded.USER_MESSAGE})
+            return
+        yield sse("done", {"content": answer})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def run_batch(batch: Dict, items: List[BatchItem], tenant: str) -> None:
+    """Answer every batch item concurrently, bounded by the batch concurrency limit."""
+    semaphore = asyncio.Semaphore(Settings.API_BATCH_CONCURRENCY)
+
+    async def run_item(index: int, item: BatchItem) -> None:
+        result = batch["results"][index]
+        async with semaphore:
+            result["status"] = "running"
+            try:
+                agent = await get_agent(item.agent)
+                history = [{"role": "user", "content": item.question}]
+                answer, tables = "", []
+                async for chunk in answer_chunks(agent, history, tenant):
+                    if isinstance(chunk, TableResult):
+                        tables.append(table_payload(chunk))
+                    else:
+                        answer += chunk
+                result.update(status="done", answer=answer, tables=tables)
+            except HTTPException as error:
+                result.update(status="failed", error=error.detail)
+            except Exception as error:
+                result.update(status="failed", error=str(error))
+
+    await asyncio.gather(*(run_item(i, item) for i, item in enumerate(items)))
+    batch["status"] = "done"
+    batch["finished_at"] = time.time()
+
+
+@app.post("/batches", status_code=202)
+async def submit_batch(body: BatchRequest, request: Request) -> Dict:
+    """Submit questions for concurrent answering; poll the returned URL for results."""
+    for item in body.items:
+        check_agent(item.agent)
+    # Forget the oldest finished batches beyond the retention limit; running
+    # batches are kept so their results can still be polled
+    finished = [key for key, batch in BATCHES.items() if batch["status"] == "done"]
+    for key in finished[: max(0, len(BATCHES) + 1 - Settings.API_MAX_BATCHES)]:
+        del BATCHES[key]
+    if len(BATCHES) >= Settings.API_MAX_BATCHES:
+        raise HTTPException(status_code=429, detail="Too many batches in progress; retry later.")
+    batch_id = uuid.uuid4().hex
+    tenant = get_tenant(request)
+    batch = BATCHES[batch_id] = {
+        "id": batch_id,
+        "tenant": tenant,
+        "status": "running",
+        "submitted_at": time.time(),
+        "results": [
+            {"agent": item.agent, "question": item.question, "status": "queued"}
+            for item in body.items
+        ],
+    }
+    task = asyncio.create_task(run_batch(batch, body.items, tenant))
+    BATCH_TASKS.add(task)
+    task.add_done_callback(BATCH_TASKS.discard)
+    return {"id": batch_id, "status_url": f"/batches/{batch_id}"}
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, request: Request) -> Dict:
+    """Return the status and answers of a batch submitted by the caller's tenant."""
+    batch: Optional[Dict] = BATCHES.get(batch_id)
+    # Other tenants' batches look the same as unknown ones
+    if batch is None or batch["tenant"] != get_tenant(request):
+        raise HTTPException(status_code=404, detail=f"Unknown batch: {batch_id}")
+    return batch
+
+
+@app.get("/results/{handle}.csv")
+async def download_csv(handle: str, request: Request) -> StreamingResponse:
+    """Stream a displayed result table as CSV, encoded chunk by chunk."""
+    frame = get_stored_frame(handle, request)
+    return StreamingResponse(
+        to_thread_iterator(lambda: iter_csv(frame), EXECUTOR),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{handle}.csv"'},
+    )
+
+
+@app.get("/results/{handle}.parquet")
+async def download_parquet(handle: str, request: Request) -> Response:
+    """Download a displayed result table as Parquet."""
+    frame = get_stored_frame(handle, request)
+    content = await asyncio.get_running_loop().run_in_executor(EXECUTOR, to_parquet_bytes, frame)
+    return Response(
+        content,
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{handle}.parquet"'},
+    )
+
+
+@app.get("/usage")
+async def usage_summary(
+    request: Request,
+    group_by: str = Query("agent,model", description=", ".join(PUBLIC_GROUP_COLUMNS)),
+    days: float = Query(7, gt=0),
+    limit: int = Query(50, ge=1, le=1000),
+) -> List[Dict]:
+    """
+    Aggregate the caller's LLM token usage and cost, most expensive groups
+    first. Group by any of agent, kind, operation, model and day.
+    """
+    columns = [column.strip() for column in group_by.split(",") if column.strip()]
+    if set(columns) - set(PUBLIC_GROUP_COLUMNS):
+        raise HTTPException(
+            status_code=400, detail=f"group_by must be a subset of {PUBLIC_GROUP_COLUMNS}"
+        )
+    try:
+        return get_usage_ledger().summary(
+            columns,
+            since=time.time() - days * 86400,
+            limit=limit,
+            tenant=get_tenant(request),
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+@app.get("/usage/{tenant}")
+async def tenant_usage(tenant: str, request: Request) -> Dict:
+    """Today's usage and budget state of the calling tenant."""
+    if tenant != get_tenant(request):
+        raise HTTPException(status_code=403, detail="Usage is only available for your own tenant")
+    return get_usage_ledger().tenant_usage(tenant)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=Settings.API_HOST, port=Settings.API_PORT)
@@ -5,31 +5,23 @@ A modular, OOP-based Streamlit chatbot for SAP report analysis.
 Supports multiple agent types for different SAP reports.
 """
 
+import re
+import uuid
 import streamlit as st
-from typing import Dict
 
 # Local imports
-from agents import LicenseReportAgent, SODRiskReportAgent, UserReportAgent
 from agents.base_agent import BaseAgent
+from agents.registry import get_agent_registry
 from config.settings import Settings
 from ui.styles import Styles
 from ui.components import UIComponents
-from services.chat_service import ChatService
-from services.pandas_agent_service import PandasAgentService
-
-
-# --- Agent Registry ---
-def get_available_agents() -> Dict[str, BaseAgent]:
-    """
-    Get all available agents.
-    Add new agents here as they are created.
-    """
-    agents = [
-        LicenseReportAgent(),
-        SODRiskReportAgent(),
-        UserReportAgent(),
-    ]
-    return {agent.name: agent for agent in agents}
+from services.agent_runner import AgentRunner
+from services.answer_cache import reports_version
+from services.conversation_store import get_conversation_store
+from services.llm_scheduler import scheduling_context
+from services.prefetcher import get_prefetcher
+from services.result_store import TableResult
+from services.usage_ledger import get_usage_ledger
 
 
 # --- Page Configuration ---
@@ -43,29 +35,56 @@ st.set_page_config(
 Styles.apply()
 
 # --- Initialize Session State ---
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# The conversation id lives in the URL so history survives reconnects.
+# Only ids in the format we hand out are taken; anything else starts afresh.
+if "conversation_id" not in st.session_state:
+    requested = st.query_params.get("conversation") or ""
+    st.session_state.conversation_id = (
+        requested if re.fullmatch(r"[0-9a-f]{32}", requested) else uuid.uuid4().hex
+    )
+st.query_params["conversation"] = st.session_state.conversation_id
+
+# --- Get Available Agents ---
+# Specs only; an agent is imported and built the first time it is selected
+AGENT_REGISTRY = get_agent_registry()
+AGENT_SPECS = AGENT_REGISTRY.specs()
+CONVERSATIONS = get_conversation_store()
 
-if "selected_agent" not in st.session_state:
+if st.session_state.get("selected_agent") not in AGENT_SPECS:
     st.session_state.selected_agent = Settings.DEFAULT_AGENT
 
 if "pending_message" not in st.session_state:
     st.session_state.pending_message = None
 
-# --- Get Available Agents ---
-AGENTS = get_available_agents()
-
 
 def get_current_agent() -> BaseAgent:
-    """Get the currently selected agent instance."""
-    return AGENTS[st.session_state.selected_agent]
+    """Get the currently selected agent instance, built on first selection."""
+    return AGENT_REGISTRY.get(st.session_state.selected_agent)
+
+
+def get_conversation_key() -> str:
+    """
+    Key of the persisted conversation for this session and agent. It is
+    scoped by tenant, as in the API, so a conversation id copied into another
+    tenant's URL only ever reaches that tenant's own, empty conversation.
+    """
+    return f"{get_tenant_id()}:{st.session_state.conversation_id}:{st.session_state.selected_agent}"
+
+
+def get_tenant_id() -> str:
+    """
+    Fair-queuing and budget key: the tenant header set by the proxy, else the
+    default tenant. Never the session, so a new tab does not reset the budget.
+    """
+    return st.context.headers.get(Settings.TENANT_HEADER) or Settings.DEFAULT_TENANT
 
 
 # --- Render UI ---
 # Sidebar with agent selection and suggestions
 selected_suggestion = UIComponents.render_sidebar(
-    agents=AGENTS,
+    agents=AGENT_SPECS,
     current_agent_name=st.session_state.selected_agent,
+    usage=get_usage_ledger().tenant_usage(get_tenant_id()),
 )
 
 # Handle suggestion click
@@ -77,8 +96,19 @@ if selected_suggestion:
 current_agent = get_current_agent()
 UIComponents.render_header(current_agent)
 
+# Precompute the suggested questions of the current report versions
+if Settings.PREFETCH_ENABLED:
+    get_prefetcher().schedule_suggestions(current_agent)
+
 # Chat history
-UIComponents.render_chat_history(st.session_state.messages)
+conversation_key = get_conversation_key()
+if UIComponents.render_chat_history(
+    CONVERSATIONS.messages(conversation_key),
+    get_tenant_id(),
+    has_older=CONVERSATIONS.has_older(conversation_key),
+):
+    CONVERSATIONS.load_older(conversation_key)
+    st.rerun()
 
 # --- Handle User Input ---
 # Always render chat input first
@@ -95,7 +125,7 @@ elif chat_input_prompt:
 # Process user input
 if prompt:
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    CONVERSATIONS.append(conversation_key, "user", prompt)
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -103,31 +133,25 @@ if prompt:
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
         full_response = ""
+        tables = []
 
         # Show thinking indicator
         UIComponents.render_thinking_indicator(message_placeholder)
 
-        # Check if agent uses Pandas Agent
-        if current_agent.uses_pandas_agent:
-            # Use Pandas Agent for data analysis
-            pandas_service = PandasAgentService(
-                dataframe=current_agent.dataframe,
-                agent=current_agent,
-            )
-
-            for chunk in pandas_service.stream_response(prompt):
-                full_response += chunk
-                UIComponents.render_streaming_response(
-                    message_placeholder, full_response, is_complete=False
-                )
-        else:
-            # Use regular chat service
-            chat_service = ChatService()
+        # All LLM calls of this turn queue fairly under this session's tenant
+        def show_queue_position(position: int) -> None:
+            UIComponents.render_queue_position(message_placeholder, position)
 
-            for chunk in chat_service.stream_response(
+        with scheduling_context(get_tenant_id(), on_queue=show_queue_position):
+            for chunk in AgentRunner.stream_response(
                 agent=current_agent,
-                chat_history=st.session_state.messages,
+                chat_history=CONVERSATIONS.messages(conversation_key),
+                conversation_id=conversation_key,
             ):
+                # Tables are rendered natively below the narrative
+                if isinstance(chunk, TableResult):
+                    tables.append(chunk)
+                    continue
                 full_response += chunk
                 UIComponents.render_streaming_response(
                     message_placeholder, full_response, is_complete=False
@@ -137,9 +161,18 @@ if prompt:
         UIComponents.render_streaming_response(
             message_placeholder, full_response, is_complete=True
         )
+        UIComponents.render_tables(tables, get_tenant_id())
 
     # Add assistant response to history
-    st.session_state.messages.append({"role": "assistant", "content": full_response})
+    CONVERSATIONS.append(
+        conversation_key,
+        "assistant",
+        full_response,
+        tables=[table.to_dict() for table in tables],
+        reports_version=reports_version(),
+    )
+    if Settings.PREFETCH_ENABLED:
+        get_prefetcher().schedule_follow_ups(current_agent, prompt, full_response)
 
     # Rerun to refresh the UI and show the chat input again
     st.rerun()
@@ -2,6 +2,10 @@
 Application settings and configuration.
 """
 
+import os
+import tempfile
+from typing import Optional
+
 
 class Settings:
     """Central configuration for the Audit Bot AI application."""
@@ -14,6 +18,172 @@ class Settings:
 
     # OpenAI Configuration
     OPENAI_MODEL = "gpt-4o-mini"
+    # Override to point at a proxy or a local fake endpoint
+    OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+
+    # Tenancy - fair queuing key taken from this request header when present
+    TENANT_HEADER = "X-Tenant-Id"
+    DEFAULT_TENANT = "default"
+
+    # LLM Admission Control (process-wide)
+    LLM_MAX_CONCURRENCY = 8
+    LLM_TOKENS_PER_MINUTE = 200_000
+    LLM_MAX_QUEUE_PER_TENANT = 4
+    LLM_MAX_QUEUE_TOTAL = 64
+    LLM_EXPECTED_OUTPUT_TOKENS = 800  # completion estimate used for admission
+
+    # LLM Resilience
+    LLM_REQUEST_TIMEOUT_SECONDS = 30.0  # per HTTP request
+    LLM_CALL_DEADLINE_SECONDS = 90.0  # per call, including retries
+    LLM_MAX_RETRIES = 3
+    LLM_BACKOFF_BASE_SECONDS = 0.5
+    LLM_BACKOFF_MAX_SECONDS = 8.0
+    LLM_HEDGE_AFTER_SECONDS = None  # e.g. 4.0 to hedge streams with a late first token
+    LLM_STREAM_BUFFER = 256  # chunks buffered between the LLM loop and a consumer
+    # Shared LLM event loop - one async HTTP client pools connections for all streams
+    LLM_HTTP_MAX_CONNECTIONS = 200
+    LLM_HTTP_MAX_KEEPALIVE = 50
+    LLM_LOOP_EXECUTOR_WORKERS = 32  # threads running tools and ledger writes for the loop
+    LLM_LOOP_STREAM_WORKERS = 16  # threads driving blocking answers (cross-report) for the loop
+    AGENT_MAX_EXECUTION_SECONDS = 180.0  # wall-clock budget of one pandas agent run
+
+    # Headless API Server
+    API_HOST = "0.0.0.0"
+    API_PORT = 8000
+    API_MAX_WORKERS = 16  # threads running blocking result downloads
+    API_BATCH_CONCURRENCY = 8  # concurrent items per batch
+    API_MAX_BATCH_SIZE = 100
+    API_MAX_BATCHES = 200  # submitted batches retained for polling
+
+    # Data Context Profiling
+    DATA_CONTEXT_TOKEN_BUDGET = 1500  # max tokens of the generated data profile
+    DATA_CONTEXT_CACHE_SIZE = 32  # rendered profiles kept per process
+
+    # Dataset Serving - Arrow IPC files shared by all server processes on the host
+    DATASET_CACHE_DIR = os.environ.get("AUDITBOT_DATASET_DIR") or (
+        "/dev/shm/auditbot-datasets"
+        if os.path.isdir("/dev/shm")
+        else os.path.join(tempfile.gettempdir(), "auditbot-datasets")
+    )
+    DATASET_VERSIONS_KEPT = 2  # materialised versions retained per report
+    DATASET_SERVER_POLL_SECONDS = 10
+
+    # Report Files
+    LICENSE_REPORT_PATH = "documents/License_Summary.xlsx"
+    SOD_RISK_REPORT_PATH = "documents/AI_SOD_Risk_Report.xlsx"
+    USER_REPORT_PATH = "documents/AI_Users_List_Report.xlsx"
+
+    # Report Ingestion - uploaded reports are converted and bound to their agent
+    DATASET_REGISTRY_PATH = "data/datasets.json"
+    INGESTED_DATASET_DIR = "data/datasets"
+    UPLOAD_DIR = "data/uploads"
+    UPLOAD_EXTENSIONS = ["xlsx", "xls", "csv", "parquet"]
+    INGESTION_WORKERS = 2
+    INGESTION_POLL_SECONDS = 1.0  # UI refresh interval while ingestion runs
+    INGESTION_JOBS_KEPT = 50  # finished jobs remembered per process
+
+    # Risk Scoring - weights of the composite per-user score
+    RISK_SCORE_WEIGHTS = {
+        "high_risks": 3.0,
+        "medium_risks": 1.0,
+        "executed_risks": 5.0,
+        "sensitive_tcode_risks": 2.0,
+        "role_count": 1.0,
+        "dialog_user": 1.0,
+        "recent_logon": 1.0,
+        "locked": -2.0,
+        "expired": -2.0,
+    }
+    RISK_RECENT_LOGON_DAYS = 90
+    RISK_MAX_TOP_N = 100
 
-    # Default Agent
+    # Risk Profiles - sparse user x Risk ID matrix for similarity and peer groups
+    RISK_PROFILE_LEVEL_WEIGHTS = {"H": 3.0, "M": 1.0}  # by Risk Level code; others weigh 1
+    RISK_PROFILE_EXECUTED_WEIGHT = 2.0  # multiplier for executed risks
+    RISK_PROFILE_NEIGHBOURS = 10  # nearest neighbours kept per user
+    RISK_PEER_MIN_SIMILARITY = 0.8  # least cosine similarity between any two members of a peer group
+    RISK_PEER_MAX_LINKAGE_PROFILES = 4000  # distinct profiles clustered by complete linkage at once
+    RISK_PROFILE_BLOCK_ROWS = 256  # users per dense similarity block
+
+    # Fuzzy Entity Lookup
+    LOOKUP_MAX_RESULTS = 20
+
+    # Pandas Agent Tool Output Governor
+    TOOL_OUTPUT_MAX_ROWS = 50  # larger frames are summarised
+    TOOL_OUTPUT_MAX_TOKENS = 1500  # larger observations are summarised or truncated
+    TOOL_OUTPUT_HEAD_ROWS = 5  # rows shown in a summary
+    RESULT_STORE_MAX_BYTES = 256 * 1024 * 1024  # full results kept server-side
+    RESULT_STORE_DIR = "data/results"  # displayed tables, kept as Parquet next to the conversations
+    RESULT_STORE_MAX_DISK_BYTES = 2 * 1024 * 1024 * 1024  # oldest displayed tables are deleted beyond this
+    RESULT_STORE_MAX_AGE_SECONDS = 30 * 24 * 3600  # displayed tables older than this are deleted
+    RESULT_STORE_PRUNE_SECONDS = 3600  # interval of the age check between size-triggered prunes
+    RESULT_EXPORT_CHUNK_ROWS = 10_000  # rows per chunk of a streamed CSV export
+    TABLE_INLINE_EXPORT_MAX_ROWS = 50_000  # larger tables download from the API server
+    API_PUBLIC_URL = os.environ.get("AUDITBOT_API_URL")  # e.g. https://host/api; None disables links
+
+    # Cross-Report Orchestration
+    ORCHESTRATOR_MAX_WORKERS = 16  # threads shared by all concurrent sub-queries
+    ORCHESTRATOR_MAX_SUB_QUERIES = 4  # per question
+    ORCHESTRATOR_JOIN_PREVIEW_ROWS = 20  # joined rows shown to the merge step
+
+    # Agents - specs are read from the catalogue and from installed plugins'
+    # entry points; an agent's module is only imported when it is first used
     DEFAULT_AGENT = "SAP License Report Agent"
+    AGENT_CATALOG_PATH = os.environ.get("AUDITBOT_AGENT_CATALOG") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "agents.json"
+    )
+    AGENT_ENTRY_POINT_GROUP = "auditbot.agents"
+
+    # Conversation Store
+    CONVERSATION_DB_PATH = "data/conversations.db"
+    CONVERSATION_WINDOW = 40  # messages kept in memory per active conversation
+    CONVERSATION_PAGE_SIZE = 20  # older messages loaded per "load earlier" click
+    CONVERSATION_IDLE_SECONDS = 900  # evict windows idle longer than this
+    CONVERSATION_MAX_SESSIONS = 500
+
+    # Usage Ledger and Budgets
+    USAGE_DB_PATH = "data/usage.db"
+    # USD per million tokens: (input, output, cached input)
+    MODEL_PRICES_PER_MILLION = {
+        "gpt-4o-mini": (0.15, 0.60, 0.075),
+        "gpt-4.1-nano": (0.10, 0.40, 0.025),
+        "gpt-4o": (2.50, 10.00, 1.25),
+    }
+    # Cheaper model used once a tenant is close to its budget
+    OPENAI_FALLBACK_MODEL = "gpt-4.1-nano"
+    TENANT_DAILY_BUDGET_USD = float(os.environ.get("AUDITBOT_TENANT_DAILY_BUDGET_USD", "5.0"))
+    TENANT_BUDGETS_USD = {}  # per-tenant overrides of the daily budget, e.g. {"acme": 20.0}
+    BUDGET_DEGRADE_RATIO = 0.8  # share of the budget after which the fallback model is used
+
+    # Speculative Prefetch - answers to suggested and likely follow-up questions
+    PREFETCH_ENABLED = os.environ.get("AUDITBOT_PREFETCH", "1") != "0"
+    PREFETCH_TENANT = "prefetch"  # fair-queuing and usage key of background runs
+    PREFETCH_WORKERS = 1
+    PREFETCH_DAILY_BUDGET_USD = 1.0
+    PREFETCH_MAX_FOLLOW_UPS = 3  # per answered question
+    PREFETCH_MAX_LOAD = 0.5  # run only while fewer than this share of LLM slots is busy
+    PREFETCH_IDLE_POLL_SECONDS = 1.0
+    PREFETCH_MAX_WAIT_SECONDS = 300  # drop jobs that found no idle capacity in time
+    ANSWER_CACHE_SIZE = 256
+
+    # Analysis Workspace (named pandas agent results reused by follow-ups)
+    WORKSPACE_MAX_BYTES = 64 * 1024 * 1024  # per conversation
+    WORKSPACE_TOTAL_MAX_BYTES = 1024 * 1024 * 1024  # across all conversations
+    WORKSPACE_MAX_FRAMES = 20  # per conversation
+    WORKSPACE_IDLE_SECONDS = CONVERSATION_IDLE_SECONDS
+
+    @staticmethod
+    def get_openai_api_key() -> Optional[str]:
+        """
+        Resolve the OpenAI API key.
+        The OPENAI_API_KEY environment variable wins over `.streamlit/secrets.toml`
+        so headless processes (e.g. the API server) can be configured without Streamlit.
+        """
+        if os.environ.get("OPENAI_API_KEY"):
+            return os.environ["OPENAI_API_KEY"]
+        try:
+            import streamlit as st
+
+            return st.secrets.get("OPENAI_API_KEY")
+        except Exception:
+            return None
@@ -0,0 +1,4 @@
+"""
+Load-testing harness for Audit Bot AI.
+Drives the real Streamlit app headlessly against a local fake LLM.
+"""
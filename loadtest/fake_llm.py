@@ -0,0 +1,191 @@
+"""
+Local fake of the OpenAI chat completions API with configurable latency.
+
+Answers every request with a short canned reply. When the request offers
+tools, the first turn calls one (the pandas agent's Python tool runs a cheap
+expression on the real data) so the tool-execution path is exercised too.
+
+Run with:
+    python -m loadtest.fake_llm --port 9999 --first-token 0.5 --token-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+# Python executed by the pandas agent's tool on the first turn
+PYTHON_TOOL = "python_repl_ast"
+PYTHON_QUERY = "df.shape"
+
+ANSWER = (
+    "This is a simulated answer from the load-test LLM. It is long enough to "
+    "stream in several chunks, like a short narrative of the analysis results."
+)
+
+
+class FakeLLMConfig:
+    """Latency and behaviour of the fake endpoint."""
+
+    def __init__(
+        self,
+        first_token: float = 0.5,
+        token_delay: float = 0.02,
+        tool_calls: bool = True,
+        failures: Optional[List[int]] = None,
+        first_tokens: Optional[List[float]] = None,
+    ):
+        """
+        Args:
+            first_token: Seconds before the first token (or the full non-streamed reply)
+            token_delay: Seconds between streamed chunks
+            tool_calls: Whether requests offering tools get a tool call on their first turn
+            failures: HTTP status codes answered to the next requests, one each, in order
+            first_tokens: First-token delays of the next requests, overriding `first_token`
+        """
+        self.first_token = first_token
+        self.token_delay = token_delay
+        self.tool_calls = tool_calls
+        self.failures = list(failures or [])
+        self.first_tokens = list(first_tokens or [])
+        self.requests = 0
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _tool_call(body: Dict) -> Optional[Dict]:
+    """The tool call to make for this request, or None to answer in text."""
+    tools = body.get("tools") or []
+    messages = body.get("messages") or []
+    if not tools or (messages and messages[-1].get("role") == "tool"):
+        return None
+    names = [tool["function"]["name"] for tool in tools]
+    choice = body.get("tool_choice")
+    if isinstance(choice, dict):
+        # Structured output forces a function; an empty object is a valid minimal reply
+        name, arguments = choice["function"]["name"], {}
+        if name == "QueryPlan":
+            arguments = {"sub_queries": []}
+    elif PYTHON_TOOL in names:
+        name, arguments = PYTHON_TOOL, {"query": PYTHON_QUERY}
+    else:
+        name, arguments = names[0], {}
+    return {
+        "index": 0,
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def _usage(body: Dict, completion: str) -> Dict:
+    prompt = sum(_tokens(str(message.get("content") or "")) for message in body.get("messages", []))
+    output = _tokens(completion)
+    return {"prompt_tokens": prompt, "completion_tokens": output, "total_tokens": prompt + output}
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    """Build the fake OpenAI-compatible app."""
+    app = FastAPI(title="Fake LLM")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        config.requests += 1
+        if config.failures:
+            status = config.failures.pop(0)
+            return JSONResponse(
+                {"error": {"message": f"Simulated {status}", "type": "fake_error", "code": None}},
+                status_code=status,
+            )
+        first_token = config.first_tokens.pop(0) if config.first_tokens else config.first_token
+        model = body.get("model", "fake")
+        call = _tool_call(body) if config.tool_calls or body.get("tool_choice") else None
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        completion = call["function"]["arguments"] if call else ANSWER
+        usage = _usage(body, completion)
+
+        await asyncio.sleep(first_token)
+        if not body.get("stream"):
+            message: Dict = {"role": "assistant", "content": None if call else ANSWER}
+            if call:
+                message["tool_calls"] = [{key: value for key, value in call.items() if key != "index"}]
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "message": message, "finish_reason": "tool_calls" if call else "stop"}
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            if call:
+                yield chunk({"role": "assistant", "tool_calls": [call]})
+                yield chunk({}, "tool_calls")
+            else:
+                words: List[str] = ANSWER.split(" ")
+                for index in range(0, len(words), 4):
+                    if index:
+                        await asyncio.sleep(config.token_delay)
+                    text = " ".join(words[index:index + 4]) + ("" if index + 4 >= len(words) else " ")
+                    yield chunk({"role": "assistant", "content": text} if index == 0 else {"content": text})
+                yield chunk({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    """Serve the fake LLM."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--first-token", type=float, default=0.5, help="seconds to the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--no-tool-calls", action="store_true", help="always answer in text")
+    args = parser.parse_args()
+    config = FakeLLMConfig(args.first_token, args.token_delay, tool_calls=not args.no_tool_calls)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Concurrent-session load test of the Streamlit app.
+
+Drives the real app.py flow headlessly with Streamlit's AppTest against the
+local fake LLM. AppTest instances share Streamlit's Runtime singleton, so
+each simulated auditor runs in its own process; the processes share the
+conversation and usage databases and the host-wide dataset cache, like
+replicas of a server. Concurrency is ramped stage by stage; each stage
+reports throughput, turn latency, and the RSS and thread counts summed over
+the harness and its session processes.
+
+Run from the repository root:
+    python -m loadtest.harness --sessions 1,4,8,16 --turns 3 --first-token 0.5
+
+Exits non-zero when --max-p95 is given and the last stage exceeds it.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+
+def _descendants(pid: int) -> List[int]:
+    """Pids of a process's children, grandchildren and so on (Linux only)."""
+    found: List[int] = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return found
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as handle:
+                children = [int(child) for child in handle.read().split()]
+        except OSError:
+            continue
+        for child in children:
+            found += [child, *_descendants(child)]
+    return found
+
+
+def process_status() -> Dict[str, float]:
+    """RSS in MB and OS thread count of this process and its session processes."""
+    status = {"rss_mb": 0.0, "threads": 0.0}
+    pids = [os.getpid(), *_descendants(os.getpid())]
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        status["rss_mb"] += int(line.split()[1]) / 1024
+                    elif line.startswith("Threads:"):
+                        status["threads"] += float(line.split()[1])
+        except OSError:
+            if pid != os.getpid():
+                # The process exited between listing and reading
+                continue
+            # Not Linux: peak RSS of this process is the best available figure
+            import resource
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            status["rss_mb"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+            status["threads"] = float(threading.active_count())
+    return status
+
+
+class StatusSampler:
+    """Samples RSS and thread count in the background, keeping the peaks."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = process_status()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            current = process_status()
+            for key, value in current.items():
+                self.peak[key] = max(self.peak[key], value)
+
+    def __enter__(self) -> "StatusSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile, 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def start_fake_llm(port: int, first_token: float, token_delay: float, tool_calls: bool) -> subprocess.Popen:
+    """Start the fake LLM in its own process and wait until it accepts connections."""
+    command = [
+        sys.executable, "-m", "loadtest.fake_llm",
+        "--port", str(port),
+        "--first-token", str(first_token),
+        "--token-delay", str(token_delay),
+    ]
+    if not tool_calls:
+        command.append("--no-tool-calls")
+    process = subprocess.Popen(command, cwd=REPO_ROOT)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("The fake LLM server exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The fake LLM server did not start within 30 seconds")
+
+
+def configure_environment(base_url: str, workdir: str) -> None:
+    """
+    Point the app at the fake LLM and keep its state out of the real data directory.
+    Runs in every session process, before anything imports the services,
+    which read Settings at import.
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+    # A zero budget disables budget enforcement
+    os.environ["AUDITBOT_TENANT_DAILY_BUDGET_USD"] = "0"
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+
+    from config.settings import Settings
+
+    Settings.CONVERSATION_DB_PATH = os.path.join(workdir, "conversations.db")
+    Settings.USAGE_DB_PATH = os.path.join(workdir, "usage.db")
+    Settings.RESULT_STORE_DIR = os.path.join(workdir, "results")
+
+
+def run_session(
+    agent: str, questions: List[str], turns: int, timeout: float, warmup: bool = True
+) -> Tuple[List[float], int, float, float]:
+    """
+    Simulate one auditor: open the app, select an agent and ask questions.
+    Runs in a session process of its own.
+
+    Args:
+        agent: Agent selected in the app
+        questions: Questions asked in turn
+        turns: Number of timed questions
+        timeout: Seconds allowed per script run
+        warmup: Ask one untimed question first, so imports and dataset
+            loading of the fresh process are not counted as turn latency
+
+    Returns:
+        Latency of every turn in seconds, the number of failed turns, and
+        the wall-clock times at which the timed turns started and ended
+    """
+    from streamlit.testing.v1 import AppTest
+
+    latencies: List[float] = []
+    errors = 0
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.session_state["selected_agent"] = agent
+    app.run()
+    if warmup:
+        app.chat_input[0].set_value(questions[-1]).run()
+    first_turn = time.time()
+    for turn in range(turns):
+        started = time.perf_counter()
+        try:
+            app.chat_input[0].set_value(questions[turn % len(questions)]).run()
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        if app.exception:
+            errors += 1
+    return latencies, errors, first_turn, time.time()
+
+
+def run_stage(
+    sessions: int,
+    agents: Dict[str, List[str]],
+    turns: int,
+    timeout: float,
+    base_url: str,
+    workdir: str,
+    warmup: bool = True,
+) -> Dict[str, float]:
+    """
+    Run `sessions` concurrent simulated auditors, spread over the agents,
+    each in a fresh process. Wall time and throughput are measured from
+    the first timed turn of any session to the last turn's end.
+
+    Returns:
+        Throughput, latency percentiles, memory and thread figures of the stage
+    """
+    names = list(agents)
+    baseline = process_status()
+    latencies: List[float] = []
+    errors = 0
+    # Fresh interpreters; forking would copy this process's running threads
+    context = multiprocessing.get_context("spawn")
+    with StatusSampler() as sampler, ProcessPoolExecutor(
+        max_workers=sessions,
+        mp_context=context,
+        initializer=configure_environment,
+        initargs=(base_url, workdir),
+    ) as pool:
+        futures = []
+        started, finished = math.inf, 0.0
+        for index in range(sessions):
+            agent = names[index % len(names)]
+            futures.append(pool.submit(run_session, agent, agents[agent], turns, timeout, warmup))
+        for future in futures:
+            session_latencies, session_errors, first_turn, last_turn = future.result()
+            latencies += session_latencies
+            errors += session_errors
+            started, finished = min(started, first_turn), max(finished, last_turn)
+    wall = max(0.0, finished - started)
+    return {
+        "sessions": sessions,
+        "turns": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "turns_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_s": round(percentile(latencies, 0.50), 2),
+        "p95_s": round(percentile(latencies, 0.95), 2),
+        "peak_rss_mb": round(sampler.peak["rss_mb"], 1),
+        "rss_per_session_mb": round(max(0.0, sampler.peak["rss_mb"] - baseline["rss_mb"]) / sessions, 2),
+        "peak_threads": int(sampler.peak["threads"]),
+    }
+
+
+def print_report(stages: List[Dict[str, float]]) -> None:
+    """Print the stage results as a table."""
+    columns = list(stages[0])
+    widths = {column: max(len(column), *(len(str(stage[column])) for stage in stages)) for column in columns}
+    print("  ".join(column.rjust(widths[column]) for column in columns))
+    for stage in stages:
+        print("  ".join(str(stage[column]).rjust(widths[column]) for column in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the ramp and report; returns the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="comma-separated concurrency stages")
+    parser.add_argument("--turns", type=int, default=3, help="questions per session")
+    parser.add_argument("--agents", default="", help="comma-separated agent names (default: all)")
+    parser.add_argument("--first-token", type=float, default=0.5, help="fake LLM seconds to first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="fake LLM seconds between chunks")
+    parser.add_argument("--no-tool-calls", action="store_true", help="fake LLM never calls tools")
+    parser.add_argument("--llm-url", default="", help="use a running OpenAI-compatible endpoint instead")
+    parser.add_argument("--port", type=int, default=9999, help="port of the fake LLM")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per script run")
+    parser.add_argument("--no-warmup", action="store_true", help="skip the untimed warm-up turn per session")
+    parser.add_argument("--max-p95", type=float, default=None, help="fail if the last stage's p95 exceeds this")
+    parser.add_argument("--json", default="", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    fake = None
+    base_url = args.llm_url
+    if not base_url:
+        fake = start_fake_llm(args.port, args.first_token, args.token_delay, not args.no_tool_calls)
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="auditbot-loadtest-") as workdir:
+            if REPO_ROOT not in sys.path:
+                sys.path.insert(0, REPO_ROOT)
+            from agents.registry import get_agent_registry
+
+            available = get_agent_registry().specs()
+            selected = [name.strip() for name in args.agents.split(",") if name.strip()] or list(available)
+            agents = {name: available[name].suggested_messages for name in selected}
+
+            stages = []
+            for sessions in (int(value) for value in args.sessions.split(",")):
+                stage = run_stage(
+                    sessions, agents, args.turns, args.timeout, base_url, workdir, not args.no_warmup
+                )
+                stages.append(stage)
+                print(f"stage {sessions:>3} sessions: {json.dumps(stage)}", flush=True)
+    finally:
+        if fake is not None:
+            fake.terminate()
+            fake.wait()
+
+    print()
+    print_report(stages)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(stages, handle, indent=2)
+    if args.max_p95 is not None and stages[-1]["p95_s"] > args.max_p95:
+        print(f"FAIL: p95 {stages[-1]['p95_s']}s exceeds {args.max_p95}s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,66 @@
 """
 Services module for Audit Bot AI.
 Contains the chat service and other business logic.
+
+Names are imported from their modules on first access, so importing one
+service (or an agent that needs it) does not load all the others.
 """
 
-from services.chat_service import ChatService
-from services.pandas_agent_service import PandasAgentService
+import importlib
+from typing import Any
+
+# Public name -> module defining it
+_EXPORTS = {
+    "AgentRunner": "services.agent_runner",
+    "AnalysisWorkspace": "services.analysis_workspace",
+    "AnswerCache": "services.answer_cache",
+    "ChatService": "services.chat_service",
+    "ConversationStore": "services.conversation_store",
+    "DataProfiler": "services.data_profiler",
+    "DatasetRegistry": "services.dataset_registry",
+    "DatasetStore": "services.dataset_store",
+    "IngestionService": "services.ingestion",
+    "LLMScheduler": "services.llm_scheduler",
+    "LicenseCostCalculator": "services.license_calculator",
+    "OrchestratorService": "services.orchestrator_service",
+    "OutputGovernor": "services.output_governor",
+    "PandasAgentService": "services.pandas_agent_service",
+    "Prefetcher": "services.prefetcher",
+    "ResultStore": "services.result_store",
+    "RiskProfileMatrix": "services.risk_profiles",
+    "RiskScoringEngine": "services.risk_scoring",
+    "SchedulerOverloaded": "services.llm_scheduler",
+    "TableResult": "services.result_store",
+    "UsageLedger": "services.usage_ledger",
+    "UserTimeline": "services.temporal_index",
+    "display_table": "services.result_store",
+    "get_answer_cache": "services.answer_cache",
+    "get_async_http_client": "services.async_runtime",
+    "get_conversation_store": "services.conversation_store",
+    "get_dataset_registry": "services.dataset_registry",
+    "get_dataset_store": "services.dataset_store",
+    "get_ingestion_service": "services.ingestion",
+    "get_loop": "services.async_runtime",
+    "get_prefetcher": "services.prefetcher",
+    "get_result_store": "services.result_store",
+    "get_risk_profiles": "services.risk_profiles",
+    "get_scheduler": "services.llm_scheduler",
+    "get_usage_ledger": "services.usage_ledger",
+    "get_user_timeline": "services.temporal_index",
+    "get_workspace_store": "services.analysis_workspace",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import a re-exported name from its module on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["ChatService", "PandasAgentService"]
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
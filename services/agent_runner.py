@@ -0,0 +1,215 @@
+"""
+Dispatches a question to the service that matches the agent type.
+"""
+
+from typing import AsyncGenerator, Dict, Generator, List, Optional, Tuple, Union
+
+from agents.base_agent import BaseAgent
+from services.analysis_workspace import LAST_RESULT, get_workspace_store
+from services.answer_cache import AnswerCache, CachedAnswer, get_answer_cache, reports_version
+from services.async_runtime import call_blocking, to_thread_iterator
+from services.chat_service import ChatService
+from services.conversation_store import get_conversation_store
+from services.llm_scheduler import current_tenant
+from services.metrics import get_metrics
+from services.orchestrator_service import OrchestratorService
+from services.pandas_agent_service import PandasAgentService
+from services.result_store import TableResult, get_result_store
+from services.usage_ledger import (
+    BUDGET_EXHAUSTED,
+    BUDGET_EXHAUSTED_MESSAGE,
+    get_usage_ledger,
+    usage_context,
+)
+
+
+class AgentRunner:
+    """Single entry point used by the Streamlit app and the API server to answer a question."""
+
+    @staticmethod
+    def stream_response(
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+        conversation_id: Optional[str] = None,
+    ) -> Generator[Union[str, TableResult], None, None]:
+        """
+        Stream the agent's answer to the last user message in the history.
+
+        Args:
+            agent: The agent answering the question
+            chat_history: The chat history ending with the new user message
+            conversation_id: Key of the conversation; pandas agents keep a
+                workspace of earlier results under it
+
+        Yields:
+            Chunks of the response content, then a TableResult for every
+            table shown to the user alongside the text
+        """
+        early = AgentRunner._early_answer(agent, chat_history, conversation_id)
+        if early is not None:
+            yield from early
+            return
+        with usage_context(agent.name, AgentRunner._kind(agent), chat_history[-1]["content"]):
+            yield from AgentRunner._dispatch(agent, chat_history, conversation_id)
+
+    @staticmethod
+    async def astream_response(
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+        conversation_id: Optional[str] = None,
+    ) -> AsyncGenerator[Union[str, TableResult], None]:
+        """
+        Async variant of stream_response() for callers on the shared LLM loop
+        (see services.async_runtime.aiterate). Chat and pandas answers run as
+        coroutines; orchestrated answers still fan out on their thread pool.
+
+        Args:
+            agent: The agent answering the question
+            chat_history: The chat history ending with the new user message
+            conversation_id: Key of the conversation for the pandas workspace
+
+        Yields:
+            Chunks of the response content, then the tables shown alongside it
+        """
+        # Ledger lookups and dataset loading block; they run on the loop's executor
+        early = await call_blocking(
+            AgentRunner._early_answer, agent, chat_history, conversation_id
+        )
+        if early is not None:
+            for chunk in early:
+                yield chunk
+            return
+        with usage_context(agent.name, AgentRunner._kind(agent), chat_history[-1]["content"]):
+            if agent.uses_orchestrator:
+                chunks = to_thread_iterator(
+                    lambda: OrchestratorService(AgentRunner.answer).stream_response(
+                        agent=agent,
+                        chat_history=chat_history,
+                    )
+                )
+            elif agent.uses_pandas_agent:
+                service = await call_blocking(AgentRunner._pandas_service, agent, conversation_id)
+                chunks = service.astream_response(chat_history[-1]["content"])
+            else:
+                service = await call_blocking(ChatService)
+                chunks = service.astream_response(agent=agent, chat_history=chat_history)
+            async for chunk in chunks:
+                yield chunk
+
+    @staticmethod
+    def _early_answer(
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+        conversation_id: Optional[str],
+    ) -> Optional[List[Union[str, TableResult]]]:
+        """Answer without the LLM when the tenant is over budget or the answer was prefetched."""
+        if get_usage_ledger().budget_state(current_tenant()) == BUDGET_EXHAUSTED:
+            # Over budget: serve this conversation's earlier answer to the same
+            # question in the same context and on the same report versions, if any
+            cached = None
+            if conversation_id:
+                previous, question = AnswerCache.context(chat_history)
+                cached = get_conversation_store().find_answer(
+                    conversation_id, question, previous, reports_version()
+                )
+            if cached:
+                return [f"_(Cached answer - today's usage budget is reached.)_\n\n{cached}"]
+            return [BUDGET_EXHAUSTED_MESSAGE]
+
+        cached = get_answer_cache().get(agent, chat_history)
+        if cached is None:
+            return None
+        if agent.uses_pandas_agent and conversation_id:
+            # The prefetcher answered without this conversation's workspace;
+            # give follow-ups the frame a live answer would have left there
+            if not AgentRunner._restore_workspace(conversation_id, chat_history[-1]["content"], cached):
+                get_metrics().increment("answer_cache.skipped", agent=agent.name)
+                return None
+        # Precomputed in the background by the prefetcher
+        get_metrics().increment("answer_cache.hit", agent=agent.name)
+        return [cached.text, *cached.tables]
+
+    @staticmethod
+    def _restore_workspace(conversation_id: str, question: str, cached: CachedAnswer) -> bool:
+        """
+        Save the last table of a cached pandas answer as the conversation's
+        last result. Answers without tables, or whose tables are gone, cannot
+        be restored and must be answered live.
+
+        Returns:
+            Whether the workspace now holds the answer's last result
+        """
+        if not cached.tables:
+            return False
+        frame = get_result_store().get(cached.tables[-1].handle, current_tenant())
+        if frame is None:
+            return False
+        workspace = get_workspace_store().get(conversation_id)
+        workspace.save(LAST_RESULT, frame, f"last result, for: {question[:120]}")
+        # Frames above the workspace limit are not saved
+        return LAST_RESULT in workspace and workspace[LAST_RESULT] is frame
+
+    @staticmethod
+    def _kind(agent: BaseAgent) -> str:
+        """Service kind the usage ledger attributes the agent's calls to."""
+        if agent.uses_orchestrator:
+            return "orchestrator"
+        if agent.uses_pandas_agent:
+            return "pandas"
+        return "chat"
+
+    @staticmethod
+    def _pandas_service(agent: BaseAgent, conversation_id: Optional[str]) -> PandasAgentService:
+        """Pandas agent service bound to the conversation's workspace, if any."""
+        return PandasAgentService(
+            dataframe=agent.dataframe,
+            agent=agent,
+            workspace=get_workspace_store().get(conversation_id) if conversation_id else None,
+        )
+
+    @staticmethod
+    def _dispatch(
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+        conversation_id: Optional[str],
+    ) -> Generator[Union[str, TableResult], None, None]:
+        """Stream the answer from the service that matches the agent type."""
+        if agent.uses_orchestrator:
+            # Fan out to the report agents and merge their answers
+            yield from OrchestratorService(AgentRunner.answer).stream_response(
+                agent=agent,
+                chat_history=chat_history,
+            )
+        elif agent.uses_pandas_agent:
+            # Use Pandas Agent for data analysis
+            pandas_service = AgentRunner._pandas_service(agent, conversation_id)
+            yield from pandas_service.stream_response(chat_history[-1]["content"])
+        else:
+            # Use regular chat service
+            yield from ChatService().stream_response(
+                agent=agent,
+                chat_history=chat_history,
+            )
+
+    @staticmethod
+    def answer(agent: BaseAgent, question: str) -> Tuple[str, List[TableResult]]:
+        """
+        Answer a standalone question without streaming.
+
+        Args:
+            agent: The agent answering the question
+            question: A self-contained question
+
+        Returns:
+            The full answer text and the tables shown alongside it
+        """
+        text, tables = "", []
+        for chunk in AgentRunner.stream_response(
+            agent=agent,
+            chat_history=[{"role": "user", "content": question}],
+        ):
+            if isinstance(chunk, TableResult):
+                tables.append(chunk)
+            else:
+                text += chunk
+        return text, tables
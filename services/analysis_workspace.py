@@ -0,0 +1,207 @@
+"""
+Per-conversation workspace of named intermediate frames, so follow-up
+questions build on earlier pandas agent results instead of recomputing them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from config.settings import Settings
+
+
+Frame = Union[pd.DataFrame, pd.Series]
+
+# Name under which the last frame returned by the Python tool is kept
+LAST_RESULT = "last"
+
+
+def _frame_bytes(frame: Frame) -> int:
+    usage = frame.memory_usage(deep=True)
+    return int(usage.sum()) if isinstance(frame, pd.DataFrame) else int(usage)
+
+
+class AnalysisWorkspace:
+    """
+    Named frames of one conversation, exposed to the pandas agent as `ws`.
+    Bounded by frame count and bytes; the least recently used frames are
+    evicted first.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = Settings.WORKSPACE_MAX_BYTES,
+        max_frames: int = Settings.WORKSPACE_MAX_FRAMES,
+    ):
+        """
+        Initialize an empty workspace.
+
+        Args:
+            max_bytes: Upper bound of the summed frame size
+            max_frames: Maximum number of named frames
+        """
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self.last_access = time.monotonic()
+        self._lock = threading.Lock()
+        # name -> (frame, size in bytes, note)
+        self._frames: "OrderedDict[str, Tuple[Frame, int, str]]" = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Summed size of the frames held."""
+        return self._bytes
+
+    def save(self, name: str, frame: Frame, note: str = "") -> str:
+        """
+        Keep a frame under a name for later turns, replacing any previous one.
+
+        Args:
+            name: Short identifier, e.g. 'executed_high_risks'
+            frame: DataFrame or Series to keep
+            note: What the frame contains, e.g. the filter that produced it
+
+        Returns:
+            Confirmation text for the agent
+        """
+        if not isinstance(frame, (pd.DataFrame, pd.Series)):
+            raise TypeError("Only DataFrames and Series can be saved to the workspace")
+        size = _frame_bytes(frame)
+        if size > self.max_bytes:
+            return f"Not saved: {name!r} needs {size:,} bytes, above the workspace limit of {self.max_bytes:,}."
+        with self._lock:
+            self._discard(name)
+            self._frames[name] = (frame, size, note)
+            self._bytes += size
+            while len(self._frames) > 1 and (
+                self._bytes > self.max_bytes or len(self._frames) > self.max_frames
+            ):
+                self._discard(next(iter(self._frames)))
+            self.last_access = time.monotonic()
+        return f"Saved {name!r} ({len(frame):,} rows) to the workspace."
+
+    def _discard(self, name: str) -> None:
+        entry = self._frames.pop(name, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def __getitem__(self, name: str) -> Frame:
+        with self._lock:
+            if name not in self._frames:
+                available = ", ".join(self._frames) or "none"
+                raise KeyError(f"No frame {name!r} in the workspace. Available: {available}")
+            self._frames.move_to_end(name)
+            self.last_access = time.monotonic()
+            return self._frames[name][0]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._frames
+
+    def names(self) -> List[str]:
+        """Names of the frames held, least recently used first."""
+        return list(self._frames)
+
+    def describe(self, max_columns: int = 8) -> str:
+        """
+        Compact description of the workspace for the agent's input.
+
+        Args:
+            max_columns: Columns listed per frame before eliding the rest
+
+        Returns:
+            One line per frame, or "" when the workspace is empty
+        """
+        with self._lock:
+            entries = list(self._frames.items())
+        if not entries:
+            return ""
+        lines = ["WORKSPACE (frames from earlier turns, available as ws['name']):"]
+        for name, (frame, _, note) in entries:
+            columns = frame.columns if isinstance(frame, pd.DataFrame) else [frame.name]
+            columns = [str(column) for column in columns]
+            listed = ", ".join(columns[:max_columns]) + (", ..." if len(columns) > max_columns else "")
+            line = f"- {name}: {len(frame):,} rows [{listed}]"
+            if note:
+                line += f" - {note}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class WorkspaceStore:
+    """
+    Workspaces of all active conversations in the process.
+    Idle workspaces are dropped, and the least recently used ones are evicted
+    once the total size exceeds the limit.
+    """
+
+    def __init__(
+        self,
+        total_max_bytes: int = Settings.WORKSPACE_TOTAL_MAX_BYTES,
+        idle_seconds: int = Settings.WORKSPACE_IDLE_SECONDS,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            total_max_bytes: Upper bound of the size of all workspaces together
+            idle_seconds: Seconds after which an untouched workspace is dropped
+        """
+        self.total_max_bytes = total_max_bytes
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._workspaces: "OrderedDict[str, AnalysisWorkspace]" = OrderedDict()
+
+    def get(self, conversation_id: str) -> AnalysisWorkspace:
+        """
+        Return the workspace of a conversation, creating it if needed.
+
+        Args:
+            conversation_id: Conversation key
+
+        Returns:
+            The conversation's workspace
+        """
+        with self._lock:
+            self._evict()
+            workspace = self._workspaces.get(conversation_id)
+            if workspace is None:
+                workspace = AnalysisWorkspace()
+                self._workspaces[conversation_id] = workspace
+            workspace.last_access = time.monotonic()
+            self._workspaces.move_to_end(conversation_id)
+            return workspace
+
+    def _evict(self) -> None:
+        """Drop idle workspaces, then the oldest ones beyond the total size."""
+        cutoff = time.monotonic() - self.idle_seconds
+        for key in [key for key, ws in self._workspaces.items() if ws.last_access < cutoff]:
+            del self._workspaces[key]
+        total = sum(workspace.nbytes for workspace in self._workspaces.values())
+        while self._workspaces and total > self.total_max_bytes:
+            _, evicted = self._workspaces.popitem(last=False)
+            total -= evicted.nbytes
+
+    def stats(self) -> Dict[str, int]:
+        """Number of workspaces and bytes held."""
+        with self._lock:
+            return {
+                "workspaces": len(self._workspaces),
+                "bytes": sum(workspace.nbytes for workspace in self._workspaces.values()),
+            }
+
+
+_store: Optional[WorkspaceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_workspace_store() -> WorkspaceStore:
+    """Return the process-wide workspace store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WorkspaceStore()
+        return _store
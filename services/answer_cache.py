@@ -0,0 +1,125 @@
+"""
+Cache of precomputed answers, checked by the chat path before running an agent.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from agents.base_agent import BaseAgent
+from config.settings import Settings
+from services.dataset_registry import REPORT_LABELS, report_path
+from services.dataset_store import get_dataset_store
+from services.result_store import TableResult
+
+
+# (agent name, reports version, previous question, question)
+AnswerKey = Tuple[str, str, str, str]
+
+
+def normalise(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question."""
+    return " ".join(question.lower().split())
+
+
+def reports_version() -> str:
+    """
+    Combined fingerprint of all report files. Tools of one agent read other
+    reports too (e.g. risk scoring), so any report change invalidates answers.
+    """
+    store = get_dataset_store()
+    versions = []
+    for report_type in REPORT_LABELS:
+        path = report_path(report_type)
+        versions.append(store.version(path) if os.path.exists(path) else "missing")
+    return ":".join(versions)
+
+
+class CachedAnswer:
+    """A complete answer: narrative text and the tables shown with it."""
+
+    __slots__ = ("text", "tables")
+
+    def __init__(self, text: str, tables: List[TableResult]):
+        self.text = text
+        self.tables = tables
+
+
+class AnswerCache:
+    """
+    LRU of answers keyed by agent, report versions, the previous question of
+    the conversation and the question itself. Self-contained questions (the
+    agent's suggestions) also match regardless of what was asked before.
+    """
+
+    def __init__(self, max_entries: int = Settings.ANSWER_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Answers kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._answers: "OrderedDict[AnswerKey, CachedAnswer]" = OrderedDict()
+
+    @staticmethod
+    def key(agent_name: str, previous_question: str, question: str) -> AnswerKey:
+        """Cache key of a question asked after `previous_question` ('' for openers)."""
+        return agent_name, reports_version(), normalise(previous_question), normalise(question)
+
+    @staticmethod
+    def context(chat_history: List[Dict[str, str]]) -> Tuple[str, str]:
+        """(previous user question or '', last user question) of a chat history."""
+        questions = [message["content"] for message in chat_history if message["role"] == "user"]
+        return (questions[-2] if len(questions) > 1 else ""), questions[-1]
+
+    def __contains__(self, key: AnswerKey) -> bool:
+        return key in self._answers
+
+    def put(self, key: AnswerKey, answer: CachedAnswer) -> None:
+        """Store an answer, evicting the least recently used beyond the limit."""
+        with self._lock:
+            self._answers[key] = answer
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_entries:
+                self._answers.popitem(last=False)
+
+    def _lookup(self, key: AnswerKey) -> Optional[CachedAnswer]:
+        with self._lock:
+            answer = self._answers.get(key)
+            if answer is not None:
+                self._answers.move_to_end(key)
+            return answer
+
+    def get(self, agent: BaseAgent, chat_history: List[Dict[str, str]]) -> Optional[CachedAnswer]:
+        """
+        Cached answer to the last user message, if any.
+
+        Args:
+            agent: The agent asked
+            chat_history: The chat history ending with the new user message
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        previous, question = self.context(chat_history)
+        answer = self._lookup(self.key(agent.name, previous, question))
+        suggestions = {normalise(suggestion) for suggestion in agent.suggested_messages}
+        if answer is None and previous and normalise(question) in suggestions:
+            answer = self._lookup(self.key(agent.name, "", question))
+        return answer
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
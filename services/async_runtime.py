@@ -0,0 +1,317 @@
+"""
+Process-wide event loop for LLM I/O.
+
+Every LLM request and agent run executes as a task on one event loop thread
+with one shared async HTTP client, so a waiting stream costs a coroutine
+instead of an OS thread. Blocking callers (Streamlit script threads, worker
+pools) receive results and stream chunks through bounded hand-offs.
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, Optional, TypeVar
+
+import httpx
+
+from config.settings import Settings
+from services.llm_scheduler import current_queue_callback, current_tenant, scheduling_context
+
+
+T = TypeVar("T")
+
+# Kinds of items handed from the loop to a consumer
+_CHUNK = "chunk"
+_CALL = "call"
+_ERROR = "error"
+_DONE = "done"
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_client: Optional[httpx.AsyncClient] = None
+_stream_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting its thread on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            # Blocking work started from the loop (tools, ledger writes) runs here
+            loop.set_default_executor(
+                ThreadPoolExecutor(
+                    max_workers=Settings.LLM_LOOP_EXECUTOR_WORKERS,
+                    thread_name_prefix="llm-loop-exec",
+                )
+            )
+            _thread = threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True)
+            _thread.start()
+            _loop = loop
+        return _loop
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the HTTP client shared by all LLM requests; it lives on the shared loop."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = httpx.AsyncClient(
+                timeout=Settings.LLM_REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=Settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Settings.LLM_HTTP_MAX_KEEPALIVE,
+                ),
+            )
+        return _client
+
+
+def get_stream_executor() -> ThreadPoolExecutor:
+    """
+    Return the pool driving blocking generators for the loop (see
+    to_thread_iterator). It is kept apart from the loop's default executor:
+    such a generator waits on work that needs the default executor (ledger
+    writes, tools), so sharing one pool deadlocks once every thread is held
+    by a waiting generator.
+    """
+    global _stream_executor
+    with _lock:
+        if _stream_executor is None:
+            _stream_executor = ThreadPoolExecutor(
+                max_workers=Settings.LLM_LOOP_STREAM_WORKERS,
+                thread_name_prefix="llm-loop-stream",
+            )
+        return _stream_executor
+
+
+def on_loop_thread() -> bool:
+    """Whether the caller runs on the shared loop's thread."""
+    return _thread is not None and threading.current_thread() is _thread
+
+
+def submit(coroutine: Coroutine[Any, Any, T]) -> "Future[T]":
+    """
+    Start a coroutine on the shared loop in a copy of the caller's context,
+    so tenant, usage attribution and table sinks follow it.
+
+    Args:
+        coroutine: The coroutine to run
+
+    Returns:
+        Future of its result; cancelling the future cancels the task
+    """
+    loop = get_loop()
+    context = contextvars.copy_context()
+    future: "Future[T]" = Future()
+
+    def start() -> None:
+        if future.cancelled():
+            coroutine.close()
+            return
+        task = loop.create_task(coroutine, context=context)
+
+        def finish(done: asyncio.Task) -> None:
+            if future.cancelled():
+                return
+            if done.cancelled():
+                future.cancel()
+            elif done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                future.set_result(done.result())
+
+        def propagate(done: "Future[T]") -> None:
+            if done.cancelled():
+                loop.call_soon_threadsafe(task.cancel)
+
+        task.add_done_callback(finish)
+        future.add_done_callback(propagate)
+
+    loop.call_soon_threadsafe(start)
+    return future
+
+
+def run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the shared loop and block until it finishes.
+
+    Raises:
+        RuntimeError: If called from the loop thread, which would deadlock
+    """
+    if on_loop_thread():
+        coroutine.close()
+        raise RuntimeError("Blocking call made on the LLM event loop; await the async variant")
+    return submit(coroutine).result()
+
+
+async def _pump(
+    source: AsyncIterator[T],
+    deliver: Callable[[tuple], None],
+    space: asyncio.Semaphore,
+) -> None:
+    """
+    Copy an async iterator's items to a consumer, waiting for buffer space
+    before each chunk. Queue positions are relayed so the consumer's callback
+    runs on its own thread (Streamlit UI calls only work there).
+    """
+    callback = current_queue_callback()
+    try:
+        if callback is not None:
+
+            def relay(position: int) -> None:
+                deliver((_CALL, lambda: callback(position)))
+
+            with scheduling_context(current_tenant(), on_queue=relay):
+                await _drain(source, deliver, space)
+        else:
+            await _drain(source, deliver, space)
+        deliver((_DONE, None))
+    except asyncio.CancelledError:
+        raise
+    except BaseException as error:
+        deliver((_ERROR, error))
+    finally:
+        close = getattr(source, "aclose", None)
+        if close is not None:
+            await close()
+
+
+async def _drain(
+    source: AsyncIterator[T], deliver: Callable[[tuple], None], space: asyncio.Semaphore
+) -> None:
+    async for item in source:
+        await space.acquire()
+        deliver((_CHUNK, item))
+
+
+def iterate(source: AsyncIterator[T], buffer: int = Settings.LLM_STREAM_BUFFER) -> Iterator[T]:
+    """
+    Consume an async iterator from a blocking thread. The iterator runs on
+    the shared loop; at most `buffer` chunks wait for the consumer.
+
+    Args:
+        source: Async iterator (e.g. an async generator) to drive
+        buffer: Chunks buffered before the producer waits
+
+    Yields:
+        The iterator's items, in order; its exceptions are re-raised here
+    """
+    if on_loop_thread():
+        raise RuntimeError("Blocking iteration on the LLM event loop; use `async for`")
+    loop = get_loop()
+    items: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+    space = asyncio.Semaphore(buffer)
+    future = submit(_pump(source, items.put, space))
+    try:
+        while True:
+            kind, payload = items.get()
+            if kind == _CHUNK:
+                loop.call_soon_threadsafe(space.release)
+                yield payload
+            elif kind == _CALL:
+                payload()
+            elif kind == _ERROR:
+                raise payload
+            else:
+                return
+    finally:
+        # The consumer may stop early; cancel the producer
+        future.cancel()
+
+
+async def aiterate(source: AsyncIterator[T], buffer: int = Settings.LLM_STREAM_BUFFER) -> AsyncIterator[T]:
+    """
+    Consume an async iterator from another event loop (e.g. the API server's)
+    without a worker thread. The iterator runs on the shared loop, where the
+    HTTP client lives.
+
+    Args:
+        source: Async iterator to drive
+        buffer: Chunks buffered before the producer waits
+
+    Yields:
+        The iterator's items, in order; its exceptions are re-raised here
+    """
+    loop = get_loop()
+    consumer = asyncio.get_running_loop()
+    items: "asyncio.Queue[tuple]" = asyncio.Queue()
+    space = asyncio.Semaphore(buffer)
+
+    def deliver(item: tuple) -> None:
+        consumer.call_soon_threadsafe(items.put_nowait, item)
+
+    future = submit(_pump(source, deliver, space))
+    try:
+        while True:
+            kind, payload = await items.get()
+            if kind == _CHUNK:
+                loop.call_soon_threadsafe(space.release)
+                yield payload
+            elif kind == _CALL:
+                payload()
+            elif kind == _ERROR:
+                raise payload
+            else:
+                return
+    finally:
+        future.cancel()
+
+
+async def to_thread_iterator(
+    factory: Callable[[], Iterator[T]], executor: Optional[Executor] = None
+) -> AsyncIterator[T]:
+    """
+    Drive a blocking generator on the stream executor, for code paths that
+    are not async yet. Uses one thread of that pool for the whole iteration.
+
+    Args:
+        factory: Zero-argument callable returning the generator
+        executor: Pool to use instead of the stream executor
+
+    Yields:
+        The generator's items
+    """
+    loop = asyncio.get_running_loop()
+    items: "asyncio.Queue[tuple]" = asyncio.Queue(maxsize=Settings.LLM_STREAM_BUFFER)
+    stopped = threading.Event()
+
+    def put(item: tuple) -> None:
+        asyncio.run_coroutine_threadsafe(items.put(item), loop).result()
+
+    def pump() -> None:
+        try:
+            for chunk in factory():
+                if stopped.is_set():
+                    return
+                put((_CHUNK, chunk))
+            put((_DONE, None))
+        except BaseException as error:
+            put((_ERROR, error))
+
+    context = contextvars.copy_context()
+    worker = loop.run_in_executor(executor or get_stream_executor(), context.run, pump)
+    try:
+        while True:
+            kind, payload = await items.get()
+            if kind == _CHUNK:
+                yield payload
+            elif kind == _ERROR:
+                raise payload
+            else:
+                return
+    finally:
+        stopped.set()
+        # Keep draining so the worker is never blocked on a full queue
+        while not worker.done():
+            while not items.empty():
+                items.get_nowait()
+            await asyncio.sleep(0.05)
+
+
+async def call_blocking(fn: Callable[..., T], *args: Any) -> T:
+    """Run a blocking function on the loop's executor in the caller's context."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, fn, *args)
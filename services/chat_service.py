@@ -2,21 +2,32 @@
 Chat service handling LLM interactions.
 """
 
+import logging
 import streamlit as st
-from typing import List, Dict, Generator, Any
+from typing import List, Dict, Generator, Any, AsyncGenerator, Union
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 
 from config.settings import Settings
 from agents.base_agent import BaseAgent
+from services.async_runtime import iterate
+from services.llm import create_llm
+from services.llm_scheduler import SchedulerOverloaded
+from services.resilience import DEADLINE_MESSAGE, LLMDeadlineExceeded
+from services.result_store import TableResult, collect_tables
 
 
+logger = logging.getLogger("auditbot.chat")
+
 class ChatService:
     """
     Service class for handling chat interactions with the LLM.
     Manages message conversion and streaming responses.
     """
 
+    # Upper bound on tool-call rounds before the answer must be narrated
+    MAX_TOOL_ROUNDS = 3
+
     def __init__(self):
         """Initialize the chat service with LangChain ChatOpenAI."""
         self._validate_api_key()
@@ -24,20 +35,16 @@ class ChatService:
 
     def _validate_api_key(self) -> None:
         """Validate that OpenAI API key is configured."""
-        if "OPENAI_API_KEY" not in st.secrets:
+        if not Settings.get_openai_api_key():
             st.error(
-                "OpenAI API Key not found. Please set `OPENAI_API_KEY` in `.streamlit/secrets.toml`."
+                "OpenAI API Key not found. Please set `OPENAI_API_KEY` in the environment or `.streamlit/secrets.toml`."
             )
             st.stop()
 
     def _initialize_llm(self) -> ChatOpenAI:
         """Initialize and return the LangChain ChatOpenAI instance."""
         try:
-            return ChatOpenAI(
-                model=Settings.OPENAI_MODEL,
-                api_key=st.secrets["OPENAI_API_KEY"],
-                streaming=True,
-            )
+            return create_llm(streaming=True)
         except Exception as e:
             st.error(f"Error initializing LangChain: {e}")
             st.stop()
@@ -71,28 +78,115 @@ class ChatService:
         self,
         agent: BaseAgent,
         chat_history: List[Dict[str, str]],
-    ) -> Generator[str, None, None]:
+    ) -> Generator[Union[str, TableResult], None, None]:
         """
         Stream a response from the LLM.
+        The conversation runs on the shared LLM event loop; this thread only
+        receives its chunks.
 
         Args:
             agent: The current agent providing the system prompt
             chat_history: The chat history including the new user message
 
+        Tool calls requested by the LLM are executed locally and their
+        results fed back before the final answer is streamed.
+
         Yields:
-            Chunks of the response content
+            Chunks of the response content, then the tables the tools displayed
         """
-        system_prompt = agent.get_system_prompt()
-        messages = self._convert_messages(system_prompt, chat_history)
-
         try:
-            stream = self.llm.stream(messages)
-            for chunk in stream:
-                if hasattr(chunk, "content"):
-                    yield chunk.content
+            yield from iterate(self._answer(agent, chat_history))
+        except SchedulerOverloaded:
+            yield SchedulerOverloaded.USER_MESSAGE
+        except LLMDeadlineExceeded:
+            yield DEADLINE_MESSAGE
         except ValueError as e:
             st.error(f"Configuration error: {e}")
             yield "I encountered a configuration error. Please check your API settings."
         except Exception as e:
             st.error(f"Error generating response: {e}")
             yield "I encountered an error while processing your request. Please try again."
+
+    async def astream_response(
+        self,
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+    ) -> AsyncGenerator[Union[str, TableResult], None]:
+        """
+        Async variant of stream_response() for callers on the shared LLM loop.
+        There is no Streamlit page to show errors on, so they are logged.
+
+        Args:
+            agent: The current agent providing the system prompt
+            chat_history: The chat history including the new user message
+
+        Yields:
+            Chunks of the response content, then the tables the tools displayed
+        """
+        try:
+            async for chunk in self._answer(agent, chat_history):
+                yield chunk
+        except SchedulerOverloaded:
+            yield SchedulerOverloaded.USER_MESSAGE
+        except LLMDeadlineExceeded:
+            yield DEADLINE_MESSAGE
+        except ValueError:
+            logger.exception("Configuration error answering with %s", agent.name)
+            yield "I encountered a configuration error. Please check your API settings."
+        except Exception:
+            logger.exception("Error answering with %s", agent.name)
+            yield "I encountered an error while processing your request. Please try again."
+
+    async def _answer(
+        self,
+        agent: BaseAgent,
+        chat_history: List[Dict[str, str]],
+    ) -> AsyncGenerator[Union[str, TableResult], None]:
+        """Run the tool rounds and the final answer; errors propagate to the caller."""
+        system_prompt = agent.get_system_prompt()
+        messages = self._convert_messages(system_prompt, chat_history)
+        tools = {tool.name: tool for tool in agent.get_tools()}
+        llm = self.llm.bind_tools(list(tools.values())) if tools else self.llm
+
+        with collect_tables() as tables:
+            for round_index in range(self.MAX_TOOL_ROUNDS + 1):
+                # The final round runs without tools so the LLM must answer
+                round_llm = llm if round_index < self.MAX_TOOL_ROUNDS else self.llm
+                gathered = None
+                async for chunk in round_llm.astream(messages):
+                    gathered = chunk if gathered is None else gathered + chunk
+                    if hasattr(chunk, "content") and chunk.content:
+                        yield chunk.content
+
+                if gathered is None or not getattr(gathered, "tool_calls", None):
+                    break
+
+                messages.append(gathered)
+                messages.extend(await self._run_tools(tools, gathered.tool_calls))
+        for table in tables:
+            yield table
+
+    async def _run_tools(self, tools: Dict[str, Any], tool_calls: List[Dict]) -> List[ToolMessage]:
+        """
+        Execute the tool calls requested by the LLM.
+        Tools are blocking pandas code; LangChain runs them on the loop's
+        executor in the current context, so displayed tables are collected.
+
+        Args:
+            tools: Mapping of tool name to tool instance
+            tool_calls: Tool calls parsed from the LLM response
+
+        Returns:
+            One ToolMessage per call carrying the tool output or error text
+        """
+        results = []
+        for call in tool_calls:
+            tool = tools.get(call["name"])
+            try:
+                if tool is None:
+                    raise ValueError(f"Unknown tool: {call['name']}")
+                output = await tool.ainvoke(call["args"])
+            except Exception as e:
+                output = f"Tool error: {e}"
+            results.append(ToolMessage(content=str(output), tool_call_id=call["id"]))
+        return results
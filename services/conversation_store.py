@@ -0,0 +1,303 @@
+"""
+Persistent conversation store backed by local SQLite.
+Keeps only a bounded window of recent messages per active session in memory.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import Settings
+
+
+# (message id, role, content, tables JSON or None) - tuples keep the in-memory window compact
+StoredMessage = Tuple[int, str, str, Optional[str]]
+
+
+class _Window:
+    """In-memory view over the most recent messages of one conversation."""
+
+    __slots__ = ("messages", "limit", "has_older", "last_access")
+
+    def __init__(self, messages: List[StoredMessage], limit: int, has_older: bool):
+        self.messages = messages
+        self.limit = limit
+        self.has_older = has_older
+        self.last_access = time.monotonic()
+
+
+class ConversationStore:
+    """
+    SQLite-backed chat history shared by all sessions of the process.
+    Conversations survive restarts; idle sessions are evicted from memory.
+    """
+
+    def __init__(
+        self,
+        db_path: str = Settings.CONVERSATION_DB_PATH,
+        window_size: int = Settings.CONVERSATION_WINDOW,
+        idle_seconds: int = Settings.CONVERSATION_IDLE_SECONDS,
+        max_sessions: int = Settings.CONVERSATION_MAX_SESSIONS,
+    ):
+        """
+        Initialize the store and create the schema if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+            window_size: Number of recent messages kept in memory per conversation
+            idle_seconds: Seconds after which an untouched window is evicted
+            max_sessions: Maximum number of windows held in memory
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.window_size = window_size
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                tables TEXT,
+                reports_version TEXT
+            )
+            """
+        )
+        # Databases created before these were stored lack the columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        for column in ("tables", "reports_version"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE messages ADD COLUMN {column} TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_messages_conversation "
+            "ON messages (conversation_id, id)"
+        )
+        self._conn.commit()
+
+    def _fetch(
+        self, conversation_id: str, limit: int, before_id: Optional[int] = None
+    ) -> Tuple[List[StoredMessage], bool]:
+        """Fetch up to `limit` messages older than `before_id`, oldest first."""
+        query = "SELECT id, role, content, tables FROM messages WHERE conversation_id = ?"
+        params: list = [conversation_id]
+        if before_id is not None:
+            query += " AND id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self._conn.execute(query, params).fetchall()
+        has_older = len(rows) > limit
+        return [tuple(row) for row in reversed(rows[:limit])], has_older
+
+    def _window(self, conversation_id: str) -> _Window:
+        """Return the in-memory window, loading it from SQLite if evicted."""
+        window = self._windows.get(conversation_id)
+        if window is None:
+            messages, has_older = self._fetch(conversation_id, self.window_size)
+            window = _Window(messages, self.window_size, has_older)
+            self._windows[conversation_id] = window
+        window.last_access = time.monotonic()
+        self._windows.move_to_end(conversation_id)
+        self._evict()
+        return window
+
+    def _evict(self) -> None:
+        """Drop idle windows and enforce the in-memory session cap."""
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if window.last_access >= cutoff and len(self._windows) <= self.max_sessions:
+                break
+            del self._windows[key]
+
+    def append(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        tables: Optional[List[Dict[str, Any]]] = None,
+        reports_version: Optional[str] = None,
+    ) -> None:
+        """
+        Persist a message and add it to the conversation's window.
+
+        Args:
+            conversation_id: Conversation key
+            role: 'user' or 'assistant'
+            content: Message text
+            tables: Serialised TableResult references shown with the message
+            reports_version: Report versions an answer was computed from
+        """
+        encoded = json.dumps(tables) if tables else None
+        with self._lock:
+            # Load the window first so a cold window does not fetch the new row too
+            window = self._window(conversation_id)
+            cursor = self._conn.execute(
+                "INSERT INTO messages "
+                "(conversation_id, role, content, created_at, tables, reports_version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (conversation_id, role, content, time.time(), encoded, reports_version),
+            )
+            self._conn.commit()
+            window.messages.append((cursor.lastrowid, role, content, encoded))
+            overflow = len(window.messages) - window.limit
+            if overflow > 0:
+                del window.messages[:overflow]
+                window.has_older = True
+
+    def messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """
+        Return the messages in the conversation's active window.
+
+        Args:
+            conversation_id: Conversation key
+
+        Returns:
+            List of message dicts with 'role' and 'content', plus 'tables'
+            when the message displayed any, oldest first
+        """
+        with self._lock:
+            window = self._window(conversation_id)
+            stored = list(window.messages)
+        messages = []
+        for _, role, content, tables in stored:
+            message: Dict[str, Any] = {"role": role, "content": content}
+            if tables:
+                message["tables"] = json.loads(tables)
+            messages.append(message)
+        return messages
+
+    def find_answer(
+        self,
+        conversation_id: str,
+        question: str,
+        previous_question: Optional[str],
+        reports_version: str,
+    ) -> Optional[str]:
+        """
+        Most recent answer in this conversation to the same question, asked
+        after the same previous question and computed from the same report
+        versions. Used to serve cached answers when fresh LLM calls are not allowed.
+
+        Args:
+            conversation_id: Conversation key; answers never cross conversations
+            question: Question text (compared case- and whitespace-insensitively)
+            previous_question: The user question before it, or None for an opener
+            reports_version: Current report versions (see answer_cache.reports_version)
+
+        Returns:
+            The answer text, or None if no such answer exists
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT answer.content FROM messages AS asked
+                JOIN messages AS answer
+                  ON answer.conversation_id = asked.conversation_id
+                 AND answer.id = (
+                     SELECT MIN(id) FROM messages
+                     WHERE conversation_id = asked.conversation_id AND id > asked.id
+                 )
+                WHERE asked.role = 'user' AND answer.role = 'assistant'
+                  AND asked.conversation_id = ?
+                  AND lower(trim(asked.content)) = ?
+                  AND answer.reports_version = ?
+                  AND COALESCE((
+                      SELECT lower(trim(content)) FROM messages
+                      WHERE conversation_id = asked.conversation_id AND id < asked.id
+                        AND role = 'user'
+                      ORDER BY id DESC LIMIT 1
+                  ), '') = ?
+                ORDER BY asked.id DESC LIMIT 1
+                """,
+                (
+                    conversation_id,
+                    question.strip().lower(),
+                    reports_version,
+                    (previous_question or "").strip().lower(),
+                ),
+            ).fetchone()
+        return row[0] if row else None
+
+    def likely_follow_ups(self, agent_name: str, question: str, limit: int = 3) -> List[str]:
+        """
+        Questions most often asked right after the given one, in any
+        conversation with the agent.
+
+        Args:
+            agent_name: Agent the questions were asked of
+            question: Question text (compared case- and whitespace-insensitively)
+            limit: Maximum number of follow-ups
+
+        Returns:
+            Follow-up questions, most frequent first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT MAX(next.content), COUNT(*) AS times FROM messages AS asked
+                JOIN messages AS next
+                  ON next.conversation_id = asked.conversation_id
+                 AND next.id = (
+                     SELECT MIN(id) FROM messages
+                     WHERE conversation_id = asked.conversation_id AND id > asked.id AND role = 'user'
+                 )
+                WHERE asked.role = 'user'
+                  AND asked.conversation_id LIKE ?
+                  AND lower(trim(asked.content)) = ?
+                GROUP BY lower(trim(next.content))
+                ORDER BY times DESC LIMIT ?
+                """,
+                (f"%:{agent_name}", question.strip().lower(), limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def has_older(self, conversation_id: str) -> bool:
+        """Whether messages older than the active window exist in SQLite."""
+        with self._lock:
+            return self._window(conversation_id).has_older
+
+    def load_older(self, conversation_id: str, count: int = Settings.CONVERSATION_PAGE_SIZE) -> int:
+        """
+        Extend the active window backwards by up to `count` messages.
+
+        Args:
+            conversation_id: Conversation key
+            count: Number of older messages to load
+
+        Returns:
+            Number of messages loaded
+        """
+        with self._lock:
+            window = self._window(conversation_id)
+            before_id = window.messages[0][0] if window.messages else None
+            older, has_older = self._fetch(conversation_id, count, before_id)
+            window.messages[:0] = older
+            window.limit += len(older)
+            window.has_older = has_older
+            return len(older)
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Return the process-wide conversation store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore()
+        return _store
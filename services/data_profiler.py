@@ -0,0 +1,140 @@
+"""
+Derives a token-budgeted data context from a loaded report frame.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import Settings
+from services.tokens import estimate_tokens
+
+
+class DataProfiler:
+    """
+    Profiles a DataFrame (column metadata, cardinalities, value distributions,
+    samples) and renders it as prompt text that fits a token budget.
+    Rendered profiles are cached per dataset fingerprint and budget.
+    """
+
+    # Columns with at most this many distinct values list their full distribution
+    LOW_CARDINALITY = 12
+
+    # Degradation ladder tried in order until the profile fits the budget:
+    # (top values per column, sample rows)
+    DETAIL_LEVELS = [(8, 5), (5, 3), (3, 2), (3, 0), (0, 0)]
+
+    _cache: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def describe(
+        cls,
+        df: pd.DataFrame,
+        fingerprint: str,
+        title: str,
+        token_budget: int = Settings.DATA_CONTEXT_TOKEN_BUDGET,
+    ) -> str:
+        """
+        Return the profile text for a frame, computing it once per fingerprint.
+
+        Args:
+            df: The report frame
+            fingerprint: Dataset version identifying the frame's contents
+            title: Human-readable dataset name used in the header
+            token_budget: Maximum tokens the profile may use
+
+        Returns:
+            Profile text ready to embed in a system prompt
+        """
+        key = (fingerprint, title, token_budget)
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        text = cls._render_within_budget(df, title, token_budget)
+
+        with cls._lock:
+            cls._cache[key] = text
+            while len(cls._cache) > Settings.DATA_CONTEXT_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _column_stats(df: pd.DataFrame) -> pd.DataFrame:
+        """Per-column dtype, non-null count and cardinality in vectorised passes."""
+        return pd.DataFrame(
+            {
+                "dtype": df.dtypes.astype(str),
+                "non_null": df.notna().sum(),
+                "unique": df.nunique(dropna=True),
+            }
+        )
+
+    @classmethod
+    def _value_summary(cls, series: pd.Series, unique: int, top: int) -> str:
+        """Short description of a column's values."""
+        non_null = series.dropna()
+        if non_null.empty:
+            return "all null"
+        if pd.api.types.is_bool_dtype(series) or not (
+            pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+        ):
+            if unique == 1:
+                return f"always {non_null.iloc[0]!r}"
+            limit = unique if unique <= cls.LOW_CARDINALITY else top
+            if limit == 0:
+                return f"{unique:,} distinct values"
+            counts = non_null.value_counts().head(limit)
+            listed = ", ".join(f"{value!r} ({count:,})" for value, count in counts.items())
+            more = "" if unique <= limit else f", ... {unique - limit:,} more"
+            return listed + more
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return f"{non_null.min():%Y-%m-%d} to {non_null.max():%Y-%m-%d}"
+        if unique <= cls.LOW_CARDINALITY and top:
+            counts = non_null.value_counts().sort_index()
+            return ", ".join(f"{value:g} ({count:,})" for value, count in counts.items())
+        return f"{non_null.min():g} to {non_null.max():g}, mean {non_null.mean():,.2f}"
+
+    @classmethod
+    def _render(cls, df: pd.DataFrame, stats: pd.DataFrame, title: str, top: int, samples: int) -> str:
+        """Render the profile at one level of detail."""
+        lines: List[str] = [
+            f"Dataset: {title}",
+            f"{len(df):,} rows x {len(df.columns)} columns.",
+            "",
+            "=== COLUMNS ===",
+            "| Column | Type | Non-null | Unique | Values |",
+            "|---|---|---|---|---|",
+        ]
+        for column, row in stats.iterrows():
+            values = cls._value_summary(df[column], int(row["unique"]), top)
+            lines.append(
+                f"| {column} | {row['dtype']} | {int(row['non_null']):,} | {int(row['unique']):,} | {values} |"
+            )
+        if samples:
+            lines += ["", f"=== SAMPLE ROWS (first {samples}) ===", df.head(samples).to_markdown(index=False)]
+        return "\n".join(lines)
+
+    @classmethod
+    def _render_within_budget(cls, df: pd.DataFrame, title: str, token_budget: int) -> str:
+        """Render at the richest detail level that fits the budget."""
+        stats = cls._column_stats(df)
+        text: Optional[str] = None
+        for top, samples in cls.DETAIL_LEVELS:
+            text = cls._render(df, stats, title, top, samples)
+            if estimate_tokens(text) <= token_budget:
+                return text
+        # Even the leanest rendering is too large: truncate, keeping whole lines
+        # and room for the truncation note
+        note = "... (profile truncated to fit the token budget)"
+        kept: List[str] = []
+        for line in text.splitlines():
+            if estimate_tokens("\n".join(kept + [line, note])) > token_budget:
+                kept.append(note)
+                break
+            kept.append(line)
+        return "\n".join(kept)
@@ -0,0 +1,184 @@
+"""
+Registry binding each report type to the dataset file its agent reads.
+
+Shared by every process through a small JSON file, so a report ingested in
+one session is picked up by all sessions and the API server without a restart.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from config.settings import Settings
+from services import report_schema as schema
+from services.license_calculator import AI_NOTE, LICENSE_NAME, LICENSE_TYPE, NUMERIC_COLUMNS
+
+
+# Report types, one per report agent
+REPORT_LICENSES = "licenses"
+REPORT_SOD_RISKS = "sod_risks"
+REPORT_USERS = "users"
+
+REPORT_LABELS = {
+    REPORT_LICENSES: "License Summary",
+    REPORT_SOD_RISKS: "SOD Risk Report",
+    REPORT_USERS: "User List Report",
+}
+
+# Columns a file must have to be recognised as a report type
+REPORT_SIGNATURES = {
+    REPORT_LICENSES: frozenset([LICENSE_TYPE, LICENSE_NAME, AI_NOTE, *NUMERIC_COLUMNS]),
+    REPORT_SOD_RISKS: frozenset(
+        [
+            schema.SOD_USER_ID,
+            schema.SOD_RISK_TYPE,
+            schema.SOD_RISK_LEVEL,
+            schema.SOD_RISK_EXEC,
+            schema.SOD_RISK_ID,
+            schema.SOD_RISK_NAME,
+        ]
+    ),
+    REPORT_USERS: frozenset(
+        [
+            schema.USER_ID,
+            schema.USER_TYPE,
+            schema.USER_LOCKED,
+            schema.USER_EXPIRED,
+            schema.USER_ROLE_COUNT,
+            schema.USER_LAST_LOGON,
+        ]
+    ),
+}
+
+# Bundled reports used until a dataset of the type is ingested
+DEFAULT_PATHS = {
+    REPORT_LICENSES: Settings.LICENSE_REPORT_PATH,
+    REPORT_SOD_RISKS: Settings.SOD_RISK_REPORT_PATH,
+    REPORT_USERS: Settings.USER_REPORT_PATH,
+}
+
+
+def detect_report_type(columns: Iterable[str]) -> Optional[str]:
+    """
+    Identify a report from its column signature.
+
+    Args:
+        columns: Column names of the uploaded sheet
+
+    Returns:
+        The report type whose signature the columns contain, or None
+    """
+    present = {str(column).strip() for column in columns}
+    for report_type, signature in REPORT_SIGNATURES.items():
+        if signature <= present:
+            return report_type
+    return None
+
+
+class DatasetRegistry:
+    """
+    Current dataset path per report type, persisted as JSON. The file is
+    re-read whenever it changes on disk, so registrations made by another
+    process take effect on the next lookup.
+    """
+
+    def __init__(self, path: str = Settings.DATASET_REGISTRY_PATH):
+        """
+        Initialize the registry.
+
+        Args:
+            path: JSON file holding the registered datasets
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp: Optional[int] = None
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    def _refresh(self) -> None:
+        """Reload the registry file if it changed; caller holds the lock."""
+        try:
+            stamp = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._stamp, self._entries = None, {}
+            return
+        if stamp != self._stamp:
+            with open(self.path) as handle:
+                self._entries = json.load(handle)
+            self._stamp = stamp
+
+    def path_for(self, report_type: str) -> str:
+        """
+        Dataset file currently bound to a report type.
+
+        Args:
+            report_type: One of the REPORT_* constants
+
+        Returns:
+            Path of the registered dataset, else the bundled report
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(report_type)
+        return entry["path"] if entry else DEFAULT_PATHS[report_type]
+
+    def entries(self) -> Dict[str, Dict[str, str]]:
+        """Registered datasets by report type (path, source file name, time)."""
+        with self._lock:
+            self._refresh()
+            return dict(self._entries)
+
+    def register(
+        self, report_type: str, path: str, source: str, registered_at: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        Bind a report type to a dataset file, replacing the previous one.
+
+        Args:
+            report_type: One of the REPORT_* constants
+            path: Path of the converted dataset file
+            source: Name of the uploaded file, shown in the UI
+            registered_at: ISO timestamp of the registration
+
+        Returns:
+            The replaced entry, or None if the bundled report was in use
+        """
+        with self._lock:
+            self._refresh()
+            entries = dict(self._entries)
+            previous = entries.get(report_type)
+            entries[report_type] = {"path": path, "source": source, "registered_at": registered_at}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Readers in other processes never see a partially written file
+            temp = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp, "w") as handle:
+                json.dump(entries, handle, indent=2)
+            os.replace(temp, self.path)
+            self._entries, self._stamp = entries, os.stat(self.path).st_mtime_ns
+        return previous
+
+
+_registry: Optional[DatasetRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_dataset_registry() -> DatasetRegistry:
+    """Return the process-wide dataset registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DatasetRegistry()
+        return _registry
+
+
+def report_path(report_type: str) -> str:
+    """Dataset file currently bound to a report type."""
+    return get_dataset_registry().path_for(report_type)
+
+
+def report_source(report_type: str) -> str:
+    """Name of the file a report type was loaded from: the upload, else the bundled report."""
+    entry = get_dataset_registry().entries().get(report_type)
+    return entry["source"] if entry else os.path.basename(DEFAULT_PATHS[report_type])
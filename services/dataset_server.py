@@ -0,0 +1,53 @@
+"""
+Host-local dataset server.
+
+Materialises every agent's report as an Arrow IPC file before any Streamlit
+or API replica needs it, and re-materialises a report as soon as its source
+file changes. Replicas then only memory-map the files.
+
+Run one per host:
+    python -m services.dataset_server
+"""
+
+import logging
+import time
+
+from agents.registry import get_available_agents
+from config.settings import Settings
+
+
+logger = logging.getLogger("auditbot.dataset_server")
+
+
+def materialise_all() -> int:
+    """
+    Materialise the current version of every agent's dataset.
+
+    Returns:
+        Number of datasets served
+    """
+    served = 0
+    for agent in get_available_agents().values():
+        if not hasattr(agent, "REPORT_TYPE"):
+            continue
+        try:
+            # Loading through the agent applies its transform and writes the Arrow file
+            agent.dataframe
+            served += 1
+        except Exception:
+            logger.exception("Failed to materialise dataset for %s", agent.name)
+    return served
+
+
+def main() -> None:
+    """Keep the host's datasets materialised until interrupted."""
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Serving datasets from %s", Settings.DATASET_CACHE_DIR)
+    while True:
+        served = materialise_all()
+        logger.debug("%d datasets up to date", served)
+        time.sleep(Settings.DATASET_SERVER_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
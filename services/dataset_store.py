@@ -0,0 +1,291 @@
+"""
+Process-wide store of report DataFrames shared by the Streamlit app and the API server.
+
+Each report version is materialised once per host as an Arrow IPC file in a
+shared-memory directory. Every server process memory-maps that file instead of
+parsing the workbook itself, so replicas share the same physical pages.
+"""
+
+import fcntl
+import glob
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import pandas as pd
+import pyarrow as pa
+
+from config.settings import Settings
+
+
+# Optional post-processing applied to a freshly read report
+Transform = Callable[[pd.DataFrame], pd.DataFrame]
+T = TypeVar("T")
+
+
+def _arrow_types(arrow_type: pa.DataType):
+    """Keep string columns Arrow-backed so they stay zero-copy over the mapping."""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+class DatasetStore:
+    """
+    Serves each report file as a DataFrame attached from a host-local Arrow
+    IPC file. A changed source file (mtime or size) gets a new version, which
+    is materialised under a host-wide lock and swapped in by atomic rename.
+    """
+
+    def __init__(self, cache_dir: str = Settings.DATASET_CACHE_DIR):
+        """
+        Initialize the store.
+
+        Args:
+            cache_dir: Host-local directory (ideally on tmpfs) for Arrow files
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._frames: Dict[Tuple[str, str], Tuple[str, pd.DataFrame]] = {}
+        self._derived: Dict[str, Tuple[Tuple[str, ...], Any]] = {}
+        self._derived_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def version(path: str) -> str:
+        """
+        Fingerprint of a report file's current contents.
+
+        Args:
+            path: Path of the report file
+
+        Returns:
+            Short hex digest derived from path, size and modification time
+        """
+        stat = os.stat(path)
+        raw = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def read(path: str) -> pd.DataFrame:
+        """Read a report file based on its extension."""
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        if path.endswith(".csv"):
+            return pd.read_csv(path)
+        return pd.read_excel(path)
+
+    def _base_name(self, path: str, transform: Optional[Transform]) -> str:
+        """File name prefix shared by all versions of one (report, transform) pair."""
+        stem = re.sub(r"[^A-Za-z0-9]+", "_", os.path.splitext(os.path.basename(path))[0])
+        suffix = f"-{transform.__qualname__}" if transform else ""
+        digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+        return f"{stem}-{digest}{suffix}"
+
+    @contextmanager
+    def _host_lock(self, base_name: str) -> Iterator[None]:
+        """Exclusive lock across all processes on this host."""
+        with open(os.path.join(self.cache_dir, f"{base_name}.lock"), "w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @staticmethod
+    def to_arrow(frame: pd.DataFrame) -> pa.Table:
+        """Convert a frame to Arrow, stringifying mixed-type object columns."""
+        frame = frame.copy()
+        for column in frame.columns[frame.dtypes == object]:
+            try:
+                pa.array(frame[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                frame[column] = frame[column].map(lambda v: None if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+    def _materialise(self, path: str, transform: Optional[Transform], target: str) -> None:
+        """Parse the report and write it as an Arrow IPC file, swapped in atomically."""
+        frame = self.read(path)
+        if transform is not None:
+            frame = transform(frame)
+        # Keep a named index (e.g. the license type) as a column; restored on attach
+        index_name = frame.index.name
+        if index_name is not None:
+            frame = frame.reset_index()
+        table = self.to_arrow(frame)
+        if index_name is not None:
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}), b"auditbot.index": index_name.encode()}
+            )
+        temp = f"{target}.{os.getpid()}.tmp"
+        with pa.OSFile(temp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp, target)
+
+    def _prune(self, base_name: str, keep: str) -> None:
+        """Remove superseded versions; processes still mapping them keep their pages."""
+        versions = sorted(
+            glob.glob(os.path.join(self.cache_dir, f"{base_name}@*.arrow")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for stale in versions[Settings.DATASET_VERSIONS_KEPT:]:
+            if stale != keep:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _attach(target: str) -> pd.DataFrame:
+        """Memory-map an Arrow IPC file and expose it as a DataFrame."""
+        source = pa.memory_map(target, "r")
+        table = pa.ipc.open_file(source).read_all()
+        frame = table.to_pandas(split_blocks=True, types_mapper=_arrow_types)
+        index_name = (table.schema.metadata or {}).get(b"auditbot.index")
+        if index_name:
+            frame = frame.set_index(index_name.decode())
+        return frame
+
+    @staticmethod
+    def private_copy(frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Copy of a shared frame that a session may modify, including in place
+        (generated pandas code often does), without affecting other sessions.
+        Arrow-backed columns keep sharing their immutable buffers: they only
+        get their own array objects, whose writes replace the array. The
+        other columns map the Arrow file read-only, so they are copied into
+        writable memory of the session.
+
+        Args:
+            frame: Frame returned by load()
+
+        Returns:
+            The private copy
+        """
+        copy = frame.copy(deep=False)
+        for position, dtype in enumerate(copy.dtypes):
+            column = copy.iloc[:, position]
+            if isinstance(dtype, pd.ArrowDtype):
+                copy.isetitem(position, column.array.copy())
+            else:
+                copy.isetitem(position, column.copy(deep=True))
+        return copy
+
+    def materialise(self, path: str, transform: Optional[Transform] = None) -> str:
+        """
+        Ensure the current version of a report exists as an Arrow file on this host.
+
+        Args:
+            path: Path of the report file
+            transform: Optional function applied once after reading
+
+        Returns:
+            Path of the Arrow IPC file for the current version
+        """
+        base_name = self._base_name(path, transform)
+        target = os.path.join(self.cache_dir, f"{base_name}@{self.version(path)}.arrow")
+        if os.path.exists(target):
+            return target
+        with self._host_lock(base_name):
+            # Another process may have finished while we waited for the lock
+            if not os.path.exists(target):
+                self._materialise(path, transform, target)
+                self._prune(base_name, keep=target)
+        return target
+
+    def load(self, path: str, transform: Optional[Transform] = None) -> pd.DataFrame:
+        """
+        Return the frame for a report file, attaching to its Arrow file on first use.
+
+        Args:
+            path: Path of the report file
+            transform: Optional function applied once after reading
+
+        Returns:
+            The cached DataFrame (shared; callers must not mutate it)
+        """
+        key = (path, transform.__qualname__ if transform else "")
+        version = self.version(path)
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached and cached[0] == version:
+                return cached[1]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Per-file lock so concurrent sessions wait for one attach instead of repeating it
+        with load_lock:
+            with self._lock:
+                cached = self._frames.get(key)
+                if cached and cached[0] == version:
+                    return cached[1]
+            frame = self._attach(self.materialise(path, transform))
+            with self._lock:
+                self._frames[key] = (version, frame)
+            return frame
+
+    def discard(self, path: str) -> None:
+        """
+        Forget a report file that is no longer served: drop its frames and
+        remove its Arrow files; processes still mapping them keep their pages.
+
+        Args:
+            path: Path of the report file
+        """
+        with self._lock:
+            for key in [key for key in self._frames if key[0] == path]:
+                del self._frames[key]
+        prefix = self._base_name(path, None)
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{prefix}*.arrow")):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    def derived(self, name: str, versions: Tuple[str, ...], build: Callable[[], T]) -> T:
+        """
+        Return an artifact computed from one or more datasets, building it once
+        per combination of dataset versions (indexes, scores, matrices).
+
+        Args:
+            name: Artifact name, e.g. 'risk_scores'
+            versions: Versions of the datasets the artifact is built from
+            build: Zero-argument builder invoked when the versions change
+
+        Returns:
+            The cached artifact for these versions
+        """
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached and cached[0] == versions:
+                return cached[1]
+            build_lock = self._derived_locks.setdefault(name, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                cached = self._derived.get(name)
+                if cached and cached[0] == versions:
+                    return cached[1]
+            artifact = build()
+            with self._lock:
+                # Only the latest version is kept; older artifacts are released
+                self._derived[name] = (versions, artifact)
+            return artifact
+
+
+_store: Optional[DatasetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    """Return the process-wide dataset store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore()
+        return _store
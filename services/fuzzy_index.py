@@ -0,0 +1,142 @@
+"""
+In-memory trigram index for fuzzy entity lookup (users, risk IDs, risk names).
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.dataset_store import get_dataset_store
+from services import report_schema as rs
+
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of the normalised words in a text.
+    Words are padded so short names and prefixes still produce trigrams.
+    """
+    grams: Set[str] = set()
+    for word in _NON_ALNUM.sub(" ", str(text).lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to document ids. A query scores every
+    candidate with one bincount over the postings of its trigrams, ranked by
+    trigram similarity (shared / union).
+    """
+
+    def __init__(self, keys: Sequence[str], texts: Sequence[str]):
+        """
+        Build the index.
+
+        Args:
+            keys: Key returned for each document (e.g. the user id)
+            texts: Searchable text of each document
+        """
+        self.keys = np.asarray(keys, dtype=object)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        sizes = np.zeros(len(texts), dtype=np.int32)
+        for doc_id, text in enumerate(texts):
+            grams = trigrams(text)
+            sizes[doc_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(doc_id)
+        self._sizes = sizes
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.15) -> List[Tuple[str, float]]:
+        """
+        Rank documents by similarity to the query.
+
+        Args:
+            query: Free-text query, e.g. a partial name
+            limit: Maximum number of candidates
+            min_score: Minimum similarity (0..1) to be returned
+
+        Returns:
+            (key, score) pairs, best first
+        """
+        grams = trigrams(query)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        candidates = np.flatnonzero(shared)
+        scores = shared[candidates] / (len(grams) + self._sizes[candidates] - shared[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [(self.keys[candidates[i]], round(float(scores[i]), 3)) for i in order]
+
+
+class EntityLookup:
+    """Trigram indexes over the User and SOD Risk reports for one dataset version."""
+
+    def __init__(self, sod: pd.DataFrame, users: pd.DataFrame):
+        """
+        Build the user and risk indexes.
+
+        Args:
+            sod: SOD Risk Report frame
+            users: User Report frame
+        """
+        people = users[[rs.USER_ID, rs.USER_FIRST_NAME, rs.USER_LAST_NAME, rs.USER_TYPE]]
+        people = people.drop_duplicates(rs.USER_ID).fillna("").astype(str)
+        self.users = people.set_index(rs.USER_ID)
+        self.user_index = TrigramIndex(
+            people[rs.USER_ID].tolist(),
+            (people[rs.USER_ID] + " " + people[rs.USER_FIRST_NAME] + " " + people[rs.USER_LAST_NAME]).tolist(),
+        )
+
+        risks = sod[[rs.SOD_RISK_ID, rs.SOD_RISK_NAME]].dropna(subset=[rs.SOD_RISK_ID])
+        risks = risks.drop_duplicates(rs.SOD_RISK_ID).fillna("").astype(str)
+        self.risks = risks.set_index(rs.SOD_RISK_ID)
+        self.risk_index = TrigramIndex(
+            risks[rs.SOD_RISK_ID].tolist(),
+            (risks[rs.SOD_RISK_ID] + " " + risks[rs.SOD_RISK_NAME]).tolist(),
+        )
+
+    def find_users(self, query: str, limit: int = 5) -> pd.DataFrame:
+        """Candidate users for a partial name or id, best match first."""
+        matches = self.user_index.search(query, limit)
+        result = self.users.loc[[key for key, _ in matches]].copy()
+        result["Match"] = [score for _, score in matches]
+        return result
+
+    def find_risks(self, query: str, limit: int = 5) -> pd.DataFrame:
+        """Candidate risks for a partial risk id or fuzzy description, best match first."""
+        matches = self.risk_index.search(query, limit)
+        result = self.risks.loc[[key for key, _ in matches]].copy()
+        result["Match"] = [score for _, score in matches]
+        return result
+
+
+def get_entity_lookup(sod_path: str, users_path: str) -> EntityLookup:
+    """
+    Return the lookup indexes for the current versions of both reports,
+    built once per pair of dataset versions.
+
+    Args:
+        sod_path: Path of the SOD Risk Report
+        users_path: Path of the User Report
+
+    Returns:
+        EntityLookup over both reports
+    """
+    store = get_dataset_store()
+    versions = (store.version(sod_path), store.version(users_path))
+    return store.derived(
+        "entity_lookup",
+        versions,
+        lambda: EntityLookup(store.load(sod_path), store.load(users_path)),
+    )
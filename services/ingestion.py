@@ -0,0 +1,293 @@
+"""
+Background ingestion of uploaded reports.
+
+An upload is handed to a worker thread that detects the report type from its
+columns, validates it, converts it to Parquet, materialises it in the dataset
+store, binds it to the matching agent in the dataset registry and rebuilds the
+name lookup over the new version.
+"""
+
+import logging
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config.settings import Settings
+from services import report_schema as schema
+from services.dataset_registry import (
+    REPORT_LABELS,
+    REPORT_LICENSES,
+    REPORT_SIGNATURES,
+    REPORT_SOD_RISKS,
+    REPORT_USERS,
+    detect_report_type,
+    get_dataset_registry,
+    report_path,
+)
+from services.dataset_store import DatasetStore, get_dataset_store
+from services.fuzzy_index import get_entity_lookup
+from services.license_calculator import prepare_license_frame
+
+
+logger = logging.getLogger("auditbot.ingestion")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Column that must identify every row of a report type
+KEY_COLUMNS = {
+    REPORT_SOD_RISKS: schema.SOD_USER_ID,
+    REPORT_USERS: schema.USER_ID,
+}
+
+
+class IngestionError(Exception):
+    """An uploaded file cannot be used as a report; the message is shown to the user."""
+
+
+class IngestionJob:
+    """Progress of one uploaded file through the pipeline."""
+
+    def __init__(self, job_id: str, filename: str):
+        """
+        Initialize a queued job.
+
+        Args:
+            job_id: Short unique id
+            filename: Name of the uploaded file
+        """
+        self.job_id = job_id
+        self.filename = filename
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a worker..."
+        self.report_type: Optional[str] = None
+        self.rows = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job succeeded or failed."""
+        return self.state in (DONE, FAILED)
+
+    def update(self, progress: float, message: str) -> None:
+        """Advance the job; read concurrently by the UI."""
+        self.progress = progress
+        self.message = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable job status."""
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "report_type": self.report_type,
+            "rows": self.rows,
+        }
+
+
+def validate_report(report_type: str, frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Check that a frame is usable by its agent.
+
+    Args:
+        report_type: Detected report type
+        frame: The uploaded sheet
+
+    Returns:
+        The frame with blank rows dropped
+
+    Raises:
+        IngestionError: If the report has no usable rows
+    """
+    frame = frame.dropna(how="all")
+    label = REPORT_LABELS[report_type]
+    if report_type == REPORT_LICENSES:
+        try:
+            licenses = prepare_license_frame(frame)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise IngestionError(f"The {label} has invalid values: {exc}") from exc
+        if licenses.empty:
+            raise IngestionError(f"The {label} has no license rows.")
+        return frame
+    key = KEY_COLUMNS[report_type]
+    frame = frame[frame[key].notna()]
+    if frame.empty:
+        raise IngestionError(f"The {label} has no rows with a {key!r}.")
+    return frame
+
+
+class IngestionService:
+    """
+    Runs ingestion jobs on a small worker pool so uploads never block a
+    Streamlit script thread. Jobs are tracked in memory for progress display.
+    """
+
+    def __init__(self, workers: int = Settings.INGESTION_WORKERS):
+        """
+        Initialize the service.
+
+        Args:
+            workers: Uploads ingested concurrently
+        """
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    def submit(self, filename: str, data: bytes) -> IngestionJob:
+        """
+        Queue an uploaded file for ingestion.
+
+        Args:
+            filename: Original file name; its extension selects the reader
+            data: File contents
+
+        Returns:
+            The job, whose progress is updated while it runs
+        """
+        job = IngestionJob(uuid.uuid4().hex[:12], filename)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            finished = [key for key, old in self._jobs.items() if old.finished]
+            for key in finished[: max(0, len(finished) - Settings.INGESTION_JOBS_KEPT)]:
+                del self._jobs[key]
+        self._pool.submit(self._run, job, data)
+        return job
+
+    def job(self, job_id: str) -> Optional[IngestionJob]:
+        """The job with this id, if this process still tracks it."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[IngestionJob]:
+        """All tracked jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job: IngestionJob, data: bytes) -> None:
+        """Run one job, recording failures on it instead of raising."""
+        job.state = RUNNING
+        try:
+            self._ingest(job, data)
+            job.state = DONE
+        except IngestionError as exc:
+            job.state = FAILED
+            job.message = str(exc)
+        except Exception as exc:
+            logger.exception("Ingestion of %s failed", job.filename)
+            job.state = FAILED
+            job.message = f"Could not read {job.filename}: {exc}"
+
+    @staticmethod
+    def _ingest(job: IngestionJob, data: bytes) -> None:
+        """Save, convert and register one upload, replacing the previous dataset of its type."""
+        extension = os.path.splitext(job.filename)[1].lower().lstrip(".")
+        if extension not in Settings.UPLOAD_EXTENSIONS:
+            raise IngestionError(f"Unsupported file type {extension!r}.")
+        stem = re.sub(r"[^A-Za-z0-9]+", "_", os.path.splitext(job.filename)[0])
+
+        job.update(0.05, "Saving upload...")
+        os.makedirs(Settings.UPLOAD_DIR, exist_ok=True)
+        upload_path = os.path.join(Settings.UPLOAD_DIR, f"{job.job_id}-{stem}.{extension}")
+        with open(upload_path, "wb") as handle:
+            handle.write(data)
+        try:
+            report_type, dataset_path = IngestionService._convert(job, upload_path)
+        finally:
+            # Failed uploads are not kept either
+            os.remove(upload_path)
+
+        previous = get_dataset_registry().register(
+            report_type, dataset_path, job.filename, datetime.now().isoformat(timespec="seconds")
+        )
+        if previous and previous["path"] != dataset_path:
+            IngestionService._discard(previous["path"])
+        if report_type in (REPORT_SOD_RISKS, REPORT_USERS):
+            job.update(0.9, "Indexing user and risk names...")
+            try:
+                get_entity_lookup(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))
+            except Exception:
+                # The dataset is usable; the lookup is built on first use instead
+                logger.exception("Indexing names after ingesting %s failed", job.filename)
+        job.update(
+            1.0, f"{REPORT_LABELS[report_type]} ready: {job.rows:,} rows from {job.filename}."
+        )
+
+    @staticmethod
+    def _convert(job: IngestionJob, upload_path: str) -> Tuple[str, str]:
+        """
+        Detect, validate, convert and materialise a saved upload.
+
+        Returns:
+            (report type, path of the converted dataset)
+        """
+        job.update(0.15, "Reading the report...")
+        frame = DatasetStore.read(upload_path)
+        frame.columns = [str(column).strip() for column in frame.columns]
+
+        job.update(0.45, "Detecting the report type...")
+        report_type = detect_report_type(frame.columns)
+        if report_type is None:
+            expected = "; ".join(
+                f"{REPORT_LABELS[kind]}: {', '.join(sorted(columns))}"
+                for kind, columns in REPORT_SIGNATURES.items()
+            )
+            raise IngestionError(f"Unrecognised report columns. Expected one of - {expected}")
+        job.report_type = report_type
+        label = REPORT_LABELS[report_type]
+
+        job.update(0.55, f"Validating the {label}...")
+        frame = validate_report(report_type, frame)
+        job.rows = len(frame)
+
+        job.update(0.65, f"Converting {len(frame):,} rows...")
+        os.makedirs(Settings.INGESTED_DATASET_DIR, exist_ok=True)
+        dataset_path = os.path.join(
+            Settings.INGESTED_DATASET_DIR, f"{report_type}-{job.job_id}.parquet"
+        )
+        temp = f"{dataset_path}.tmp"
+        pq.write_table(DatasetStore.to_arrow(frame), temp)
+        os.replace(temp, dataset_path)
+
+        # Materialise now so the first question does not pay for the conversion
+        job.update(0.8, "Preparing the dataset for the agents...")
+        transform = prepare_license_frame if report_type == REPORT_LICENSES else None
+        get_dataset_store().materialise(dataset_path, transform)
+        return report_type, dataset_path
+
+    @staticmethod
+    def _discard(dataset_path: str) -> None:
+        """Delete a replaced dataset; bundled reports are never deleted."""
+        directory = os.path.abspath(Settings.INGESTED_DATASET_DIR)
+        if os.path.dirname(os.path.abspath(dataset_path)) != directory:
+            return
+        get_dataset_store().discard(dataset_path)
+        try:
+            os.remove(dataset_path)
+        except FileNotFoundError:
+            pass
+
+
+_service: Optional[IngestionService] = None
+_service_lock = threading.Lock()
+
+
+def get_ingestion_service() -> IngestionService:
+    """Return the process-wide ingestion service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = IngestionService()
+        return _service
@@ -0,0 +1,200 @@
+"""
+Deterministic license cost engine for the SAP License Summary report.
+"""
+
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+
+# Column names as they appear in License_Summary.xlsx
+LICENSE_TYPE = "License Type"
+LICENSE_NAME = "License Description / Name"
+PURCHASED_COUNT = "Purchased License"
+UNIT_COST = "License Unit Cost"
+PURCHASED_COST = "Purchased License Cost"
+RECOMMENDED_COUNT = "Recommended License Count"
+RECOMMENDED_COST = "Recommended License Cost"
+MULTI_LOGON_COUNT = "Multiple Logons Count"
+MULTI_LOGON_COST = "Multiple Logons Cost"
+NET_COST = "Net Cost"
+ADDITIONAL_COUNT = "Additional License Count"
+ADDITIONAL_COST = "Additional License Cost"
+UNUSED_COUNT = "Unused License Count"
+UNUSED_COST = "Unused License Cost"
+AI_NOTE = "AI Note"
+
+NUMERIC_COLUMNS = [
+    PURCHASED_COUNT,
+    UNIT_COST,
+    PURCHASED_COST,
+    RECOMMENDED_COUNT,
+    RECOMMENDED_COST,
+    MULTI_LOGON_COUNT,
+    MULTI_LOGON_COST,
+    NET_COST,
+    ADDITIONAL_COUNT,
+    ADDITIONAL_COST,
+    UNUSED_COUNT,
+    UNUSED_COST,
+]
+
+# Rows the report marks as totals; the calculator derives its own totals.
+SUMMARY_NOTE = "Summary Level"
+
+
+def prepare_license_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert the raw workbook sheet into a typed, record-level frame.
+
+    Args:
+        raw: DataFrame as read from License_Summary.xlsx
+
+    Returns:
+        DataFrame indexed by license type with int64 count/cost columns
+    """
+    frame = raw.loc[
+        (raw[AI_NOTE] != SUMMARY_NOTE) & (raw[LICENSE_TYPE].astype(str) != "Total")
+    ].copy()
+    frame[LICENSE_TYPE] = frame[LICENSE_TYPE].astype(str).str.strip()
+    frame[LICENSE_NAME] = frame[LICENSE_NAME].fillna("").astype(str)
+    for column in NUMERIC_COLUMNS:
+        frame[column] = (
+            pd.to_numeric(frame[column], errors="coerce").fillna(0).astype("int64")
+        )
+    return frame.set_index(LICENSE_TYPE)[[LICENSE_NAME] + NUMERIC_COLUMNS]
+
+
+class LicenseCostCalculator:
+    """
+    Vectorised calculator over the record-level license frame.
+    Every figure is computed from the workbook so the LLM never does arithmetic.
+    """
+
+    def __init__(self, licenses: pd.DataFrame):
+        """
+        Initialize the calculator.
+
+        Args:
+            licenses: Typed frame produced by prepare_license_frame
+        """
+        self.licenses = licenses
+
+    @property
+    def license_types(self) -> List[str]:
+        """License type codes present in the report."""
+        return list(self.licenses.index)
+
+    def _select(self, license_types: Optional[Iterable[str]]) -> pd.DataFrame:
+        """Return the rows for the given license types (all when empty)."""
+        if not license_types:
+            return self.licenses
+        wanted = [code.strip().upper() for code in license_types]
+        unknown = [code for code in wanted if code not in self.licenses.index]
+        if unknown:
+            raise ValueError(
+                f"Unknown license type(s): {', '.join(unknown)}. "
+                f"Known types: {', '.join(self.license_types)}"
+            )
+        return self.licenses.loc[wanted]
+
+    def totals(self, license_types: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Sum every count and cost column.
+
+        Args:
+            license_types: Optional subset of license type codes
+
+        Returns:
+            Mapping of column name to total
+        """
+        sums = self._select(license_types)[NUMERIC_COLUMNS].sum()
+        sums = sums.drop(UNIT_COST)
+        totals = {column: int(value) for column, value in sums.items()}
+        totals["License Types"] = len(self._select(license_types))
+        return totals
+
+    def breakdown(self, license_types: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Per-type cost breakdown with each type's share of purchased and unused cost.
+
+        Args:
+            license_types: Optional subset of license type codes
+
+        Returns:
+            DataFrame with one row per license type
+        """
+        frame = self._select(license_types)
+        result = frame[
+            [
+                LICENSE_NAME,
+                PURCHASED_COUNT,
+                UNIT_COST,
+                PURCHASED_COST,
+                RECOMMENDED_COUNT,
+                RECOMMENDED_COST,
+                NET_COST,
+                UNUSED_COUNT,
+                UNUSED_COST,
+            ]
+        ].copy()
+        purchased_total = self.licenses[PURCHASED_COST].sum()
+        unused_total = self.licenses[UNUSED_COST].sum()
+        result["Purchased Cost Share %"] = np.round(
+            100.0 * frame[PURCHASED_COST] / purchased_total if purchased_total else 0.0, 1
+        )
+        result["Unused Cost Share %"] = np.round(
+            100.0 * frame[UNUSED_COST] / unused_total if unused_total else 0.0, 1
+        )
+        return result
+
+    def what_if(
+        self,
+        purchased_counts: Optional[Dict[str, int]] = None,
+        right_size_types: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Recompute costs for a hypothetical set of purchased license counts.
+
+        Args:
+            purchased_counts: New purchased count per license type
+            right_size_types: License types whose purchased count drops to
+                the recommended count (removes all unused licenses)
+
+        Returns:
+            DataFrame with current vs scenario figures per license type
+        """
+        current = self.licenses
+        new_counts = current[PURCHASED_COUNT].copy()
+
+        right_size = list(self._select(right_size_types).index) if right_size_types else []
+        new_counts.loc[right_size] = current.loc[right_size, RECOMMENDED_COUNT]
+
+        for code, count in (purchased_counts or {}).items():
+            code = code.strip().upper()
+            self._select([code])
+            if count < 0:
+                raise ValueError(f"Purchased count for {code} cannot be negative.")
+            new_counts.loc[code] = int(count)
+
+        unit_cost = current[UNIT_COST]
+        recommended = current[RECOMMENDED_COUNT]
+        scenario = pd.DataFrame(
+            {
+                "Current Purchased": current[PURCHASED_COUNT],
+                "Scenario Purchased": new_counts,
+                "Current Purchased Cost": current[PURCHASED_COST],
+                "Scenario Purchased Cost": new_counts * unit_cost,
+                "Scenario Unused Count": np.maximum(new_counts - recommended, 0),
+                "Scenario Additional Count": np.maximum(recommended - new_counts, 0),
+            }
+        )
+        scenario["Scenario Unused Cost"] = scenario["Scenario Unused Count"] * unit_cost
+        scenario["Scenario Additional Cost"] = (
+            scenario["Scenario Additional Count"] * unit_cost
+        )
+        scenario["Savings"] = (
+            scenario["Current Purchased Cost"] - scenario["Scenario Purchased Cost"]
+        )
+        scenario.loc["Total"] = scenario.sum()
+        return scenario.astype("int64")
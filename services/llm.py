@@ -0,0 +1,200 @@
+"""
+Factory for the LangChain chat models used by the services.
+Every model call is admitted through the process-wide LLM scheduler and
+runs under the resilience policy (deadline, retries, hedging). Requests are
+coroutines on the shared LLM event loop; blocking callers are bridged to it.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from config.settings import Settings
+from services.async_runtime import call_blocking, get_async_http_client, iterate, run
+from services.llm_scheduler import (
+    Ticket,
+    current_queue_callback,
+    current_tenant,
+    get_scheduler,
+)
+from services.resilience import get_policy
+from services.tokens import estimate_message_tokens
+from services.usage_ledger import get_usage_ledger
+
+
+class ScheduledChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose requests wait for admission and are retried or hedged."""
+
+    @staticmethod
+    def _prompt_tokens(messages: List[BaseMessage]) -> int:
+        """Estimate the prompt tokens of a request."""
+        return estimate_message_tokens(str(message.content) for message in messages)
+
+    def _estimate(self, messages: List[BaseMessage]) -> int:
+        """Estimate prompt plus completion tokens for a request."""
+        return self._prompt_tokens(messages) + (self.max_tokens or Settings.LLM_EXPECTED_OUTPUT_TOKENS)
+
+    @asynccontextmanager
+    async def _admission(
+        self, messages: List[BaseMessage], operation: str, notify: bool = True
+    ) -> AsyncIterator[Ticket]:
+        """
+        Hold a scheduler slot for the duration of one request, then record
+        the usage reported on the ticket in the usage ledger. A request
+        cancelled before the provider reported usage (e.g. the loser of a
+        hedge) is recorded with its estimated prompt tokens, which the
+        provider bills all the same.
+
+        Args:
+            messages: Prompt of the request
+            operation: Ledger operation, e.g. 'stream' or 'stream_hedge'
+            notify: Report queue positions to the caller's callback
+        """
+        scheduler = get_scheduler()
+        ticket = await scheduler.acquire_async(
+            current_tenant(), self._estimate(messages), current_queue_callback() if notify else None
+        )
+        started = time.monotonic()
+        try:
+            yield ticket
+        except (asyncio.CancelledError, GeneratorExit):
+            if not ticket.usage:
+                ticket.usage = {"input_tokens": self._prompt_tokens(messages), "output_tokens": 0}
+            raise
+        finally:
+            scheduler.release(ticket, ticket.actual_tokens)
+            if ticket.usage:
+                latency = time.monotonic() - started
+                # The ledger writes to SQLite; keep it off the event loop, and
+                # finish the write even when the request's task is cancelled again
+                await asyncio.shield(
+                    call_blocking(
+                        get_usage_ledger().record,
+                        ticket.tenant, operation, self.model_name, ticket.usage, latency,
+                    )
+                )
+
+    @staticmethod
+    def _account(ticket: Ticket, message: Any) -> None:
+        """Copy the provider's usage metadata of a response onto the ticket."""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            ticket.usage = usage
+            ticket.actual_tokens = usage.get("total_tokens")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Blocking callers wait for the request running on the shared loop;
+        # the async path expects an async run manager, so none is passed
+        return run(self._agenerate(messages, stop=stop, **kwargs))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # Tokens are reported to the sync callbacks on the consuming thread
+        for chunk in iterate(self._astream(messages, stop=stop, **kwargs)):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            # ChatOpenAI delegates to _astream, which takes the slot itself
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        async with self._admission(messages, "generate") as ticket:
+            result = await get_policy().call(
+                lambda: super(ScheduledChatOpenAI, self)._agenerate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                ),
+                operation="generate",
+            )
+            self._account(ticket, result.generations[0].message)
+            return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+
+        def start(attempt: int) -> AsyncIterator[ChatGenerationChunk]:
+            return self._attempt(messages, attempt, stop=stop, run_manager=run_manager, **kwargs)
+
+        async for chunk in get_policy().stream(
+            start,
+            operation="stream",
+            can_hedge=get_scheduler().has_spare_capacity,
+        ):
+            yield chunk
+
+    async def _attempt(
+        self,
+        messages: List[BaseMessage],
+        attempt: int,
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        One streaming request of a race. The primary (attempt 0) and a hedge
+        (attempt 1) each hold their own scheduler slot and are each recorded
+        in the usage ledger; only the primary reports tokens to the callbacks
+        and queue positions to the caller.
+        """
+        primary = attempt == 0
+        async with self._admission(messages, "stream" if primary else "stream_hedge", notify=primary) as ticket:
+            async for chunk in super()._astream(
+                messages,
+                stop=stop,
+                run_manager=run_manager if primary else None,
+                **kwargs,
+            ):
+                self._account(ticket, chunk.message)
+                yield chunk
+
+
+def create_llm(**kwargs: Any) -> ChatOpenAI:
+    """
+    Create a scheduled chat model with the application defaults.
+    Tenants close to their daily budget get the cheaper fallback model.
+
+    Args:
+        **kwargs: Overrides passed through to ChatOpenAI (e.g. temperature)
+
+    Returns:
+        A ChatOpenAI instance whose calls pass through the LLM scheduler
+    """
+    options = {
+        "model": get_usage_ledger().model_for(current_tenant()),
+        "api_key": Settings.get_openai_api_key(),
+        "stream_usage": True,
+        "base_url": Settings.OPENAI_BASE_URL,
+        "timeout": Settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        "max_retries": 0,  # retries are handled by the resilience policy
+        # One pooled client on the shared loop for every model instance
+        "http_async_client": get_async_http_client(),
+    }
+    options.update(kwargs)
+    return ScheduledChatOpenAI(**options)
@@ -0,0 +1,333 @@
+"""
+Process-wide admission control and fair queuing for LLM calls.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional
+
+from config.settings import Settings
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when the admission queue is full and a request is rejected."""
+
+    USER_MESSAGE = (
+        "Audit Bot is handling a high volume of requests right now. "
+        "Please try again in a moment."
+    )
+
+
+# Callback invoked with the 1-based queue position while waiting (0 once admitted)
+QueueCallback = Callable[[int], None]
+
+_tenant: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_tenant", default=Settings.DEFAULT_TENANT
+)
+_on_queue: contextvars.ContextVar[Optional[QueueCallback]] = contextvars.ContextVar(
+    "llm_on_queue", default=None
+)
+
+
+@contextmanager
+def scheduling_context(
+    tenant: str, on_queue: Optional[QueueCallback] = None
+) -> Iterator[None]:
+    """
+    Attribute LLM calls made in this context to a tenant.
+
+    Args:
+        tenant: Fair-queuing key (tenant or user id)
+        on_queue: Optional callback receiving the queue position while waiting
+    """
+    tenant_token = _tenant.set(tenant)
+    queue_token = _on_queue.set(on_queue)
+    try:
+        yield
+    finally:
+        _tenant.reset(tenant_token)
+        _on_queue.reset(queue_token)
+
+
+def current_tenant() -> str:
+    """Tenant the current LLM calls are attributed to."""
+    return _tenant.get()
+
+
+class Ticket:
+    """A single admission request waiting for or holding an LLM slot."""
+
+    __slots__ = ("tenant", "tokens", "granted", "actual_tokens", "usage", "wake")
+
+    def __init__(self, tenant: str, tokens: int):
+        self.tenant = tenant
+        self.tokens = tokens
+        self.granted = False
+        # Called (under the scheduler lock) when the ticket is granted; async waiters use it
+        self.wake: Optional[Callable[[], None]] = None
+        self.actual_tokens: Optional[int] = None
+        # Usage metadata reported by the provider for the call
+        self.usage: Optional[Dict] = None
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls under a concurrency limit and a tokens-per-minute budget.
+    Waiting calls are queued per tenant and admitted round-robin so that one
+    busy tenant cannot starve the others. Full queues reject new calls.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = Settings.LLM_MAX_CONCURRENCY,
+        tokens_per_minute: int = Settings.LLM_TOKENS_PER_MINUTE,
+        max_queue_per_tenant: int = Settings.LLM_MAX_QUEUE_PER_TENANT,
+        max_queue_total: int = Settings.LLM_MAX_QUEUE_TOTAL,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of in-flight LLM calls
+            tokens_per_minute: Provider token budget per minute
+            max_queue_per_tenant: Maximum waiting calls per tenant
+            max_queue_total: Maximum waiting calls across all tenants
+        """
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self.max_queue_total = max_queue_total
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[str, Deque[Ticket]]" = OrderedDict()
+        self._waiting = 0
+        self._in_flight = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """Refill the token bucket for the time elapsed since the last refill."""
+        now = time.monotonic()
+        rate = self.tokens_per_minute / 60.0
+        self._tokens = min(
+            float(self.tokens_per_minute), self._tokens + (now - self._refilled_at) * rate
+        )
+        self._refilled_at = now
+
+    def _dispatch(self) -> None:
+        """Grant slots to queue heads in round-robin tenant order."""
+        self._refill()
+        while self._queues and self._in_flight < self.max_concurrency:
+            tenant, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            # A single call larger than the whole budget is admitted on a full bucket
+            needed = min(ticket.tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                break
+            queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._queues.move_to_end(tenant)
+            else:
+                del self._queues[tenant]
+            self._tokens -= ticket.tokens
+            self._in_flight += 1
+            ticket.granted = True
+            if ticket.wake is not None:
+                ticket.wake()
+        self._cond.notify_all()
+
+    def _position(self, ticket: Ticket) -> int:
+        """Approximate 1-based position of a waiting ticket under round-robin."""
+        own_index = self._queues[ticket.tenant].index(ticket)
+        ahead = own_index
+        for tenant, queue in self._queues.items():
+            if tenant != ticket.tenant:
+                ahead += min(len(queue), own_index + 1)
+        return ahead + 1
+
+    def _wait_timeout(self, ticket: Ticket) -> float:
+        """Seconds until the bucket could hold the ticket's tokens."""
+        missing = min(ticket.tokens, self.tokens_per_minute) - self._tokens
+        if missing <= 0:
+            return 0.5
+        return max(0.05, min(5.0, missing / (self.tokens_per_minute / 60.0)))
+
+    def _enqueue(self, ticket: Ticket) -> None:
+        """Queue a ticket behind its tenant's earlier calls and try to admit it."""
+        with self._cond:
+            queue = self._queues.get(ticket.tenant)
+            if self._waiting >= self.max_queue_total or (
+                queue is not None and len(queue) >= self.max_queue_per_tenant
+            ):
+                raise SchedulerOverloaded(
+                    "Too many requests are waiting for the language model."
+                )
+            if queue is None:
+                queue = self._queues[ticket.tenant] = deque()
+            queue.append(ticket)
+            self._waiting += 1
+            self._dispatch()
+
+    def _abandon(self, ticket: Ticket) -> None:
+        """Withdraw a cancelled waiter, or free its slot if it was just granted."""
+        with self._cond:
+            if ticket.granted:
+                self._in_flight -= 1
+                self._tokens = min(float(self.tokens_per_minute), self._tokens + ticket.tokens)
+            else:
+                queue = self._queues.get(ticket.tenant)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    self._waiting -= 1
+                    if not queue:
+                        del self._queues[ticket.tenant]
+            self._dispatch()
+
+    def acquire(
+        self,
+        tenant: str,
+        tokens: int,
+        on_queue: Optional[QueueCallback] = None,
+    ) -> Ticket:
+        """
+        Block until the call is admitted.
+
+        Args:
+            tenant: Fair-queuing key
+            tokens: Estimated tokens the call will consume
+            on_queue: Optional callback receiving the queue position
+
+        Returns:
+            The granted ticket, to be passed to release()
+
+        Raises:
+            SchedulerOverloaded: If the tenant or global queue is full
+        """
+        ticket = Ticket(tenant, max(1, tokens))
+        self._enqueue(ticket)
+
+        # The callback runs outside the lock; it may render UI
+        last_position = 0
+        while True:
+            with self._cond:
+                if ticket.granted:
+                    break
+                position = self._position(ticket)
+            if on_queue is not None and position != last_position:
+                last_position = position
+                on_queue(position)
+            with self._cond:
+                if not ticket.granted:
+                    self._cond.wait(timeout=self._wait_timeout(ticket))
+                    self._dispatch()
+
+        if on_queue is not None and last_position:
+            on_queue(0)
+        return ticket
+
+    async def acquire_async(
+        self,
+        tenant: str,
+        tokens: int,
+        on_queue: Optional[QueueCallback] = None,
+    ) -> Ticket:
+        """
+        Wait without blocking the event loop until the call is admitted.
+        Same queueing as acquire(); a cancelled waiter leaves the queue.
+
+        Args:
+            tenant: Fair-queuing key
+            tokens: Estimated tokens the call will consume
+            on_queue: Optional callback receiving the queue position
+
+        Returns:
+            The granted ticket, to be passed to release()
+
+        Raises:
+            SchedulerOverloaded: If the tenant or global queue is full
+        """
+        loop = asyncio.get_running_loop()
+        granted = asyncio.Event()
+        ticket = Ticket(tenant, max(1, tokens))
+        ticket.wake = lambda: loop.call_soon_threadsafe(granted.set)
+        self._enqueue(ticket)
+
+        last_position = 0
+        try:
+            while True:
+                with self._cond:
+                    if ticket.granted:
+                        break
+                    position = self._position(ticket)
+                    timeout = self._wait_timeout(ticket)
+                if on_queue is not None and position != last_position:
+                    last_position = position
+                    on_queue(position)
+                try:
+                    await asyncio.wait_for(granted.wait(), timeout)
+                except asyncio.TimeoutError:
+                    # The bucket refills with time, not on release
+                    with self._cond:
+                        self._dispatch()
+        except asyncio.CancelledError:
+            self._abandon(ticket)
+            raise
+
+        if on_queue is not None and last_position:
+            on_queue(0)
+        return ticket
+
+    def release(self, ticket: Ticket, actual_tokens: Optional[int] = None) -> None:
+        """
+        Free the ticket's slot and correct the bucket with actual usage.
+
+        Args:
+            ticket: Ticket returned by acquire()
+            actual_tokens: Tokens the call really consumed, if known
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if actual_tokens is not None:
+                self._tokens = min(
+                    float(self.tokens_per_minute),
+                    self._tokens + ticket.tokens - actual_tokens,
+                )
+            self._dispatch()
+
+    def has_spare_capacity(self) -> bool:
+        """Whether a call could start right now without anyone waiting."""
+        with self._cond:
+            return self._waiting == 0 and self._in_flight < self.max_concurrency
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of in-flight calls, waiting calls and remaining token budget."""
+        with self._cond:
+            self._refill()
+            return {
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "tenants_waiting": len(self._queues),
+                "tokens_available": round(self._tokens),
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide LLM scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
+
+
+def current_queue_callback() -> Optional[QueueCallback]:
+    """Queue position callback registered for the current context."""
+    return _on_queue.get()
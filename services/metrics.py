@@ -0,0 +1,87 @@
+"""
+Lightweight in-process metrics registry.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger("auditbot.metrics")
+
+# (metric name, sorted tag items) identifies one series
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and summaries keyed by metric name and tags.
+    Every emission is also logged so it can be shipped by the log pipeline.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[SeriesKey, float] = defaultdict(float)
+        self._summaries: Dict[SeriesKey, Dict[str, float]] = {}
+
+    @staticmethod
+    def _key(name: str, tags: Dict[str, object]) -> SeriesKey:
+        return name, tuple(sorted((key, str(value)) for key, value in tags.items()))
+
+    def increment(self, name: str, value: float = 1, **tags: object) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Metric name, e.g. 'llm.retry'
+            value: Amount to add
+            **tags: Dimensions such as the operation or error type
+        """
+        with self._lock:
+            self._counters[self._key(name, tags)] += value
+        logger.info("metric %s +%s %s", name, value, tags)
+
+    def observe(self, name: str, value: float, **tags: object) -> None:
+        """
+        Record an observation (e.g. a latency) in a count/sum/max summary.
+
+        Args:
+            name: Metric name, e.g. 'llm.latency_seconds'
+            value: Observed value
+            **tags: Dimensions such as the operation
+        """
+        with self._lock:
+            summary = self._summaries.setdefault(
+                self._key(name, tags), {"count": 0, "sum": 0.0, "max": 0.0}
+            )
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+        logger.debug("metric %s=%.4f %s", name, value, tags)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of all counters and summaries, keyed by 'name{tags}'."""
+
+        def label(key: SeriesKey) -> str:
+            name, tags = key
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in tags) + "}" if tags else "")
+
+        with self._lock:
+            return {
+                "counters": {label(key): value for key, value in self._counters.items()},
+                "summaries": {label(key): dict(value) for key, value in self._summaries.items()},
+            }
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
@@ -0,0 +1,265 @@
+"""
+Orchestrates questions spanning several reports: plans per-report
+sub-queries, runs them concurrently and merges their answers.
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Generator, List, Optional, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field
+
+from agents.base_agent import BaseAgent
+from config.settings import Settings
+from services import report_schema as rs
+from services.license_calculator import LICENSE_TYPE
+from services.llm import create_llm
+from services.llm_scheduler import SchedulerOverloaded, current_tenant, scheduling_context
+from services.resilience import DEADLINE_MESSAGE, LLMDeadlineExceeded
+from services.result_store import TableResult, get_result_store
+
+
+logger = logging.getLogger("auditbot.orchestrator")
+
+# Answers one question with one agent: (answer text, tables displayed)
+SubQueryRunner = Callable[[BaseAgent, str], Tuple[str, List[TableResult]]]
+
+# Columns holding the same key in different reports, by their shared name
+JOIN_KEYS = {
+    rs.SOD_USER_ID: rs.SOD_USER_ID,
+    rs.USER_ID: rs.SOD_USER_ID,
+    LICENSE_TYPE: LICENSE_TYPE,
+}
+KEY_COLUMNS = tuple(dict.fromkeys(JOIN_KEYS.values()))
+
+
+class SubQuery(BaseModel):
+    """One self-contained question routed to a single report agent."""
+
+    agent: str = Field(description="Exact name of the report agent to ask")
+    question: str = Field(description="Self-contained question for that agent")
+
+
+class QueryPlan(BaseModel):
+    """Sub-queries needed to answer a cross-report question."""
+
+    sub_queries: List[SubQuery] = Field(description="One entry per report agent needed")
+
+
+class OrchestratorService:
+    """
+    Answers cross-report questions in three steps: an LLM plans one
+    sub-query per report, the sub-queries run in parallel on a shared thread
+    pool, and the LLM streams an answer merged from the partial results and
+    an exact join of the tables they displayed.
+    """
+
+    def __init__(self, run_sub_query: SubQueryRunner):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            run_sub_query: Answers one question with one agent
+        """
+        self._validate_api_key()
+        self.run_sub_query = run_sub_query
+
+    def _validate_api_key(self) -> None:
+        """Validate that OpenAI API key is configured."""
+        if not Settings.get_openai_api_key():
+            st.error(
+                "OpenAI API Key not found. Please set `OPENAI_API_KEY` in the environment or `.streamlit/secrets.toml`."
+            )
+            st.stop()
+
+    @staticmethod
+    def _transcript(chat_history: List[Dict[str, str]]) -> str:
+        """Recent conversation, so sub-queries can resolve follow-up questions."""
+        return "\n".join(
+            f"{message['role'].upper()}: {message['content']}" for message in chat_history[-6:]
+        )
+
+    def plan(self, agent: BaseAgent, chat_history: List[Dict[str, str]]) -> List[SubQuery]:
+        """
+        Split the last user message into per-report sub-queries.
+
+        Args:
+            agent: The orchestrating agent (knows the report agents)
+            chat_history: The chat history ending with the new user message
+
+        Returns:
+            Sub-queries routed to known report agents
+        """
+        planner = create_llm(temperature=0).with_structured_output(QueryPlan, method="function_calling")
+        plan: QueryPlan = planner.invoke(
+            [
+                SystemMessage(content=agent.get_system_prompt()),
+                HumanMessage(
+                    content="Plan the sub-questions for the last user message.\n\n"
+                    + self._transcript(chat_history)
+                ),
+            ]
+        )
+        known = [query for query in plan.sub_queries if query.agent in agent.report_agents]
+        return known[: Settings.ORCHESTRATOR_MAX_SUB_QUERIES]
+
+    def run(
+        self, agent: BaseAgent, sub_queries: List[SubQuery]
+    ) -> List[Tuple[SubQuery, str, List[TableResult]]]:
+        """
+        Answer all sub-queries concurrently.
+
+        Args:
+            agent: The orchestrating agent
+            sub_queries: Planned sub-queries
+
+        Returns:
+            (sub-query, answer, tables) in plan order; failures become error text
+        """
+        tenant = current_tenant()
+
+        def answer(query: SubQuery) -> Tuple[str, List[TableResult]]:
+            # Same tenant for fair queuing; queue callbacks only work on the UI thread
+            with scheduling_context(tenant):
+                try:
+                    return self.run_sub_query(agent.report_agent(query.agent), query.question)
+                except Exception as e:
+                    return f"Sub-query failed: {e}", []
+
+        # Each sub-query gets its own copy of the caller's context
+        futures = [
+            get_orchestrator_pool().submit(contextvars.copy_context().run, answer, query)
+            for query in sub_queries
+        ]
+        return [(query, *future.result()) for query, future in zip(sub_queries, futures)]
+
+    @staticmethod
+    def _keyed(result) -> Optional[pd.DataFrame]:
+        """The table with its join keys as string columns under their shared names, if it has any."""
+        if not isinstance(result, pd.DataFrame):
+            return None
+        frame = result.reset_index() if result.index.name in JOIN_KEYS else result
+        frame = frame.rename(columns={column: JOIN_KEYS[column] for column in frame.columns if column in JOIN_KEYS})
+        keys = [column for column in frame.columns if column in KEY_COLUMNS]
+        # A table holding the same key twice cannot be joined unambiguously
+        if not keys or frame.columns.duplicated().any():
+            return None
+        return frame.astype({key: str for key in keys})
+
+    def join(
+        self, results: List[Tuple[SubQuery, str, List[TableResult]]]
+    ) -> Optional[Tuple[pd.DataFrame, List[str]]]:
+        """
+        Join the sub-answers' tables on the keys they share, so the merge step
+        gets exact cross-report figures instead of reconciling answer texts.
+
+        Args:
+            results: Output of run()
+
+        Returns:
+            (joined frame, key columns), or None when fewer than two sub-answers
+            displayed tables with a shared key
+        """
+        store = get_result_store()
+        tenant = current_tenant()
+        joined: Optional[pd.DataFrame] = None
+        keys_used: List[str] = []
+        for query, _, tables in results:
+            # The first table of each sub-answer that carries a join key
+            for table in tables:
+                frame = self._keyed(store.get(table.handle, tenant))
+                if frame is None:
+                    continue
+                if joined is None:
+                    joined = frame
+                    break
+                keys = [key for key in KEY_COLUMNS if key in frame.columns and key in joined.columns]
+                if keys:
+                    joined = joined.merge(frame, on=keys, suffixes=("", f" ({query.agent})"))
+                    keys_used += [key for key in keys if key not in keys_used]
+                break
+        return (joined, keys_used) if keys_used else None
+
+    def stream_response(
+        self, agent: BaseAgent, chat_history: List[Dict[str, str]]
+    ) -> Generator[Union[str, TableResult], None, None]:
+        """
+        Stream the merged answer to the last user message.
+
+        Args:
+            agent: The orchestrating agent
+            chat_history: The chat history ending with the new user message
+
+        Yields:
+            Chunks of the merged answer, then the tables the sub-queries displayed
+        """
+        try:
+            sub_queries = self.plan(agent, chat_history)
+            if not sub_queries:
+                yield "I couldn't map this question to the License, SOD Risk or User reports. Please rephrase it."
+                return
+
+            results = self.run(agent, sub_queries)
+            partials = "\n\n".join(
+                f"### {query.agent}\nQuestion: {query.question}\nAnswer: {answer}"
+                for query, answer, _ in results
+            )
+            joined_table = None
+            exact = ""
+            joined = self.join(results)
+            if joined is not None:
+                frame, keys = joined
+                title = f"Sub-answer tables joined on {', '.join(keys)}"
+                joined_table = TableResult(
+                    get_result_store().put(frame, persist=True), title, len(frame), len(frame.columns)
+                )
+                preview = frame.head(Settings.ORCHESTRATOR_JOIN_PREVIEW_ROWS).to_markdown(index=False)
+                exact = (
+                    f"The sub-answers' tables were joined exactly on {', '.join(keys)}: "
+                    f"{len(frame):,} matching rows. The joined table is shown to the user; "
+                    f"take cross-report counts from it. First rows:\n\n{preview}\n\n"
+                )
+            merge = [
+                SystemMessage(content=agent.get_system_prompt()),
+                HumanMessage(
+                    content=f"Conversation:\n{self._transcript(chat_history)}\n\n"
+                    f"Sub-answers from the report agents:\n\n{partials}\n\n{exact}"
+                    "Merge the sub-answers into one answer to the last user message."
+                ),
+            ]
+            for chunk in create_llm(streaming=True).stream(merge):
+                if chunk.content:
+                    yield chunk.content
+            for _, _, tables in results:
+                yield from tables
+            if joined_table is not None:
+                yield joined_table
+        except SchedulerOverloaded:
+            yield SchedulerOverloaded.USER_MESSAGE
+        except LLMDeadlineExceeded:
+            yield DEADLINE_MESSAGE
+        except Exception:
+            # Runs on pool and API threads, where Streamlit calls are unavailable
+            logger.exception("Error answering with %s", agent.name)
+            yield "I encountered an error while processing your request. Please try again."
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_orchestrator_pool() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool running sub-queries."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=Settings.ORCHESTRATOR_MAX_WORKERS,
+                thread_name_prefix="orchestrator",
+            )
+        return _pool
@@ -0,0 +1,137 @@
+"""
+Caps the size of pandas agent tool observations sent back to the LLM.
+"""
+
+from functools import partial
+from typing import Any, Optional
+
+import pandas as pd
+from langchain_experimental.tools.python.tool import PythonAstREPLTool
+
+from config.settings import Settings
+from services.async_runtime import call_blocking
+from services.analysis_workspace import LAST_RESULT, AnalysisWorkspace
+from services.llm_scheduler import current_tenant
+from services.result_store import display_table, get_result_store
+from services.tokens import estimate_tokens
+
+
+class OutputGovernor:
+    """
+    Turns a tool result into an observation that fits row and token caps.
+    Oversized frames are kept in the result store and replaced by a compact
+    summary (handle, shape, columns, head, numeric aggregates).
+    """
+
+    def __init__(
+        self,
+        max_rows: int = Settings.TOOL_OUTPUT_MAX_ROWS,
+        max_tokens: int = Settings.TOOL_OUTPUT_MAX_TOKENS,
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            max_rows: Frames with more rows are summarised
+            max_tokens: Observations above this many tokens are summarised or truncated
+        """
+        self.max_rows = max_rows
+        self.max_tokens = max_tokens
+
+    def govern(self, result: Any) -> str:
+        """
+        Render a tool result within the caps.
+
+        Args:
+            result: Value returned by the Python tool (frame, scalar or printed text)
+
+        Returns:
+            Observation text for the LLM
+        """
+        if isinstance(result, (pd.DataFrame, pd.Series)):
+            if len(result) <= self.max_rows:
+                text = result.to_string()
+                if estimate_tokens(text) <= self.max_tokens:
+                    return text
+            return self.summarise(result, get_result_store().put(result))
+        return self.truncate(str(result))
+
+    def summarise(self, result: Any, handle: Optional[str]) -> str:
+        """Compact description of a large frame stored under a handle."""
+        frame = result.to_frame() if isinstance(result, pd.Series) else result
+        lines = [
+            f"[Large result stored as {handle!r}: {frame.shape[0]:,} rows x {frame.shape[1]} columns. "
+            f"Only a summary is shown. Use get_result({handle!r}) in code to work with the full result, "
+            "and aggregate or filter it before printing.]",
+            "Columns: " + ", ".join(f"{column} ({dtype})" for column, dtype in frame.dtypes.astype(str).items()),
+            "First rows:",
+            frame.head(Settings.TOOL_OUTPUT_HEAD_ROWS).to_string(),
+        ]
+        numeric = frame.select_dtypes("number")
+        if not numeric.empty:
+            lines += ["Numeric aggregates:", numeric.agg(["sum", "mean", "min", "max"]).round(2).to_string()]
+        return self.truncate("\n".join(lines))
+
+    def truncate(self, text: str) -> str:
+        """Keep the head and tail of text above the token cap."""
+        if estimate_tokens(text) <= self.max_tokens:
+            return text
+        # Characters per token of this text, to size head and tail
+        ratio = max(1, len(text) // max(1, estimate_tokens(text)))
+        keep = self.max_tokens * ratio // 2
+        omitted = len(text) - 2 * keep
+        return (
+            f"{text[:keep]}\n... [{omitted:,} characters omitted - output too large; "
+            f"return a DataFrame instead of printing, or aggregate first] ...\n{text[-keep:]}"
+        )
+
+
+class GovernedPythonTool(PythonAstREPLTool):
+    """Python REPL tool whose observations pass through the OutputGovernor."""
+
+    # Conversation workspace receiving the last frame returned, if any
+    workspace: Optional[AnalysisWorkspace] = None
+    # Note stored with that frame, e.g. the question being answered
+    last_note: str = ""
+
+    def _run(self, query: str, run_manager: Any = None) -> str:
+        result = super()._run(query, run_manager)
+        if self.workspace is not None and isinstance(result, (pd.DataFrame, pd.Series)):
+            self.workspace.save(LAST_RESULT, result, self.last_note)
+        return OutputGovernor().govern(result)
+
+    async def _arun(self, query: str, run_manager: Any = None) -> str:
+        # The base class runs _run on an executor without the caller's context,
+        # which would lose the display_table sink of the current answer
+        return await call_blocking(self._run, query)
+
+
+def govern_python_tool(
+    agent_executor: Any, workspace: Optional[AnalysisWorkspace] = None
+) -> Optional[GovernedPythonTool]:
+    """
+    Replace the pandas agent's Python tool with the governed version in place.
+    The tool keeps its name and namespace, so the LLM's tool binding is unchanged.
+    get_result() and display_table() are added to the namespace, and the
+    conversation workspace as `ws` when given.
+
+    Args:
+        agent_executor: Executor returned by create_pandas_dataframe_agent
+        workspace: Workspace of the conversation, or None for one-off questions
+
+    Returns:
+        The governed tool, or None if the executor has no Python tool
+    """
+    for position, tool in enumerate(agent_executor.tools):
+        if isinstance(tool, PythonAstREPLTool) and not isinstance(tool, GovernedPythonTool):
+            # Generated code only reaches results of the tenant it runs for
+            tool.locals["get_result"] = partial(get_result_store().get, tenant=current_tenant())
+            tool.locals["display_table"] = display_table
+            if workspace is not None:
+                tool.locals["ws"] = workspace
+            governed = GovernedPythonTool(
+                locals=tool.locals, globals=tool.globals, workspace=workspace
+            )
+            agent_executor.tools[position] = governed
+            return governed
+    return None
@@ -3,13 +3,20 @@ Pandas Agent service for data analysis using LangChain.
 """
 
 import streamlit as st
-from typing import Generator
+from typing import AsyncGenerator, Generator, List, Optional, Union
 import pandas as pd
-from langchain_openai import ChatOpenAI
 from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
 
 from config.settings import Settings
 from agents.base_agent import BaseAgent
+from services.analysis_workspace import AnalysisWorkspace
+from services.async_runtime import run
+from services.dataset_store import DatasetStore
+from services.llm import create_llm
+from services.llm_scheduler import SchedulerOverloaded
+from services.output_governor import govern_python_tool
+from services.resilience import DEADLINE_MESSAGE, LLMDeadlineExceeded
+from services.result_store import TableResult, collect_tables
 
 
 class PandasAgentService:
@@ -18,54 +25,91 @@ class PandasAgentService:
     Provides more accurate data analysis capabilities.
     """
 
-    def __init__(self, dataframe: pd.DataFrame, agent: BaseAgent):
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        agent: BaseAgent,
+        workspace: Optional[AnalysisWorkspace] = None,
+    ):
         """
         Initialize the Pandas Agent service.
 
         Args:
             dataframe: The pandas DataFrame to query
             agent: The agent instance for system prompt configuration
+            workspace: Frames kept from earlier turns of the conversation, if any
         """
         self._validate_api_key()
         self.dataframe = dataframe
         self.agent = agent
+        self.workspace = workspace
+        # Governed Python tool of the agent, set by _create_agent
+        self.python_tool = None
         self.pandas_agent = self._create_agent()
+        # Tables displayed by the last invoke(), rendered natively by the UI
+        self.tables: List[TableResult] = []
 
     def _validate_api_key(self) -> None:
         """Validate that OpenAI API key is configured."""
-        if "OPENAI_API_KEY" not in st.secrets:
+        if not Settings.get_openai_api_key():
             st.error(
-                "OpenAI API Key not found. Please set `OPENAI_API_KEY` in `.streamlit/secrets.toml`."
+                "OpenAI API Key not found. Please set `OPENAI_API_KEY` in the environment or `.streamlit/secrets.toml`."
             )
             st.stop()
 
     def _create_agent(self):
         """Create and return the LangChain Pandas DataFrame Agent."""
         try:
-            llm = ChatOpenAI(
-                model=Settings.OPENAI_MODEL,
-                api_key=st.secrets["OPENAI_API_KEY"],
-                temperature=0,  # More deterministic for data queries
-            )
+            llm = create_llm(temperature=0)  # More deterministic for data queries
 
             # Create the pandas agent with the dataframe
             pandas_agent = create_pandas_dataframe_agent(
                 llm=llm,
-                df=self.dataframe,
+                # The shared frame stays untouched by generated code
+                df=DatasetStore.private_copy(self.dataframe),
                 agent_type="tool-calling",
                 verbose=True,
                 allow_dangerous_code=True,  # Required for pandas operations
                 prefix=self.agent.get_system_prompt(),
+                # The agent's data profile already carries sample rows
+                include_df_in_prompt=False,
+                extra_tools=self.agent.get_tools(),
+                max_execution_time=Settings.AGENT_MAX_EXECUTION_SECONDS,
             )
 
+            # Cap observation size so large printed frames never flood the context
+            self.python_tool = govern_python_tool(pandas_agent, self.workspace)
+
             return pandas_agent
         except Exception as e:
             st.error(f"Error creating Pandas Agent: {e}")
             st.stop()
 
+    def _with_workspace(self, query: str) -> str:
+        """
+        Append the workspace description to the query. It goes in the input,
+        not the system prompt, so the cacheable prompt prefix stays unchanged.
+        """
+        description = self.workspace.describe() if self.workspace is not None else ""
+        return f"{query}\n\n{description}" if description else query
+
     def invoke(self, query: str) -> str:
         """
         Invoke the pandas agent with a query.
+        The agent runs on the shared LLM event loop; this thread waits for it.
+
+        Args:
+            query: The user's question about the data
+
+        Returns:
+            The agent's response as a string
+        """
+        return run(self.ainvoke(query))
+
+    async def ainvoke(self, query: str) -> str:
+        """
+        Run the pandas agent as a task on the shared LLM event loop.
+        Its Python tool still executes on the loop's executor.
 
         Args:
             query: The user's question about the data
@@ -74,14 +118,40 @@ class PandasAgentService:
             The agent's response as a string
         """
         try:
-            result = self.pandas_agent.invoke({"input": query})
+            if self.python_tool is not None:
+                self.python_tool.last_note = f"last result, for: {query[:120]}"
+            with collect_tables() as self.tables:
+                result = await self.pandas_agent.ainvoke({"input": self._with_workspace(query)})
             return result.get(
                 "output", "I couldn't process that query. Please try again."
             )
+        except SchedulerOverloaded:
+            return SchedulerOverloaded.USER_MESSAGE
+        except LLMDeadlineExceeded:
+            return DEADLINE_MESSAGE
         except Exception as e:
             return f"I encountered an error while analyzing the data: {str(e)}"
 
-    def stream_response(self, query: str) -> Generator[str, None, None]:
+    @staticmethod
+    def _chunks(response: str) -> List[str]:
+        """Split a complete response into chunks of a few words."""
+        words = response.split(" ")
+        chunks = []
+        buffer = ""
+
+        for i, word in enumerate(words):
+            buffer += word
+            if i < len(words) - 1:
+                buffer += " "
+
+            # Yield every few words to simulate streaming
+            if len(buffer) > 20 or i == len(words) - 1:
+                chunks.append(buffer)
+                buffer = ""
+
+        return chunks
+
+    def stream_response(self, query: str) -> Generator[Union[str, TableResult], None, None]:
         """
         Stream the response from the pandas agent.
         Note: Pandas agent doesn't support true streaming, so we simulate it.
@@ -90,21 +160,23 @@ class PandasAgentService:
             query: The user's question about the data
 
         Yields:
-            Chunks of the response (simulated streaming)
+            Chunks of the response (simulated streaming), then the tables it displayed
         """
         # Get the full response first
         response = self.invoke(query)
+        yield from self._chunks(response)
+        yield from self.tables
 
-        # Simulate streaming by yielding chunks
-        words = response.split(" ")
-        buffer = ""
+    async def astream_response(self, query: str) -> AsyncGenerator[Union[str, TableResult], None]:
+        """
+        Async variant of stream_response() for callers on the shared LLM loop.
 
-        for i, word in enumerate(words):
-            buffer += word
-            if i < len(words) - 1:
-                buffer += " "
+        Args:
+            query: The user's question about the data
 
-            # Yield every few words to simulate streaming
-            if len(buffer) > 20 or i == len(words) - 1:
-                yield buffer
-                buffer = ""
+        Yields:
+            Chunks of the response (simulated streaming), then the tables it displayed
+        """
+        response = await self.ainvoke(query)
+        for chunk in self._chunks(response) + self.tables:
+            yield chunk
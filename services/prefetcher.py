@@ -0,0 +1,168 @@
+"""
+Background precomputation of answers users are likely to ask for next.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from agents.base_agent import BaseAgent
+from config.settings import Settings
+from services.agent_runner import AgentRunner
+from services.answer_cache import AnswerCache, AnswerKey, CachedAnswer, get_answer_cache
+from services.conversation_store import get_conversation_store
+from services.llm_scheduler import SchedulerOverloaded, get_scheduler, scheduling_context
+from services.resilience import DEADLINE_MESSAGE
+from services.result_store import TableResult
+from services.usage_ledger import BUDGET_EXHAUSTED, BUDGET_EXHAUSTED_MESSAGE, get_usage_ledger
+
+
+logger = logging.getLogger("auditbot.prefetcher")
+
+# Answers starting like this are error messages and must not be cached
+FAILURE_PREFIXES = (
+    "I encountered",
+    "I couldn't",
+    SchedulerOverloaded.USER_MESSAGE,
+    DEADLINE_MESSAGE,
+    BUDGET_EXHAUSTED_MESSAGE,
+)
+
+
+class Prefetcher:
+    """
+    Answers the agents' suggested questions and the most common follow-ups
+    on background threads, so that clicking them is served from the answer
+    cache. Runs at low priority: a job waits until the LLM scheduler is
+    mostly idle, and all jobs share a daily cost budget.
+    """
+
+    def __init__(self, cache: AnswerCache, workers: int = Settings.PREFETCH_WORKERS):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            cache: Cache receiving the answers
+            workers: Background threads running prefetch jobs
+        """
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        # Keys queued or running, so every question is prefetched once
+        self._pending: Set[AnswerKey] = set()
+        # Keys whose answer failed; not retried until the reports change.
+        # Bounded like the answer cache, least recently failed first.
+        self._failed: "OrderedDict[AnswerKey, None]" = OrderedDict()
+
+    def schedule_suggestions(self, agent: BaseAgent) -> None:
+        """
+        Prefetch the agent's suggested questions for the current report versions.
+
+        Args:
+            agent: Agent whose suggestions are shown in the sidebar
+        """
+        for question in agent.suggested_messages:
+            self._submit(agent, [], question)
+
+    def schedule_follow_ups(self, agent: BaseAgent, question: str, answer: str) -> None:
+        """
+        Prefetch the questions most often asked after `question`.
+
+        Args:
+            agent: Agent that answered
+            question: The question just answered
+            answer: Its answer, given to the agent as conversation context
+        """
+        if agent.uses_pandas_agent:
+            # Pandas agents see only the last question, so a follow-up
+            # answered without the conversation's workspace would be wrong
+            return
+        follow_ups = get_conversation_store().likely_follow_ups(
+            agent.name, question, Settings.PREFETCH_MAX_FOLLOW_UPS
+        )
+        history = [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer},
+        ]
+        for follow_up in follow_ups:
+            self._submit(agent, history, follow_up)
+
+    def _submit(self, agent: BaseAgent, history: List[Dict[str, str]], question: str) -> None:
+        previous = history[0]["content"] if history else ""
+        key = self.cache.key(agent.name, previous, question)
+        with self._lock:
+            if key in self._pending or key in self._failed or key in self.cache:
+                return
+            self._pending.add(key)
+        self._pool.submit(self._run, agent, history, question, key)
+
+    def _fail(self, key: AnswerKey) -> None:
+        """Remember a failed key, forgetting those of older report versions."""
+        with self._lock:
+            # Keys carry the reports version; once it changes, old failures can never match
+            for stale in [failed for failed in self._failed if failed[1] != key[1]]:
+                del self._failed[stale]
+            self._failed[key] = None
+            self._failed.move_to_end(key)
+            while len(self._failed) > self.cache.max_entries:
+                self._failed.popitem(last=False)
+
+    @staticmethod
+    def _wait_for_idle() -> bool:
+        """Wait until interactive traffic leaves spare LLM capacity; False on timeout."""
+        scheduler = get_scheduler()
+        deadline = time.monotonic() + Settings.PREFETCH_MAX_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            stats = scheduler.stats()
+            busy = stats["in_flight"] / scheduler.max_concurrency
+            if stats["waiting"] == 0 and busy < Settings.PREFETCH_MAX_LOAD:
+                return True
+            time.sleep(Settings.PREFETCH_IDLE_POLL_SECONDS)
+        return False
+
+    def _run(
+        self, agent: BaseAgent, history: List[Dict[str, str]], question: str, key: AnswerKey
+    ) -> None:
+        """Answer one question in the background and cache a successful answer."""
+        try:
+            ledger = get_usage_ledger()
+            if ledger.budget_state(Settings.PREFETCH_TENANT) == BUDGET_EXHAUSTED:
+                return
+            if not self._wait_for_idle():
+                return
+            text, tables = "", []
+            with scheduling_context(Settings.PREFETCH_TENANT):
+                for chunk in AgentRunner.stream_response(
+                    agent=agent,
+                    chat_history=history + [{"role": "user", "content": question}],
+                ):
+                    if isinstance(chunk, TableResult):
+                        tables.append(chunk)
+                    else:
+                        text += chunk
+            if text and not text.startswith(FAILURE_PREFIXES):
+                self.cache.put(key, CachedAnswer(text, tables))
+            else:
+                self._fail(key)
+        except Exception:
+            logger.exception("Prefetch failed for %s: %r", agent.name, question)
+            self._fail(key)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Return the process-wide prefetcher."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(get_answer_cache())
+        return _prefetcher
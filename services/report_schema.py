@@ -0,0 +1,36 @@
+"""
+Column names and code values of the SAP SOD Risk and User reports.
+"""
+
+# --- SOD Risk Report (AI_SOD_Risk_Report.xlsx) ---
+SOD_USER_ID = "User ID"
+SOD_RISK_TYPE = "Risk Type"
+SOD_RISK_LEVEL = "Risk Level"
+SOD_BUS_MODULE = "Bus Module"
+SOD_RISK_EXEC = "Risk Exec"
+SOD_RISK_ID = "Risk ID"
+SOD_RISK_NAME = "Risk Name"
+
+RISK_EXECUTED = "@0A@"
+RISK_NOT_EXECUTED = "@08@"
+RISK_LEVEL_HIGH = "H"
+RISK_LEVEL_MEDIUM = "M"
+RISK_TYPE_SOD = "SOD Risk"
+RISK_TYPE_SENSITIVE_TCODE = "Sensitive Trx Codes Risk"
+
+# --- User Report (AI_Users_List_Report.xlsx) ---
+USER_TYPE = "User Status / User Type"
+USER_ID = "SAP User ID"
+USER_ACTIVE = "Active"
+USER_LOCKED = "User Locked"
+USER_EXPIRED = "Expired"
+USER_LAST_NAME = "Last Name"
+USER_FIRST_NAME = "First Name"
+USER_ROLE_COUNT = "Role Count"
+USER_VALID_FROM = "User Valid From"
+USER_VALID_TO = "User Valid To"
+USER_CREATED_ON = "User Created On"
+USER_LAST_LOGON = "User Last Logon"
+
+FLAG_SET = "X"
+USER_TYPE_DIALOG = "DIALOG USER"
@@ -0,0 +1,305 @@
+"""
+Retry, deadline and hedged-request policy for LLM calls.
+"""
+
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar
+
+import httpx
+import openai
+
+from config.settings import Settings
+from services.metrics import get_metrics
+
+
+T = TypeVar("T")
+
+DEADLINE_MESSAGE = (
+    "The language model did not respond in time. Please try your question again."
+)
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when an LLM call does not finish within its deadline."""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is worth retrying (timeouts, throttling, 5xx, network)."""
+    if isinstance(
+        error,
+        (
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.RateLimitError,
+            openai.InternalServerError,
+            httpx.TimeoutException,
+            httpx.NetworkError,
+        ),
+    ):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class ResiliencePolicy:
+    """
+    Per-call deadline, exponential-backoff retries on transient errors and
+    optional hedging: when a stream's first token is late, a duplicate request
+    is started and whichever answers first wins. Every decision emits a metric.
+    Calls run as coroutines on the caller's event loop.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float = Settings.LLM_CALL_DEADLINE_SECONDS,
+        max_retries: int = Settings.LLM_MAX_RETRIES,
+        backoff_base_seconds: float = Settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = Settings.LLM_BACKOFF_MAX_SECONDS,
+        hedge_after_seconds: Optional[float] = Settings.LLM_HEDGE_AFTER_SECONDS,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            deadline_seconds: Wall-clock budget for a call including retries
+            max_retries: Retries after the first attempt for transient errors
+            backoff_base_seconds: Base delay of the exponential backoff
+            backoff_max_seconds: Upper bound of a single backoff delay
+            hedge_after_seconds: Start a duplicate stream when no token arrived
+                within this many seconds; None disables hedging
+        """
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+
+    async def _backoff(
+        self, attempt: int, deadline: float, operation: str, error: BaseException
+    ) -> None:
+        """Wait before the next attempt or raise if the deadline does not allow it."""
+        remaining = deadline - time.monotonic()
+        if attempt >= self.max_retries or remaining <= 0:
+            get_metrics().increment(
+                "llm.retry_exhausted", operation=operation, error=type(error).__name__
+            )
+            raise error
+        # Full jitter keeps retries from many sessions from synchronising
+        delay = random.uniform(
+            0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt)
+        )
+        get_metrics().increment(
+            "llm.retry", operation=operation, error=type(error).__name__, attempt=attempt + 1
+        )
+        await asyncio.sleep(min(delay, remaining))
+
+    async def call(self, fn: Callable[[], Awaitable[T]], operation: str) -> T:
+        """
+        Await a call with retries on transient errors.
+
+        Args:
+            fn: Zero-argument callable returning a new awaitable request
+            operation: Metric tag naming the call site
+
+        Returns:
+            The request's result
+        """
+        metrics = get_metrics()
+        started = time.monotonic()
+        deadline = started + self.deadline_seconds
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+                metrics.observe("llm.latency_seconds", time.monotonic() - started, operation=operation)
+                return result
+            except Exception as error:
+                if not is_transient(error):
+                    metrics.increment("llm.error", operation=operation, error=type(error).__name__)
+                    raise
+                await self._backoff(attempt, deadline, operation, error)
+                attempt += 1
+
+    async def stream(
+        self,
+        factory: Callable[[int], AsyncIterator[T]],
+        operation: str,
+        can_hedge: Optional[Callable[[], bool]] = None,
+    ) -> AsyncIterator[T]:
+        """
+        Stream a response under the policy.
+        Retries only happen before the first chunk, so output is never duplicated.
+
+        Args:
+            factory: Callable starting a new async stream; receives the attempt
+                index within the current race (0 = primary, 1 = hedge)
+            operation: Metric tag naming the call site
+            can_hedge: Optional check consulted before starting a hedge, e.g.
+                whether the scheduler has spare capacity
+
+        Yields:
+            Chunks of the winning stream
+        """
+        metrics = get_metrics()
+        started = time.monotonic()
+        deadline = started + self.deadline_seconds
+        attempt = 0
+        while True:
+            race = _StreamRace(factory)
+            try:
+                first = await race.first(self.hedge_after_seconds, deadline, operation, can_hedge)
+                metrics.observe(
+                    "llm.first_token_seconds", time.monotonic() - started, operation=operation
+                )
+            except LLMDeadlineExceeded:
+                race.cancel()
+                metrics.increment("llm.timeout", operation=operation, phase="first_token")
+                raise
+            except Exception as error:
+                race.cancel()
+                if not is_transient(error):
+                    metrics.increment("llm.error", operation=operation, error=type(error).__name__)
+                    raise
+                await self._backoff(attempt, deadline, operation, error)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled while waiting: stop the competing requests too
+                race.cancel()
+                raise
+
+            try:
+                if first is not _StreamRace.DONE:
+                    yield first
+                    async for chunk in race.rest(deadline):
+                        yield chunk
+            except LLMDeadlineExceeded:
+                metrics.increment("llm.timeout", operation=operation, phase="streaming")
+                raise
+            finally:
+                race.cancel()
+            metrics.observe("llm.latency_seconds", time.monotonic() - started, operation=operation)
+            return
+
+
+class _StreamRace:
+    """Runs one or two competing streams as tasks feeding a shared queue."""
+
+    DONE = object()
+
+    def __init__(self, factory: Callable[[int], AsyncIterator]):
+        self._factory = factory
+        self._queue: "asyncio.Queue" = asyncio.Queue(maxsize=Settings.LLM_STREAM_BUFFER)
+        self._tasks: List[asyncio.Task] = []
+        self._failed = 0
+        self._winner: Optional[int] = None
+        self._start()
+
+    def _start(self) -> None:
+        """Start another competing stream in a copy of the current context."""
+        attempt_id = len(self._tasks)
+        self._tasks.append(asyncio.get_running_loop().create_task(self._pump(attempt_id)))
+
+    async def _pump(self, attempt_id: int) -> None:
+        """Copy one stream into the shared queue."""
+        try:
+            stream = self._factory(attempt_id)
+            try:
+                async for chunk in stream:
+                    # A stream that lost the race stops as soon as it notices
+                    if self._winner not in (None, attempt_id):
+                        return
+                    await self._queue.put((attempt_id, "chunk", chunk))
+            finally:
+                close = getattr(stream, "aclose", None)
+                if close is not None:
+                    await close()
+            await self._queue.put((attempt_id, "done", None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            await self._queue.put((attempt_id, "error", error))
+
+    async def _get(self, until: float):
+        """Next queued event, raising asyncio.TimeoutError once `until` has passed."""
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        return await asyncio.wait_for(self._queue.get(), remaining)
+
+    async def first(
+        self,
+        hedge_after: Optional[float],
+        deadline: float,
+        operation: str,
+        can_hedge: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Wait for the first chunk from any competing stream.
+
+        Returns:
+            The first chunk, or DONE if the winning stream was empty
+        """
+        hedge_at = time.monotonic() + hedge_after if hedge_after else None
+        while True:
+            until = min(deadline, hedge_at) if hedge_at else deadline
+            try:
+                attempt_id, kind, payload = await self._get(until)
+            except asyncio.TimeoutError:
+                if hedge_at and time.monotonic() < deadline:
+                    hedge_at = None
+                    if can_hedge is None or can_hedge():
+                        get_metrics().increment("llm.hedge_started", operation=operation)
+                        self._start()
+                    else:
+                        get_metrics().increment("llm.hedge_skipped", operation=operation)
+                    continue
+                raise LLMDeadlineExceeded("No response from the LLM before the deadline")
+
+            if kind == "error":
+                self._failed += 1
+                if self._failed >= len(self._tasks):
+                    raise payload
+                continue
+            self._winner = attempt_id
+            # The losing request is cancelled instead of streamed to the end
+            for index, task in enumerate(self._tasks):
+                if index != attempt_id:
+                    task.cancel()
+            if attempt_id > 0:
+                get_metrics().increment("llm.hedge_won", operation=operation)
+            return payload if kind == "chunk" else self.DONE
+
+    async def rest(self, deadline: float) -> AsyncIterator:
+        """Yield the remaining chunks of the winning stream."""
+        while True:
+            try:
+                attempt_id, kind, payload = await self._get(deadline)
+            except asyncio.TimeoutError:
+                raise LLMDeadlineExceeded("LLM stream exceeded its deadline")
+            if attempt_id != self._winner:
+                continue
+            if kind == "done":
+                return
+            if kind == "error":
+                raise payload
+            yield payload
+
+    def cancel(self) -> None:
+        """Stop all competing streams."""
+        for task in self._tasks:
+            task.cancel()
+
+
+_policy: Optional[ResiliencePolicy] = None
+
+
+def get_policy() -> ResiliencePolicy:
+    """Return the default resilience policy built from Settings."""
+    global _policy
+    if _policy is None:
+        _policy = ResiliencePolicy()
+    return _policy
@@ -0,0 +1,282 @@
+"""
+Server-side store for analysis results: frames too large to send back to the
+LLM, and tables shown to the user natively instead of being re-typed by it.
+"""
+
+import contextvars
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from config.settings import Settings
+from services.llm_scheduler import current_tenant
+
+
+Result = Union[pd.DataFrame, pd.Series]
+
+
+class TableResult:
+    """Reference to a stored frame that the UI renders as an interactive table."""
+
+    __slots__ = ("handle", "title", "rows", "columns")
+
+    def __init__(self, handle: str, title: str, rows: int, columns: int):
+        self.handle = handle
+        self.title = title
+        self.rows = rows
+        self.columns = columns
+
+    def __str__(self) -> str:
+        # This is what the LLM sees after a table was displayed
+        caption = f" {self.title!r}" if self.title else ""
+        return (
+            f"[Table{caption} with {self.rows:,} rows x {self.columns} columns is now shown to the user. "
+            "Do not repeat its rows; answer with a short narrative of the key findings.]"
+        )
+
+    def to_dict(self) -> Dict:
+        """Serialisable form stored with the chat message."""
+        return {"handle": self.handle, "title": self.title, "rows": self.rows, "columns": self.columns}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TableResult":
+        """Rebuild a reference from its serialised form."""
+        return cls(data["handle"], data.get("title", ""), data.get("rows", 0), data.get("columns", 0))
+
+
+class ResultStore:
+    """
+    Memory-bounded LRU of result frames addressed by unguessable handles.
+    The oldest results are evicted once the total size exceeds the limit;
+    persisted results are reloaded from disk on demand. Every result belongs
+    to the tenant that produced it; persisted results are pruned by age and
+    total size on disk.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = Settings.RESULT_STORE_MAX_BYTES,
+        directory: str = Settings.RESULT_STORE_DIR,
+        max_disk_bytes: int = Settings.RESULT_STORE_MAX_DISK_BYTES,
+        max_age_seconds: float = Settings.RESULT_STORE_MAX_AGE_SECONDS,
+    ):
+        """
+        Initialize the store and prune what earlier runs left on disk.
+
+        Args:
+            max_bytes: Upper bound of the summed in-memory frame size
+            directory: Where persisted results are written as Parquet
+            max_disk_bytes: Upper bound of the summed size of persisted results
+            max_age_seconds: Persisted results older than this are deleted
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, Tuple[Result, int, str]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._pruned_at = 0.0
+        self.prune()
+
+    def _path(self, handle: str, owner: str) -> str:
+        # Owners are caller-supplied header values, so they are hashed into directory names
+        owner_dir = hashlib.sha256(owner.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, owner_dir, f"{os.path.basename(handle)}.parquet")
+
+    @staticmethod
+    def _readable(owner: str, tenant: str) -> bool:
+        """Whether a tenant may read a result; prefetched answers are shared by all tenants."""
+        return owner in (tenant, Settings.PREFETCH_TENANT)
+
+    def _remember(self, handle: str, result: Result, owner: str) -> None:
+        """Add a result to the in-memory LRU and evict beyond the size limit."""
+        size = int(result.memory_usage(deep=True).sum()) if isinstance(result, pd.DataFrame) else int(
+            result.memory_usage(deep=True)
+        )
+        with self._lock:
+            self._results[handle] = (result, size, owner)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._results) > 1:
+                _, (_, evicted, _) = self._results.popitem(last=False)
+                self._bytes -= evicted
+
+    def put(self, result: Result, persist: bool = False, owner: Optional[str] = None) -> str:
+        """
+        Store a result and return its handle.
+
+        Args:
+            result: DataFrame or Series to keep
+            persist: Also write it to disk so it survives eviction and restarts
+            owner: Tenant allowed to read it; defaults to the current tenant
+
+        Returns:
+            Handle such as 'res_3f9a1c2b5d7e4f60a1b2c3d4e5f60718'
+        """
+        handle = f"res_{uuid.uuid4().hex}"
+        owner = current_tenant() if owner is None else owner
+        self._remember(handle, result, owner)
+        if persist:
+            frame = result.to_frame() if isinstance(result, pd.Series) else result
+            frame = frame.copy(deep=False)
+            frame.columns = [str(column) for column in frame.columns]
+            path = self._path(handle, owner)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            frame.to_parquet(path)
+            self._written(os.path.getsize(path))
+        return handle
+
+    def get(self, handle: str, tenant: str) -> Optional[Result]:
+        """
+        Return a stored result, or None if unknown, evicted and not persisted,
+        or owned by another tenant.
+
+        Args:
+            handle: Handle returned by put()
+            tenant: Tenant asking; it reads its own and prefetched results
+        """
+        with self._lock:
+            entry = self._results.get(handle)
+            if entry is not None:
+                if not self._readable(entry[2], tenant):
+                    return None
+                self._results.move_to_end(handle)
+                return entry[0]
+        for owner in (tenant, Settings.PREFETCH_TENANT):
+            try:
+                frame = pd.read_parquet(self._path(handle, owner))
+            except FileNotFoundError:
+                continue
+            self._remember(handle, frame, owner)
+            return frame
+        return None
+
+    def _written(self, size: int) -> None:
+        """Account for a persisted result and prune when over size or due."""
+        with self._disk_lock:
+            self._disk_bytes += size
+            due = (
+                self._disk_bytes > self.max_disk_bytes
+                or time.monotonic() - self._pruned_at > Settings.RESULT_STORE_PRUNE_SECONDS
+            )
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Delete persisted results older than the age limit, then the oldest
+        ones until the total size is within the disk limit.
+
+        Returns:
+            Number of files deleted
+        """
+        with self._disk_lock:
+            files = []
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    if not name.endswith(".parquet"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            cutoff = time.time() - self.max_age_seconds
+            deleted = 0
+            for modified, size, path in files:
+                if modified >= cutoff and total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                deleted += 1
+            self._disk_bytes = total
+            self._pruned_at = time.monotonic()
+            return deleted
+
+
+def iter_csv(frame: pd.DataFrame, chunk_rows: int = Settings.RESULT_EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode a frame as CSV in row chunks, so large exports can be streamed.
+
+    Args:
+        frame: Frame to export
+        chunk_rows: Rows encoded per chunk
+
+    Yields:
+        UTF-8 encoded CSV chunks, the first one including the header
+    """
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def to_parquet_bytes(frame: pd.DataFrame) -> bytes:
+    """Encode a frame as Parquet."""
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+# Tables displayed during the current turn; None when nobody is collecting
+_displayed: contextvars.ContextVar[Optional[List[TableResult]]] = contextvars.ContextVar(
+    "displayed_tables", default=None
+)
+
+
+@contextmanager
+def collect_tables() -> Iterator[List[TableResult]]:
+    """Collect the tables displayed by tools while answering one question."""
+    tables: List[TableResult] = []
+    token = _displayed.set(tables)
+    try:
+        yield tables
+    finally:
+        _displayed.reset(token)
+
+
+def display_table(result: Result, title: str = "") -> TableResult:
+    """
+    Show a frame to the user as a native table instead of having the LLM re-type it.
+
+    Args:
+        result: DataFrame or Series to display
+        title: Optional caption
+
+    Returns:
+        Reference to the persisted table
+    """
+    frame = result.to_frame() if isinstance(result, pd.Series) else result
+    table = TableResult(get_result_store().put(frame, persist=True), title, len(frame), len(frame.columns))
+    tables = _displayed.get()
+    if tables is not None:
+        tables.append(table)
+    return table
+
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
@@ -0,0 +1,332 @@
+"""
+Sparse user x Risk ID matrix over the SOD Risk Report for similarity,
+peer-group and outlier questions.
+"""
+
+import logging
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import squareform
+
+from config.settings import Settings
+from services.dataset_store import get_dataset_store
+from services import report_schema as rs
+
+
+logger = logging.getLogger("auditbot.risk_profiles")
+
+# SOD Risk Report columns the matrix is built from
+PROFILE_COLUMNS = [
+    rs.SOD_USER_ID,
+    rs.SOD_RISK_ID,
+    rs.SOD_RISK_NAME,
+    rs.SOD_RISK_LEVEL,
+    rs.SOD_RISK_EXEC,
+]
+
+class RiskProfileMatrix:
+    """
+    One row per user and one column per Risk ID. A cell holds the weight of
+    the user's heaviest occurrence of that risk (level weight, multiplied
+    when executed). Rows are L2-normalised once, so cosine similarity
+    between users is a sparse product. The nearest neighbours of every user,
+    the peer groups and the outlier scores are computed when the matrix is built.
+    """
+
+    def __init__(
+        self,
+        sod: pd.DataFrame,
+        level_weights: Optional[Dict[str, float]] = None,
+        executed_weight: float = Settings.RISK_PROFILE_EXECUTED_WEIGHT,
+        neighbours: int = Settings.RISK_PROFILE_NEIGHBOURS,
+        peer_min_similarity: float = Settings.RISK_PEER_MIN_SIMILARITY,
+    ):
+        """
+        Build the matrix and the neighbour graph.
+
+        Args:
+            sod: SOD Risk Report frame
+            level_weights: Weight per Risk Level code; other levels weigh 1
+            executed_weight: Multiplier for executed risks
+            neighbours: Nearest neighbours kept per user
+            peer_min_similarity: Least similarity between any two members of a peer group
+        """
+        if level_weights is None:
+            level_weights = Settings.RISK_PROFILE_LEVEL_WEIGHTS
+        rows = sod[PROFILE_COLUMNS].dropna(subset=[rs.SOD_USER_ID, rs.SOD_RISK_ID])
+        user_ids = rows[rs.SOD_USER_ID].astype(str).str.strip()
+        risk_ids = rows[rs.SOD_RISK_ID].astype(str).str.strip()
+
+        user_codes, self.users = pd.factorize(user_ids)
+        risk_codes, self.risks = pd.factorize(risk_ids)
+        executed = (rows[rs.SOD_RISK_EXEC] == rs.RISK_EXECUTED).to_numpy()
+        weights = rows[rs.SOD_RISK_LEVEL].map(level_weights).fillna(1.0).to_numpy(dtype=np.float32)
+        weights *= np.where(executed, executed_weight, 1.0).astype(np.float32)
+
+        # Keep the heaviest occurrence of each (user, risk) pair
+        order = np.lexsort((-weights, risk_codes, user_codes))
+        user_codes, risk_codes, weights = user_codes[order], risk_codes[order], weights[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (user_codes[1:] != user_codes[:-1]) | (risk_codes[1:] != risk_codes[:-1])
+        shape = (len(self.users), len(self.risks))
+        self.matrix = sparse.csr_matrix(
+            (weights[first], (user_codes[first], risk_codes[first])), shape=shape
+        )
+        self.incidence = (self.matrix > 0).astype(np.float32)
+        norms = np.sqrt(self.matrix.multiply(self.matrix).sum(axis=1)).A1
+        self.normalised = sparse.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ self.matrix
+        self.normalised = self.normalised.astype(np.float32).tocsr()
+
+        names = rows[rs.SOD_RISK_NAME].fillna("").astype(str).to_numpy()
+        self.risk_names = pd.Series(names, index=risk_ids.to_numpy()).groupby(level=0).first()
+        self._positions = {user.upper(): position for position, user in enumerate(self.users)}
+
+        self.neighbour_ids, self.neighbour_similarity = self._neighbours(neighbours)
+        self.peer_group, self.peer_group_size = self._peer_groups(peer_min_similarity)
+        self.outliers = self._outlier_table()
+
+    def position(self, user_id: str) -> Optional[int]:
+        """Row of a user id (case-insensitive), or None if the user has no risks."""
+        return self._positions.get(str(user_id).strip().upper())
+
+    def _neighbours(self, k: int):
+        """
+        Top-k most similar users of every user, computed in row blocks so the
+        dense similarity block stays bounded.
+
+        Returns:
+            (neighbour positions, similarities), each users x k, most similar first
+        """
+        count = self.normalised.shape[0]
+        k = max(0, min(k, count - 1))
+        ids = np.zeros((count, k), dtype=np.int64)
+        similarity = np.zeros((count, k), dtype=np.float32)
+        if k == 0:
+            return ids, similarity
+        transposed = self.normalised.T.tocsc()
+        for start in range(0, count, Settings.RISK_PROFILE_BLOCK_ROWS):
+            stop = min(start + Settings.RISK_PROFILE_BLOCK_ROWS, count)
+            block = (self.normalised[start:stop] @ transposed).toarray()
+            # A user is not its own neighbour
+            block[np.arange(stop - start), np.arange(start, stop)] = -1.0
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_similarity = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_similarity, axis=1, kind="stable")
+            ids[start:stop] = np.take_along_axis(top, order, axis=1)
+            similarity[start:stop] = np.take_along_axis(top_similarity, order, axis=1)
+        return ids, similarity
+
+    def _peer_groups(self, min_similarity: float):
+        """
+        Complete-linkage peer groups: any two members of a group are at least
+        `min_similarity` similar, so a group cannot chain through intermediate
+        users. Candidates are the connected components of the neighbour graph
+        restricted to such edges; each is clustered over its distinct profiles.
+        Users without such a neighbour form their own group.
+
+        Returns:
+            (group label per user, size of each user's group)
+        """
+        count = self.normalised.shape[0]
+        if count == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        k = self.neighbour_ids.shape[1]
+        close = self.neighbour_similarity >= min_similarity
+        sources = np.repeat(np.arange(count), k)[close.ravel()]
+        targets = self.neighbour_ids.ravel()[close.ravel()]
+        graph = sparse.csr_matrix(
+            (np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(count, count)
+        )
+        _, components = connected_components(graph, directed=False)
+
+        labels = np.empty(count, dtype=np.int64)
+        next_label = 0
+        for members in np.split(
+            np.argsort(components, kind="stable"), np.cumsum(np.bincount(components))[:-1]
+        ):
+            clusters = self._complete_linkage(members, graph, min_similarity)
+            labels[members] = next_label + clusters
+            next_label += clusters.max() + 1
+
+        sizes = np.bincount(labels)
+        # Number groups by descending size so labels are stable and readable
+        ranking = np.argsort(-sizes, kind="stable")
+        relabel = np.empty_like(ranking)
+        relabel[ranking] = np.arange(1, len(ranking) + 1)
+        return relabel[labels], sizes[labels]
+
+    def _complete_linkage(
+        self, members: np.ndarray, graph: sparse.csr_matrix, min_similarity: float
+    ) -> np.ndarray:
+        """
+        Split one candidate component into complete-linkage clusters.
+
+        Returns:
+            0-based cluster number per member
+        """
+        if len(members) == 1:
+            return np.zeros(1, dtype=np.int64)
+        # Users with identical profiles always share a cluster; cluster each profile once
+        rows = self.normalised[members]
+        keys = [
+            rows.indices[rows.indptr[i] : rows.indptr[i + 1]].tobytes()
+            + rows.data[rows.indptr[i] : rows.indptr[i + 1]].tobytes()
+            for i in range(len(members))
+        ]
+        _, first, profile_of = np.unique(np.array(keys, dtype=object), return_index=True, return_inverse=True)
+        if len(first) == 1:
+            return np.zeros(len(members), dtype=np.int64)
+        if len(first) > Settings.RISK_PEER_MAX_LINKAGE_PROFILES:
+            # Too many profiles for a dense distance matrix: keep mutual neighbour links only
+            logger.info("Peer group of %d profiles split by mutual neighbours", len(first))
+            within = graph[members][:, members]
+            _, clusters = connected_components(within.multiply(within.T), directed=False)
+            return clusters.astype(np.int64)
+        profiles = rows[first]
+        distance = 1.0 - (profiles @ profiles.T).toarray().astype(np.float64)
+        np.fill_diagonal(distance, 0.0)
+        tree = linkage(squareform(distance.clip(min=0.0), checks=False), method="complete")
+        # Tolerance for float32 similarities that sit exactly on the threshold
+        clusters = fcluster(tree, t=1.0 - min_similarity + 1e-6, criterion="distance") - 1
+        return clusters[profile_of].astype(np.int64)
+
+    def _outlier_table(self) -> pd.DataFrame:
+        """
+        Every user's outlier score: 1 minus the mean similarity to its nearest
+        neighbours, with the number of its risks none of those neighbours holds.
+        """
+        count = self.normalised.shape[0]
+        k = self.neighbour_ids.shape[1]
+        if k:
+            score = 1.0 - self.neighbour_similarity.clip(min=0).mean(axis=1)
+            adjacency = sparse.csr_matrix(
+                (
+                    np.ones(count * k, dtype=np.float32),
+                    (np.repeat(np.arange(count), k), self.neighbour_ids.ravel()),
+                ),
+                shape=(count, count),
+            )
+            held_by_neighbours = adjacency @ self.incidence
+            shared = self.incidence.multiply(held_by_neighbours).getnnz(axis=1)
+        else:
+            score = np.ones(count, dtype=np.float32)
+            shared = np.zeros(count, dtype=np.int64)
+        risks = self.incidence.getnnz(axis=1)
+        table = pd.DataFrame(
+            {
+                "outlier_score": np.round(score.astype(float), 3),
+                "risks": risks,
+                "risks_unlike_peers": risks - shared,
+                "risk_weight": np.round(self.matrix.sum(axis=1).A1.astype(float), 1),
+                "peer_group": self.peer_group,
+                "peer_group_size": self.peer_group_size,
+            },
+            index=pd.Index(self.users, name=rs.SOD_USER_ID),
+        )
+        return table.sort_values(["outlier_score", "risks_unlike_peers"], ascending=False)
+
+    def similar(self, user_id: str, top_n: int = 10) -> Optional[pd.DataFrame]:
+        """
+        Users whose risk profile is most similar to a user's.
+
+        Args:
+            user_id: SAP user id
+            top_n: Number of users to return
+
+        Returns:
+            Users with their cosine similarity, shared and total risk counts,
+            most similar first; None if the user has no risks
+        """
+        row = self.position(user_id)
+        if row is None:
+            return None
+        similarity = (self.normalised @ self.normalised[row].T).toarray().ravel()
+        shared = (self.incidence @ self.incidence[row].T).toarray().ravel()
+        similarity[row] = -1.0
+        top_n = min(max(1, top_n), len(similarity))
+        top = np.argpartition(-similarity, top_n - 1)[:top_n]
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        top = top[similarity[top] > 0]
+        return pd.DataFrame(
+            {
+                "similarity": np.round(similarity[top].astype(float), 3),
+                "shared_risks": shared[top].astype(np.int64),
+                "risks": self.incidence.getnnz(axis=1)[top],
+                "peer_group": self.peer_group[top],
+            },
+            index=pd.Index(self.users[top], name=rs.SOD_USER_ID),
+        )
+
+    def peers(self, user_id: str) -> Optional[pd.DataFrame]:
+        """
+        Members of a user's peer group with their similarity to the user.
+
+        Returns:
+            Members, most similar first; None if the user has no risks
+        """
+        row = self.position(user_id)
+        if row is None:
+            return None
+        members = np.flatnonzero(self.peer_group == self.peer_group[row])
+        similarity = (self.normalised[members] @ self.normalised[row].T).toarray().ravel()
+        order = np.argsort(-similarity, kind="stable")
+        members, similarity = members[order], similarity[order]
+        return pd.DataFrame(
+            {
+                "similarity": np.round(similarity.astype(float), 3),
+                "risks": self.incidence.getnnz(axis=1)[members],
+                "outlier_score": self.outliers["outlier_score"]
+                .reindex(self.users[members])
+                .to_numpy(),
+            },
+            index=pd.Index(self.users[members], name=rs.SOD_USER_ID),
+        )
+
+    def common_risks(self, user_ids: Sequence[str], top_n: int = 10) -> pd.DataFrame:
+        """
+        Risk IDs held by most of the given users.
+
+        Args:
+            user_ids: SAP user ids; ids without risks are ignored
+            top_n: Number of risks to return
+
+        Returns:
+            Risk ID, name and how many of the users hold it, most common first
+        """
+        positions = [self.position(user_id) for user_id in user_ids]
+        positions = [position for position in positions if position is not None]
+        holders = np.asarray(self.incidence[positions].sum(axis=0)).ravel()
+        top = np.argsort(-holders, kind="stable")[:top_n]
+        top = top[holders[top] > 0]
+        risk_ids = self.risks[top]
+        return pd.DataFrame(
+            {
+                rs.SOD_RISK_ID: risk_ids,
+                rs.SOD_RISK_NAME: self.risk_names.reindex(risk_ids).to_numpy(),
+                "users": holders[top].astype(np.int64),
+            }
+        )
+
+
+def get_risk_profiles(sod_path: str) -> RiskProfileMatrix:
+    """
+    Return the risk profile matrix for the current version of the SOD Risk
+    Report, built once per dataset version.
+
+    Args:
+        sod_path: Path of the SOD Risk Report
+
+    Returns:
+        RiskProfileMatrix over the report
+    """
+    store = get_dataset_store()
+    return store.derived(
+        "risk_profiles",
+        (store.version(sod_path),),
+        lambda: RiskProfileMatrix(store.load(sod_path)),
+    )
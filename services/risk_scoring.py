@@ -0,0 +1,167 @@
+"""
+Vectorised per-user composite risk scoring over the SOD Risk and User reports.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import Settings
+from services.dataset_store import get_dataset_store
+from services import report_schema as rs
+
+
+# Components whose raw value is a count; they are scaled to 0..1 by the max
+COUNT_COMPONENTS = [
+    "high_risks",
+    "medium_risks",
+    "executed_risks",
+    "sensitive_tcode_risks",
+    "role_count",
+]
+# Components that are already 0/1 flags
+FLAG_COMPONENTS = ["dialog_user", "recent_logon", "locked", "expired"]
+
+
+class RiskScoringEngine:
+    """
+    Computes a configurable composite risk score for every user in one
+    vectorised pass: count components are max-scaled to 0..1, flags are 0/1,
+    and the weighted sum is rescaled to 0..100.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            weights: Weight per component; defaults to Settings.RISK_SCORE_WEIGHTS
+        """
+        self.weights = dict(Settings.RISK_SCORE_WEIGHTS if weights is None else weights)
+
+    @staticmethod
+    def _sod_components(sod: pd.DataFrame) -> pd.DataFrame:
+        """Per-user risk counts by level, execution and type."""
+        flags = pd.DataFrame(
+            {
+                rs.SOD_USER_ID: sod[rs.SOD_USER_ID].astype(str),
+                "high_risks": sod[rs.SOD_RISK_LEVEL] == rs.RISK_LEVEL_HIGH,
+                "medium_risks": sod[rs.SOD_RISK_LEVEL] == rs.RISK_LEVEL_MEDIUM,
+                "executed_risks": sod[rs.SOD_RISK_EXEC] == rs.RISK_EXECUTED,
+                "sensitive_tcode_risks": sod[rs.SOD_RISK_TYPE] == rs.RISK_TYPE_SENSITIVE_TCODE,
+            }
+        )
+        return flags.groupby(rs.SOD_USER_ID).sum().astype("int64")
+
+    @staticmethod
+    def _user_components(users: pd.DataFrame) -> pd.DataFrame:
+        """Per-user status flags, role count and last logon recency."""
+        last_logon = pd.to_datetime(users[rs.USER_LAST_LOGON], errors="coerce")
+        # Recency is measured against the report's own snapshot, not today
+        reference = last_logon.max()
+        recent = (reference - last_logon).dt.days <= Settings.RISK_RECENT_LOGON_DAYS
+        components = pd.DataFrame(
+            {
+                "name": (
+                    users[rs.USER_FIRST_NAME].fillna("").astype(str)
+                    + " "
+                    + users[rs.USER_LAST_NAME].fillna("").astype(str)
+                ).str.strip(),
+                "user_type": users[rs.USER_TYPE].fillna("").astype(str),
+                "dialog_user": users[rs.USER_TYPE] == rs.USER_TYPE_DIALOG,
+                "recent_logon": recent.fillna(False),
+                "locked": users[rs.USER_LOCKED] == rs.FLAG_SET,
+                "expired": users[rs.USER_EXPIRED] == rs.FLAG_SET,
+                "role_count": pd.to_numeric(users[rs.USER_ROLE_COUNT], errors="coerce").fillna(0),
+                "last_logon": last_logon,
+            }
+        )
+        components.index = users[rs.USER_ID].astype(str).rename(rs.SOD_USER_ID)
+        return components[~components.index.duplicated()]
+
+    def score(self, sod: pd.DataFrame, users: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score every user found in either report.
+
+        Args:
+            sod: SOD Risk Report frame
+            users: User Report frame
+
+        Returns:
+            DataFrame indexed by user id, sorted by descending score, with the
+            raw components, 'score' (0..100) and 'rank'
+        """
+        table = self._user_components(users).join(self._sod_components(sod), how="outer")
+        table[COUNT_COMPONENTS] = table[COUNT_COMPONENTS].fillna(0).astype("int64")
+        table[FLAG_COMPONENTS] = table[FLAG_COMPONENTS].fillna(False).astype(bool)
+        table[["name", "user_type"]] = table[["name", "user_type"]].fillna("")
+
+        counts = table[COUNT_COMPONENTS].to_numpy(dtype=float)
+        scale = counts.max(axis=0)
+        scaled = np.divide(counts, scale, out=np.zeros_like(counts), where=scale > 0)
+        features = np.hstack([scaled, table[FLAG_COMPONENTS].to_numpy(dtype=float)])
+        weights = np.array(
+            [self.weights.get(name, 0.0) for name in COUNT_COMPONENTS + FLAG_COMPONENTS]
+        )
+        raw = features @ weights
+        # Rescale so the best attainable score is 100 and the worst is 0
+        best = weights.clip(min=0).sum()
+        worst = weights.clip(max=0).sum()
+        span = best - worst
+        table["score"] = np.round(100.0 * (raw - worst) / span, 1) if span else 0.0
+
+        table = table.sort_values(["score", "executed_risks", "high_risks"], ascending=False)
+        table["rank"] = np.arange(1, len(table) + 1)
+        return table
+
+    @staticmethod
+    def query(
+        scores: pd.DataFrame,
+        top_n: int = 10,
+        user_type: Optional[str] = None,
+        exclude_locked: bool = False,
+        exclude_expired: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Filter and cut the precomputed ranking.
+
+        Args:
+            scores: Output of score()
+            top_n: Number of users to return
+            user_type: Optional user type filter, e.g. 'DIALOG USER'
+            exclude_locked: Drop locked users
+            exclude_expired: Drop expired users
+
+        Returns:
+            The top users in rank order
+        """
+        mask = np.ones(len(scores), dtype=bool)
+        if user_type:
+            mask &= scores["user_type"].str.upper().to_numpy() == user_type.strip().upper()
+        if exclude_locked:
+            mask &= ~scores["locked"].to_numpy()
+        if exclude_expired:
+            mask &= ~scores["expired"].to_numpy()
+        return scores[mask].head(max(1, top_n))
+
+
+def get_risk_scores(sod_path: str, users_path: str) -> pd.DataFrame:
+    """
+    Return the risk ranking for the current versions of both reports,
+    computed once per pair of dataset versions.
+
+    Args:
+        sod_path: Path of the SOD Risk Report
+        users_path: Path of the User Report
+
+    Returns:
+        Ranked score table (see RiskScoringEngine.score)
+    """
+    store = get_dataset_store()
+    versions = (store.version(sod_path), store.version(users_path))
+    return store.derived(
+        "risk_scores",
+        versions,
+        lambda: RiskScoringEngine().score(store.load(sod_path), store.load(users_path)),
+    )
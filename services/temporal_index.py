@@ -0,0 +1,212 @@
+"""
+Sorted date indexes over the User Report for time-window questions
+(dormant users, creation periods, validity end dates, never-expiring accounts).
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from services.dataset_store import get_dataset_store
+from services import report_schema as rs
+
+
+# SAP writes an open-ended validity as 31.12.9999
+OPEN_ENDED_YEAR = 9999
+
+# Columns of the user rows returned by range queries
+USER_COLUMNS = [
+    rs.USER_ID,
+    rs.USER_FIRST_NAME,
+    rs.USER_LAST_NAME,
+    rs.USER_TYPE,
+    rs.USER_LOCKED,
+    rs.USER_CREATED_ON,
+    rs.USER_VALID_FROM,
+    rs.USER_VALID_TO,
+    rs.USER_LAST_LOGON,
+]
+
+
+def parse_days(values: pd.Series) -> np.ndarray:
+    """
+    Parse a mixed-type date column to day precision.
+
+    Args:
+        values: Column of datetimes, Excel-typed dates or date strings
+
+    Returns:
+        datetime64[D] array; NaT for blanks and unparseable values, and
+        9999-12-31 for the open-ended sentinel (which overflows pandas' ns range)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    else:
+        parsed = pd.to_datetime(values, errors="coerce")
+    days = parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    text = values.astype(str).str.strip()
+    sentinel = str(OPEN_ENDED_YEAR)
+    open_ended = text.str.startswith(sentinel) | text.str.endswith(sentinel)
+    days[open_ended.to_numpy()] = np.datetime64(f"{OPEN_ENDED_YEAR}-12-31", "D")
+    return days
+
+
+class SortedDateIndex:
+    """
+    Dates of one column sorted once, with the row position of each date.
+    Range queries are two binary searches; rows without a date are kept
+    apart so every query states how it treats them.
+    """
+
+    def __init__(self, values: pd.Series):
+        """
+        Build the index.
+
+        Args:
+            values: The date column, in row order
+        """
+        days = parse_days(values)
+        dated = ~np.isnat(days)
+        order = np.argsort(days[dated], kind="stable")
+        self.dates = days[dated][order]
+        self.positions = np.flatnonzero(dated)[order]
+        # Rows with no value at all; unparseable values match no query
+        blank = values.isna().to_numpy() | (values.astype(str).str.strip() == "").to_numpy()
+        self.blank = np.flatnonzero(blank)
+        years = self.dates.astype("datetime64[Y]").astype(int) + 1970
+        self.open_ended = self.positions[years >= OPEN_ENDED_YEAR]
+
+    def between(
+        self, start: Optional[np.datetime64] = None, end: Optional[np.datetime64] = None
+    ) -> np.ndarray:
+        """
+        Row positions dated within [start, end], both inclusive and optional.
+
+        Args:
+            start: First day of the range, unbounded if None
+            end: Last day of the range, unbounded if None
+
+        Returns:
+            Row positions in date order
+        """
+        low = 0 if start is None else np.searchsorted(self.dates, start, side="left")
+        high = len(self.dates) if end is None else np.searchsorted(self.dates, end, side="right")
+        return self.positions[low:high]
+
+    def before(self, day: np.datetime64) -> np.ndarray:
+        """Row positions dated strictly before `day`."""
+        return self.positions[: np.searchsorted(self.dates, day, side="left")]
+
+    @property
+    def latest(self) -> Optional[np.datetime64]:
+        """Latest real date, ignoring open-ended sentinels."""
+        real = self.dates[: len(self.dates) - len(self.open_ended)]
+        return real[-1] if len(real) else None
+
+
+def to_day(value: Optional[str]) -> Optional[np.datetime64]:
+    """
+    Parse a date given by the LLM or a user.
+
+    Args:
+        value: ISO date (or any pandas-parseable date), None for unbounded
+
+    Returns:
+        The day, or None
+
+    Raises:
+        ValueError: If the value is not a date
+    """
+    if value is None or str(value).strip() == "":
+        return None
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class UserTimeline:
+    """
+    Temporal indexes over the logon, validity and creation dates of one
+    User Report version. A blank 'User Valid To' means the user never
+    expires; a blank 'User Last Logon' means the user never logged on.
+    """
+
+    def __init__(self, users: pd.DataFrame):
+        """
+        Build the indexes.
+
+        Args:
+            users: User Report frame
+        """
+        columns = [column for column in USER_COLUMNS if column in users.columns]
+        self.users = users[columns].reset_index(drop=True)
+        self.last_logon = SortedDateIndex(users[rs.USER_LAST_LOGON].reset_index(drop=True))
+        self.created_on = SortedDateIndex(users[rs.USER_CREATED_ON].reset_index(drop=True))
+        self.valid_from = SortedDateIndex(users[rs.USER_VALID_FROM].reset_index(drop=True))
+        self.valid_to = SortedDateIndex(users[rs.USER_VALID_TO].reset_index(drop=True))
+        # Recency is measured against the report's own snapshot, not today
+        self.snapshot = self.last_logon.latest
+
+    def rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """User rows at the given positions, in that order."""
+        return self.users.iloc[positions]
+
+    def dormant(
+        self, days: int, as_of: Optional[np.datetime64] = None, include_never_logged_on: bool = True
+    ) -> np.ndarray:
+        """
+        Users whose last logon is more than `days` days before `as_of`.
+
+        Args:
+            days: Inactivity threshold in days
+            as_of: Reference day, the report snapshot if None
+            include_never_logged_on: Also return users without any logon
+
+        Returns:
+            Row positions, longest dormant first, then never logged on
+        """
+        reference = as_of if as_of is not None else self.snapshot
+        if reference is None:
+            positions = np.empty(0, dtype=np.int64)
+        else:
+            positions = self.last_logon.before(reference - np.timedelta64(days, "D"))
+        if include_never_logged_on:
+            positions = np.concatenate([positions, self.last_logon.blank])
+        return positions
+
+    def created_between(
+        self, start: Optional[np.datetime64], end: Optional[np.datetime64]
+    ) -> np.ndarray:
+        """Users created within [start, end], oldest first."""
+        return self.created_on.between(start, end)
+
+    def expiring_between(
+        self, start: Optional[np.datetime64], end: Optional[np.datetime64]
+    ) -> np.ndarray:
+        """Users whose validity ends within [start, end]; never-expiring users are excluded."""
+        if end is None:
+            # The open-ended sentinel is not an expiry
+            end = np.datetime64(f"{OPEN_ENDED_YEAR - 1}-12-31", "D")
+        return self.valid_to.between(start, end)
+
+    def never_expiring(self) -> np.ndarray:
+        """Users with a blank or open-ended 'User Valid To'."""
+        return np.concatenate([self.valid_to.blank, self.valid_to.open_ended])
+
+
+def get_user_timeline(users_path: str) -> UserTimeline:
+    """
+    Return the temporal indexes for the current version of the User Report,
+    built once per dataset version.
+
+    Args:
+        users_path: Path of the User Report
+
+    Returns:
+        UserTimeline over the report
+    """
+    store = get_dataset_store()
+    return store.derived(
+        "user_timeline",
+        (store.version(users_path),),
+        lambda: UserTimeline(store.load(users_path)),
+    )
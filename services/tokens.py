@@ -0,0 +1,46 @@
+"""
+Token estimation helpers shared by the scheduling and budgeting services.
+"""
+
+from functools import lru_cache
+from typing import Iterable
+
+from config.settings import Settings
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """Return the tiktoken encoding for the configured model, if available."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(Settings.OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+    Uses tiktoken when installed, otherwise roughly four characters per token.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def estimate_message_tokens(contents: Iterable[str]) -> int:
+    """Estimate tokens for a list of message contents, including per-message overhead."""
+    return sum(estimate_tokens(content) + 4 for content in contents)
@@ -0,0 +1,264 @@
+"""
+Append-only ledger of LLM token usage and cost, with per-tenant daily budgets.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config.settings import Settings
+
+
+BUDGET_OK = "ok"
+BUDGET_DEGRADED = "degraded"  # close to the budget: the fallback model is used
+BUDGET_EXHAUSTED = "exhausted"  # over the budget: only cached answers are served
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Your usage budget for today has been reached, and no earlier answer to this "
+    "question is available. Please try again tomorrow or contact your administrator."
+)
+
+# Columns summary() can group by
+GROUP_COLUMNS = ("tenant", "agent", "kind", "operation", "model", "day", "question")
+
+# What the current LLM calls are answering: (agent name, service kind, question)
+_attribution: contextvars.ContextVar[Tuple[str, str, str]] = contextvars.ContextVar(
+    "usage_attribution", default=("", "", "")
+)
+
+
+@contextmanager
+def usage_context(agent: str, kind: str, question: str) -> Iterator[None]:
+    """
+    Attribute the LLM calls made in this context to an agent and question.
+
+    Args:
+        agent: Agent name
+        kind: Service answering, e.g. 'pandas', 'chat' or 'orchestrator'
+        question: The user's question (stored truncated)
+    """
+    token = _attribution.set((agent, kind, question[:200]))
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+def _today() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class UsageLedger:
+    """
+    SQLite-backed, append-only record of every LLM call: tenant, agent,
+    model, tokens, latency and cost. Every process and replica sharing the
+    database sees the others' spend: budget checks sum today's cost from a
+    covering index instead of caching it per process.
+    """
+
+    def __init__(self, db_path: str = Settings.USAGE_DB_PATH):
+        """
+        Initialize the ledger and create the schema if needed.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                day TEXT NOT NULL,
+                tenant TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                model TEXT NOT NULL,
+                question TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cached_tokens INTEGER NOT NULL,
+                latency_ms REAL NOT NULL,
+                cost_usd REAL NOT NULL
+            )
+            """
+        )
+        # Covers the spend query, so a budget check reads only index pages
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_usage_tenant_day_cost ON usage (tenant, day, cost_usd)"
+        )
+        self._conn.execute("DROP INDEX IF EXISTS idx_usage_tenant_day")
+        self._conn.commit()
+
+    @staticmethod
+    def cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+        """
+        Price a call in USD.
+
+        Args:
+            model: Model name; unknown models are priced as Settings.OPENAI_MODEL
+            input_tokens: Prompt tokens, including cached ones
+            output_tokens: Completion tokens
+            cached_tokens: Prompt tokens served from the provider's prompt cache
+
+        Returns:
+            Cost in USD
+        """
+        prices = Settings.MODEL_PRICES_PER_MILLION
+        default = prices.get(Settings.OPENAI_MODEL, (0.0, 0.0, 0.0))
+        input_price, output_price, cached_price = prices.get(model, default)
+        uncached = max(0, input_tokens - cached_tokens)
+        dollars = uncached * input_price + cached_tokens * cached_price + output_tokens * output_price
+        return dollars / 1_000_000
+
+    def record(self, tenant: str, operation: str, model: str, usage: Dict, latency: float) -> None:
+        """
+        Append one LLM call to the ledger.
+
+        Args:
+            tenant: Tenant the call is attributed to
+            operation: 'generate', 'stream' or 'stream_hedge'
+            model: Model that served the call
+            usage: LangChain usage metadata of the response
+            latency: Seconds from admission to the last token
+        """
+        agent, kind, question = _attribution.get()
+        input_tokens = int(usage.get("input_tokens") or 0)
+        output_tokens = int(usage.get("output_tokens") or 0)
+        cached_tokens = int((usage.get("input_token_details") or {}).get("cache_read") or 0)
+        cost = self.cost(model, input_tokens, output_tokens, cached_tokens)
+        day = _today()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO usage (ts, day, tenant, agent, kind, operation, model, question, "
+                "input_tokens, output_tokens, cached_tokens, latency_ms, cost_usd) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(), day, tenant, agent, kind, operation, model, question,
+                    input_tokens, output_tokens, cached_tokens, latency * 1000.0, cost,
+                ),
+            )
+            self._conn.commit()
+
+    def spend_today(self, tenant: str) -> float:
+        """USD spent by a tenant today (UTC), by every process sharing the ledger."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(cost_usd), 0) FROM usage WHERE tenant = ? AND day = ?",
+                (tenant, _today()),
+            ).fetchone()
+        return float(row[0])
+
+    @staticmethod
+    def budget(tenant: str) -> float:
+        """Daily budget of a tenant in USD."""
+        if tenant == Settings.PREFETCH_TENANT:
+            return Settings.PREFETCH_DAILY_BUDGET_USD
+        return Settings.TENANT_BUDGETS_USD.get(tenant, Settings.TENANT_DAILY_BUDGET_USD)
+
+    def budget_state(self, tenant: str) -> str:
+        """BUDGET_OK, BUDGET_DEGRADED or BUDGET_EXHAUSTED for a tenant today."""
+        budget = self.budget(tenant)
+        if budget <= 0:
+            return BUDGET_OK
+        spent = self.spend_today(tenant)
+        if spent >= budget:
+            return BUDGET_EXHAUSTED
+        if spent >= budget * Settings.BUDGET_DEGRADE_RATIO:
+            return BUDGET_DEGRADED
+        return BUDGET_OK
+
+    def model_for(self, tenant: str) -> str:
+        """Model to use for a tenant, falling back to the cheaper one near its budget."""
+        if self.budget_state(tenant) == BUDGET_OK:
+            return Settings.OPENAI_MODEL
+        return Settings.OPENAI_FALLBACK_MODEL
+
+    def tenant_usage(self, tenant: str) -> Dict:
+        """
+        Today's usage of a tenant.
+
+        Returns:
+            Dict with calls, tokens, cost, budget and state
+        """
+        with self._lock:
+            calls, tokens = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(input_tokens + output_tokens), 0) "
+                "FROM usage WHERE tenant = ? AND day = ?",
+                (tenant, _today()),
+            ).fetchone()
+        return {
+            "calls": calls,
+            "tokens": tokens,
+            "cost": self.spend_today(tenant),
+            "budget": self.budget(tenant),
+            "state": self.budget_state(tenant),
+        }
+
+    def summary(
+        self,
+        group_by: Sequence[str] = ("tenant", "agent"),
+        since: Optional[float] = None,
+        limit: int = 50,
+        tenant: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Aggregate usage, most expensive groups first.
+
+        Args:
+            group_by: Columns to group by, from GROUP_COLUMNS
+            since: Only calls after this Unix timestamp
+            limit: Maximum number of groups
+            tenant: Only this tenant's calls; None aggregates all tenants
+
+        Returns:
+            One dict per group with calls, tokens, cost and average latency
+        """
+        invalid = set(group_by) - set(GROUP_COLUMNS)
+        if invalid or not group_by:
+            raise ValueError(f"group_by must be a non-empty subset of {GROUP_COLUMNS}")
+        columns = ", ".join(group_by)
+        query = (
+            f"SELECT {columns}, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cached_tokens), "
+            "SUM(cost_usd), AVG(latency_ms) FROM usage"
+        )
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if tenant is not None:
+            conditions.append("tenant = ?")
+            params.append(tenant)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" GROUP BY {columns} ORDER BY SUM(cost_usd) DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        names = list(group_by) + [
+            "calls", "input_tokens", "output_tokens", "cached_tokens", "cost_usd", "avg_latency_ms",
+        ]
+        return [dict(zip(names, row)) for row in rows]
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide usage ledger."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger()
+        return _ledger
@@ -0,0 +1,28 @@
+"""
+Shared fixtures. Tests import the application modules from the repository root.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings  # noqa: E402
+from services import async_runtime  # noqa: E402
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    """A fresh shared LLM loop with a two-thread default executor."""
+    monkeypatch.setattr(Settings, "LLM_LOOP_EXECUTOR_WORKERS", 2)
+    monkeypatch.setattr(async_runtime, "_loop", None)
+    monkeypatch.setattr(async_runtime, "_thread", None)
+    monkeypatch.setattr(async_runtime, "_stream_executor", None)
+    yield async_runtime
+    if async_runtime._stream_executor is not None:
+        async_runtime._stream_executor.shutdown(wait=False, cancel_futures=True)
+    loop = async_runtime._loop
+    if loop is not None:
+        loop.call_soon_threadsafe(loop.stop)
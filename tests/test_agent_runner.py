@@ -0,0 +1,59 @@
+"""
+Tests for serving prefetched answers to pandas agents inside a conversation.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from services import agent_runner, analysis_workspace, result_store, usage_ledger
+from services.agent_runner import AgentRunner
+from services.analysis_workspace import LAST_RESULT
+from services.answer_cache import CachedAnswer
+from services.result_store import TableResult
+
+
+QUESTION = "Which users executed critical risks?"
+HISTORY = [{"role": "user", "content": QUESTION}]
+
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """Serve a given cached answer to a pandas agent, on fresh stores."""
+    monkeypatch.setattr(usage_ledger, "_ledger", usage_ledger.UsageLedger(str(tmp_path / "usage.db")))
+    monkeypatch.setattr(result_store, "_store", result_store.ResultStore(directory=str(tmp_path / "results")))
+    monkeypatch.setattr(analysis_workspace, "_store", analysis_workspace.WorkspaceStore())
+    agent = SimpleNamespace(name="sod", uses_pandas_agent=True, uses_orchestrator=False)
+
+    def answer(cached, conversation_id="acme:c1:sod"):
+        monkeypatch.setattr(agent_runner, "get_answer_cache", lambda: SimpleNamespace(get=lambda *_: cached))
+        return AgentRunner._early_answer(agent, HISTORY, conversation_id)
+
+    return answer
+
+
+def table(frame: pd.DataFrame) -> TableResult:
+    handle = result_store.get_result_store().put(frame, persist=True, owner="prefetch")
+    return TableResult(handle, "Executed critical risks", len(frame), len(frame.columns))
+
+
+def test_cached_tables_are_saved_to_the_workspace(serve):
+    frame = pd.DataFrame({"User ID": ["U1", "U2"], "Risk ID": ["R1", "R2"]})
+    shown = table(frame)
+    assert serve(CachedAnswer("Two users.", [shown])) == ["Two users.", shown]
+
+    workspace = analysis_workspace.get_workspace_store().get("acme:c1:sod")
+    assert workspace[LAST_RESULT].equals(frame)
+    assert QUESTION in workspace.describe()
+
+
+def test_answers_without_restorable_tables_run_live(serve):
+    assert serve(CachedAnswer("No table.", [])) is None
+    gone = TableResult("res_missing", "", 1, 1)
+    assert serve(CachedAnswer("Pruned table.", [gone])) is None
+    assert LAST_RESULT not in analysis_workspace.get_workspace_store().get("acme:c1:sod")
+
+
+def test_one_off_questions_are_served_without_a_workspace(serve):
+    assert serve(CachedAnswer("No table.", []), conversation_id=None) == ["No table."]
@@ -0,0 +1,66 @@
+"""
+Tests for the per-conversation analysis workspace and its store.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from langchain_experimental.tools.python.tool import PythonAstREPLTool
+
+from services.analysis_workspace import LAST_RESULT, AnalysisWorkspace, WorkspaceStore
+from services.output_governor import govern_python_tool
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"User ID": [f"U{i}" for i in range(rows)], "Risks": range(rows)})
+
+
+def test_saved_frames_are_described_for_follow_ups():
+    workspace = AnalysisWorkspace()
+    assert workspace.describe() == ""
+    assert workspace.save("executed", frame(3), "executed high risks") == "Saved 'executed' (3 rows) to the workspace."
+    assert workspace.describe().splitlines()[1] == "- executed: 3 rows [User ID, Risks] - executed high risks"
+    with pytest.raises(KeyError, match="Available: executed"):
+        workspace["missing"]
+
+
+def test_least_recently_used_frames_are_evicted():
+    workspace = AnalysisWorkspace(max_frames=2)
+    workspace.save("a", frame(1))
+    workspace.save("b", frame(1))
+    workspace["a"]
+    workspace.save("c", frame(1))
+    assert workspace.names() == ["a", "c"]
+
+    size = workspace.nbytes // 2
+    workspace = AnalysisWorkspace(max_bytes=int(size * 2.5))
+    for name in "abc":
+        workspace.save(name, frame(1))
+    assert workspace.names() == ["b", "c"]
+    assert workspace.save("big", frame(1000)).startswith("Not saved")
+
+
+def test_the_store_keeps_one_workspace_per_conversation():
+    store = WorkspaceStore(idle_seconds=3600)
+    store.get("acme:c1:sod").save("a", frame(10))
+    assert "a" in store.get("acme:c1:sod")
+    assert "a" not in store.get("acme:c2:sod")
+    assert store.stats()["workspaces"] == 2
+
+    # Beyond the total size the least recently used workspace goes first
+    store.total_max_bytes = store.stats()["bytes"] - 1
+    store.get("acme:c2:sod")
+    assert store.stats()["workspaces"] == 1
+    assert "a" not in store.get("acme:c1:sod")
+
+
+def test_frames_returned_by_the_agent_are_kept_as_the_last_result():
+    workspace = AnalysisWorkspace()
+    tool = govern_python_tool(SimpleNamespace(tools=[PythonAstREPLTool(locals={"df": frame(5)})]), workspace)
+    tool.last_note = "last result, for: who has risks?"
+    tool.run("df[df['Risks'] > 2]")
+    assert workspace[LAST_RESULT]["User ID"].tolist() == ["U3", "U4"]
+
+    # Follow-up code reads it back through `ws`
+    assert "2" in tool.run("len(ws['last'])")
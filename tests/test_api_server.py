@@ -0,0 +1,91 @@
+"""
+Tests for batch retention, batch ownership and result downloads in the API server.
+"""
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from config.settings import Settings
+from services import result_store
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """API client whose answers wait until `release` is set."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(Settings, "API_MAX_BATCHES", 2)
+    monkeypatch.setattr(api_server, "BATCHES", api_server.OrderedDict())
+    release = {}
+
+    async def answer_chunks(agent, history, tenant, conversation_id=None):
+        while not release.get(history[-1]["content"]):
+            await asyncio.sleep(0.01)
+        yield f"Answer to {history[-1]['content']}"
+
+    monkeypatch.setattr(api_server, "answer_chunks", answer_chunks)
+    with TestClient(api_server.app) as test_client:
+        test_client.release = release
+        yield test_client
+
+
+def submit(client, question: str):
+    agent = next(iter(api_server.AGENT_REGISTRY.specs()))
+    return client.post("/batches", json={"items": [{"agent": agent, "question": question}]})
+
+
+def wait_done(client, batch_id: str) -> dict:
+    for _ in range(200):
+        batch = client.get(f"/batches/{batch_id}").json()
+        if batch["status"] == "done":
+            return batch
+        time.sleep(0.01)
+    raise AssertionError(f"Batch {batch_id} did not finish")
+
+
+def test_running_batches_are_never_evicted(client):
+    first = submit(client, "q1").json()["id"]
+    second = submit(client, "q2").json()["id"]
+    assert submit(client, "q3").status_code == 429
+
+    client.release["q1"] = True
+    assert wait_done(client, first)["results"][0]["answer"] == "Answer to q1"
+    third = submit(client, "q3")
+    assert third.status_code == 202
+
+    # The finished batch made room; the running one is still there
+    assert client.get(f"/batches/{first}").status_code == 404
+    client.release.update(q2=True, q3=True)
+    assert wait_done(client, second)["results"][0]["answer"] == "Answer to q2"
+    assert wait_done(client, third.json()["id"])["status"] == "done"
+
+
+def test_startup_requires_an_api_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(Settings, "get_openai_api_key", staticmethod(lambda: None))
+    with pytest.raises(RuntimeError, match="OpenAI API Key not found"):
+        with TestClient(api_server.app):
+            pass
+
+
+def test_result_downloads_stream_as_csv(client, tmp_path, monkeypatch):
+    store = result_store.ResultStore(directory=str(tmp_path))
+    monkeypatch.setattr(result_store, "_store", store)
+    handle = store.put(pd.DataFrame({"user": ["U1", "U2"]}), owner=Settings.DEFAULT_TENANT)
+
+    response = client.get(f"/results/{handle}.csv")
+    assert response.status_code == 200
+    assert response.text.splitlines() == ["user", "U1", "U2"]
+    assert client.get(f"/results/{handle}.csv", headers={Settings.TENANT_HEADER: "globex"}).status_code == 404
+
+
+def test_batches_are_only_visible_to_their_tenant(client):
+    batch_id = submit(client, "q1").json()["id"]
+    assert client.get(f"/batches/{batch_id}", headers={Settings.TENANT_HEADER: "globex"}).status_code == 404
+
+    client.release["q1"] = True
+    assert wait_done(client, batch_id)["tenant"] == Settings.DEFAULT_TENANT
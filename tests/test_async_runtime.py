@@ -0,0 +1,71 @@
+"""
+Tests for the shared LLM event loop and its bridges to blocking code.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+
+def test_iterate_yields_items_in_order(runtime):
+    async def numbers():
+        for number in range(500):
+            await asyncio.sleep(0)
+            yield number
+
+    assert list(runtime.iterate(numbers(), buffer=4)) == list(range(500))
+
+
+def test_iterate_reraises_errors(runtime):
+    async def failing():
+        yield "first"
+        raise ValueError("boom")
+
+    chunks = runtime.iterate(failing())
+    assert next(chunks) == "first"
+    with pytest.raises(ValueError, match="boom"):
+        next(chunks)
+
+
+def test_closing_iterate_cancels_the_producer(runtime):
+    cancelled = []
+
+    async def endless():
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield 1
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    chunks = runtime.iterate(endless())
+    next(chunks)
+    chunks.close()
+    deadline = time.monotonic() + 5
+    while not cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cancelled
+
+
+def test_blocking_answers_do_not_starve_the_loop_executor(runtime):
+    """
+    Regression: cross-report answers are blocking generators whose work
+    (ledger writes, tools) runs on the loop's default executor. More of them
+    than that executor has threads must still finish.
+    """
+
+    def answer():
+        for index in range(3):
+            # Like a sub-query's LLM call recording usage on the default executor
+            runtime.run(runtime.call_blocking(time.sleep, 0.01))
+            yield index
+
+    async def consume():
+        return [chunk async for chunk in runtime.to_thread_iterator(answer)]
+
+    async def concurrent_answers():
+        return await asyncio.gather(*(consume() for _ in range(6)))
+
+    assert runtime.submit(concurrent_answers()).result(timeout=10) == [[0, 1, 2]] * 6
@@ -0,0 +1,46 @@
+"""
+Tests for the SQLite-backed conversation store.
+"""
+
+import pytest
+
+from services.conversation_store import ConversationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ConversationStore(db_path=str(tmp_path / "conversations.db"), window_size=4)
+
+
+def ask(store, conversation, question, answer, version="v1"):
+    store.append(conversation, "user", question)
+    store.append(conversation, "assistant", answer, reports_version=version)
+
+
+def test_append_to_a_cold_window_lists_the_message_once(store):
+    ask(store, "c1", "How many users?", "791")
+    store._windows.clear()
+    store.append("c1", "user", "And locked?")
+    assert [m["content"] for m in store.messages("c1")] == ["How many users?", "791", "And locked?"]
+
+
+def test_find_answer_stays_within_the_conversation(store):
+    ask(store, "tenant-a:agent", "How many users?", "791")
+    assert store.find_answer("tenant-b:agent", "How many users?", None, "v1") is None
+    assert store.find_answer("tenant-a:agent", " how many USERS? ", None, "v1") == "791"
+
+
+def test_find_answer_requires_the_current_report_versions(store):
+    ask(store, "c1", "How many users?", "791", version="v1")
+    assert store.find_answer("c1", "How many users?", None, "v2") is None
+
+
+def test_find_answer_requires_the_same_previous_question(store):
+    ask(store, "c1", "Show executed risks", "12 risks")
+    ask(store, "c1", "Break those down by module", "P2P: 8, MM: 4")
+    ask(store, "c1", "Show high risks", "30 risks")
+    assert store.find_answer("c1", "Break those down by module", "Show high risks", "v1") is None
+    assert (
+        store.find_answer("c1", "Break those down by module", "Show executed risks", "v1")
+        == "P2P: 8, MM: 4"
+    )
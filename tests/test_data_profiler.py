@@ -0,0 +1,59 @@
+"""
+Tests for the token-budgeted data profile.
+"""
+
+import pandas as pd
+import pytest
+
+from services.data_profiler import DataProfiler
+from services.tokens import estimate_tokens
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(DataProfiler, "_cache", type(DataProfiler._cache)())
+
+
+def report(rows: int = 200) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "User ID": [f"USER{i:05d}" for i in range(rows)],
+            "User Type": ["DIALOG" if i % 3 else "SYSTEM" for i in range(rows)],
+            "Role Count": [i % 40 for i in range(rows)],
+            "Last Logon": pd.date_range("2024-01-01", periods=rows, freq="D"),
+        }
+    )
+
+
+def test_a_generous_budget_gets_the_full_profile():
+    text = DataProfiler.describe(report(), "v1", "User Report", token_budget=5000)
+    assert "200 rows x 4 columns." in text
+    assert "'DIALOG' (133), 'SYSTEM' (67)" in text
+    assert "2024-01-01 to 2024-07-18" in text
+    assert "=== SAMPLE ROWS (first 5) ===" in text
+
+
+@pytest.mark.parametrize("budget", [40, 120, 200])
+def test_profiles_fit_the_token_budget(budget):
+    text = DataProfiler.describe(report(), "v1", "User Report", token_budget=budget)
+    assert estimate_tokens(text) <= budget
+    assert text.startswith("Dataset: User Report")
+
+
+def test_profiles_beyond_the_leanest_level_are_truncated():
+    text = DataProfiler.describe(report(), "v1", "User Report", token_budget=40)
+    assert text.endswith("... (profile truncated to fit the token budget)")
+
+
+def test_tight_budgets_drop_samples_before_columns():
+    full = DataProfiler.describe(report(), "v1", "User Report", token_budget=5000)
+    lean = DataProfiler.describe(report(), "v1", "User Report", token_budget=estimate_tokens(full) - 1)
+    assert "=== SAMPLE ROWS (first 3) ===" in lean
+    assert all(f"| {column} |" in lean for column in report().columns)
+
+
+def test_profiles_are_cached_per_dataset_version():
+    first = DataProfiler.describe(report(), "v1", "User Report")
+    # Same version: the cached text is returned without looking at the frame
+    assert DataProfiler.describe(report(10), "v1", "User Report") == first
+    assert DataProfiler.describe(report(10), "v2", "User Report") != first
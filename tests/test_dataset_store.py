@@ -0,0 +1,45 @@
+"""
+Tests for the memory-mapped dataset store.
+"""
+
+import pandas as pd
+import pytest
+
+from services.dataset_store import DatasetStore
+
+
+@pytest.fixture
+def shared(tmp_path):
+    """A report frame attached from its Arrow mapping, as every session sees it."""
+    path = tmp_path / "users.csv"
+    pd.DataFrame({"SAP User ID": ["U1", "U2"], "Role Count": [3, 1]}).to_csv(path, index=False)
+    return DatasetStore(str(tmp_path / "cache")).load(str(path))
+
+
+def test_private_copies_do_not_change_the_shared_frame(shared):
+    copy = DatasetStore.private_copy(shared)
+    copy.loc[0, "SAP User ID"] = "CHANGED"
+    copy["Flag"] = True
+    assert copy["SAP User ID"].tolist() == ["CHANGED", "U2"]
+    assert shared["SAP User ID"].tolist() == ["U1", "U2"]
+    assert "Flag" not in shared.columns
+
+
+def test_private_copies_accept_in_place_writes(shared):
+    copy = DatasetStore.private_copy(shared)
+    copy.loc[copy["Role Count"] > 2, "Role Count"] = 0
+    copy["Role Count"] = copy["Role Count"].astype(float)
+    copy.loc[1, "Role Count"] = None
+    copy.fillna({"Role Count": -1}, inplace=True)
+    copy.sort_values("SAP User ID", ascending=False, inplace=True)
+    assert copy["Role Count"].tolist() == [-1.0, 0.0]
+    assert shared["Role Count"].tolist() == [3, 1]
+    assert shared["SAP User ID"].tolist() == ["U1", "U2"]
+
+
+def test_private_copies_write_numeric_columns_in_place(shared):
+    copy = DatasetStore.private_copy(shared)
+    copy.loc[0, "Role Count"] = 99
+    copy["Role Count"].to_numpy()[1] = 7
+    assert copy["Role Count"].tolist() == [99, 7]
+    assert shared["Role Count"].tolist() == [3, 1]
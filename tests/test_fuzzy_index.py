@@ -0,0 +1,49 @@
+"""
+Tests for the trigram entity lookup.
+"""
+
+import pandas as pd
+
+from services import report_schema as rs
+from services.fuzzy_index import EntityLookup, TrigramIndex
+
+
+def test_search_returns_the_matching_keys():
+    index = TrigramIndex(
+        ["U1", "U2", "U3", "U4"],
+        ["Anna Becker", "Sean Smith", "John Smithers", "Maria Lopez"],
+    )
+    matches = index.search("smith", limit=5)
+    assert [key for key, _ in matches] == ["U2", "U3"]
+    assert matches[0][1] >= matches[1][1]
+
+
+def test_search_skips_documents_without_shared_trigrams():
+    index = TrigramIndex(["A", "B", "C"], ["alpha", "bravo", "charlie"])
+    assert [key for key, _ in index.search("charly")] == ["C"]
+    assert index.search("zzz") == []
+
+
+def test_entity_lookup_finds_users_and_risks():
+    users = pd.DataFrame(
+        {
+            rs.USER_ID: ["1702SEA01", "JDOE", "MSMITH"],
+            rs.USER_FIRST_NAME: ["Sean", "John", "Mary"],
+            rs.USER_LAST_NAME: ["Adams", "Doe", "Smith"],
+            rs.USER_TYPE: [rs.USER_TYPE_DIALOG] * 3,
+        }
+    )
+    sod = pd.DataFrame(
+        {
+            rs.SOD_RISK_ID: ["AUD009", "GRC06B", "GRC14C"],
+            rs.SOD_RISK_NAME: [
+                "Maintain User Master Record",
+                "Enter/Modify Purchase Order & Goods Receipt",
+                "Maintain Material Master Data",
+            ],
+        }
+    )
+    lookup = EntityLookup(sod, users)
+    assert lookup.find_users("smith mary").index[0] == "MSMITH"
+    assert lookup.find_users("sean").index[0] == "1702SEA01"
+    assert lookup.find_risks("purchase order goods receipt").index[0] == "GRC06B"
@@ -0,0 +1,72 @@
+"""
+Tests for upload ingestion: registration, name indexing, and cleanup of uploads and
+replaced datasets.
+"""
+
+import os
+
+import pytest
+
+from config.settings import Settings
+from services import dataset_registry, dataset_store, ingestion
+from services import report_schema as rs
+from services.dataset_registry import REPORT_SOD_RISKS, REPORT_USERS, report_path, report_source
+from services.ingestion import DONE, FAILED, IngestionJob, IngestionService
+
+
+USERS_CSV = (
+    f"{rs.USER_ID},{rs.USER_TYPE},{rs.USER_LOCKED},{rs.USER_EXPIRED},{rs.USER_ROLE_COUNT},{rs.USER_LAST_LOGON}\n"
+    "U1,DIALOG USER,No,No,3,2024-01-02\n"
+    "U2,SYSTEM USER,Yes,No,1,2023-06-30\n"
+).encode()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Upload, dataset and cache directories of a fresh registry and store."""
+    monkeypatch.setattr(Settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(Settings, "INGESTED_DATASET_DIR", str(tmp_path / "datasets"))
+    monkeypatch.setattr(
+        dataset_registry, "_registry", dataset_registry.DatasetRegistry(str(tmp_path / "datasets.json"))
+    )
+    monkeypatch.setattr(dataset_store, "_store", dataset_store.DatasetStore(str(tmp_path / "cache")))
+    return tmp_path
+
+
+def ingest(job_id: str, filename: str, data: bytes) -> IngestionJob:
+    job = IngestionJob(job_id, filename)
+    IngestionService()._run(job, data)
+    return job
+
+
+def test_a_new_upload_replaces_the_previous_dataset(workspace):
+    first = ingest("job1", "users_march.csv", USERS_CSV)
+    assert first.state == DONE
+    first_path = report_path(REPORT_USERS)
+    assert os.path.exists(first_path)
+    assert report_source(REPORT_USERS) == "users_march.csv"
+
+    second = ingest("job2", "users_april.csv", USERS_CSV)
+    assert second.state == DONE
+    assert report_path(REPORT_USERS) != first_path
+    assert not os.path.exists(first_path)
+    assert os.listdir(workspace / "datasets") == [os.path.basename(report_path(REPORT_USERS))]
+    assert report_source(REPORT_USERS) == "users_april.csv"
+    assert os.listdir(workspace / "uploads") == []
+    cached = [name for name in os.listdir(workspace / "cache") if name.startswith("users_") and name.endswith(".arrow")]
+    assert cached and all(name.startswith("users_job2-") for name in cached)
+
+
+def test_name_lookup_is_rebuilt_for_the_new_dataset(workspace, monkeypatch):
+    built = []
+    monkeypatch.setattr(ingestion, "get_entity_lookup", lambda *paths: built.append(paths))
+    assert ingest("job1", "users_march.csv", USERS_CSV).state == DONE
+    assert built == [(report_path(REPORT_SOD_RISKS), report_path(REPORT_USERS))]
+
+
+def test_failed_uploads_are_removed(workspace):
+    job = ingest("job1", "notes.csv", b"Name,Comment\nA,B\n")
+    assert job.state == FAILED
+    assert "Unrecognised report columns" in job.message
+    assert os.listdir(workspace / "uploads") == []
+    assert report_source(REPORT_USERS) == os.path.basename(Settings.USER_REPORT_PATH)
@@ -0,0 +1,85 @@
+"""
+Tests that packages and agents are imported only when they are used.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+
+from agents.registry import AgentRegistry
+
+
+def imported_modules(code: str) -> set:
+    """Names of the repo's modules loaded after running `code` in a fresh interpreter."""
+    script = f"{code}\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return {name for name in output.split() if name.startswith(("agents.", "services."))}
+
+
+def test_importing_one_service_loads_no_other():
+    assert imported_modules("from services.dataset_store import DatasetStore") <= {
+        "services.dataset_store",
+        "services.dataset_registry",
+        "services.report_schema",
+    }
+
+
+def test_package_names_are_imported_on_first_use():
+    loaded = imported_modules("import services; services.get_usage_ledger")
+    assert "services.usage_ledger" in loaded
+    assert "services.pandas_agent_service" not in loaded
+
+
+def test_listing_agents_imports_no_agent_module():
+    loaded = imported_modules("from agents.registry import get_agent_registry; get_agent_registry().specs()")
+    assert loaded == {"agents.agent_spec", "agents.base_agent", "agents.registry"}
+
+
+AGENT_MODULE = """
+import time
+from agents.base_agent import BaseAgent
+
+BUILDS = []
+
+
+class Agent(BaseAgent):
+    def __init__(self, spec, **options):
+        time.sleep(0.05)
+        BUILDS.append(options)
+        super().__init__(spec)
+
+    def warm_up(self):
+        BUILDS.append("warm")
+
+    @property
+    def data_context(self):
+        return ""
+"""
+
+
+def test_an_unused_agent_is_never_imported(tmp_path, monkeypatch):
+    catalog = []
+    for module in ("lazy_agent_used", "lazy_agent_unused"):
+        (tmp_path / f"{module}.py").write_text(AGENT_MODULE)
+        catalog.append({"name": module, "factory": f"{module}:Agent", "options": {"module": module}})
+    (tmp_path / "agents.json").write_text(json.dumps(catalog))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = AgentRegistry(str(tmp_path / "agents.json"), entry_point_group="auditbot.test_no_plugins")
+
+    assert list(registry.specs()) == ["lazy_agent_used", "lazy_agent_unused"]
+    assert "lazy_agent_used" not in sys.modules
+
+    # Concurrent first uses build and warm up the agent once
+    agents = []
+    threads = [threading.Thread(target=lambda: agents.append(registry.get("lazy_agent_used"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(agent) for agent in agents}) == 1
+    assert sys.modules["lazy_agent_used"].BUILDS == [{"module": "lazy_agent_used"}, "warm"]
+    assert "lazy_agent_unused" not in sys.modules
+    del sys.modules["lazy_agent_used"]
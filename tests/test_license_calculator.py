@@ -0,0 +1,80 @@
+"""
+Tests for the deterministic license cost engine.
+"""
+
+import pandas as pd
+import pytest
+
+from services import license_calculator as lc
+from services.license_calculator import LicenseCostCalculator, prepare_license_frame
+
+
+def raw_report() -> pd.DataFrame:
+    """Two license types plus the report's own total rows, as read from the workbook."""
+    rows = [
+        # type, name, purchased, unit cost, recommended, unused, note
+        ("GB", "Professional", 10, 100, 6, 4, None),
+        ("GC", "Functional", 20, 50, 25, 0, None),
+        ("Total", "", 30, 0, 31, 4, None),
+        ("ALL", "", 30, 0, 31, 4, lc.SUMMARY_NOTE),
+    ]
+    frame = pd.DataFrame(
+        [
+            {
+                lc.LICENSE_TYPE: code,
+                lc.LICENSE_NAME: name,
+                lc.PURCHASED_COUNT: purchased,
+                lc.UNIT_COST: unit,
+                lc.PURCHASED_COST: purchased * unit,
+                lc.RECOMMENDED_COUNT: recommended,
+                lc.RECOMMENDED_COST: recommended * unit,
+                lc.UNUSED_COUNT: unused,
+                lc.UNUSED_COST: unused * unit,
+                lc.AI_NOTE: note,
+            }
+            for code, name, purchased, unit, recommended, unused, note in rows
+        ]
+    )
+    # Columns left blank in the workbook
+    return frame.reindex(columns=[lc.LICENSE_TYPE, lc.LICENSE_NAME, *lc.NUMERIC_COLUMNS, lc.AI_NOTE])
+
+
+@pytest.fixture
+def calculator() -> LicenseCostCalculator:
+    return LicenseCostCalculator(prepare_license_frame(raw_report()))
+
+
+def test_report_total_rows_are_dropped(calculator):
+    assert calculator.license_types == ["GB", "GC"]
+    assert calculator.licenses[lc.MULTI_LOGON_COUNT].tolist() == [0, 0]
+
+
+def test_totals_are_summed_from_the_records(calculator):
+    totals = calculator.totals()
+    assert totals[lc.PURCHASED_COST] == 2000
+    assert totals[lc.UNUSED_COST] == 400
+    assert totals["License Types"] == 2
+    assert lc.UNIT_COST not in totals
+    assert calculator.totals(["gb"])[lc.PURCHASED_COST] == 1000
+
+
+def test_unknown_license_types_are_rejected(calculator):
+    with pytest.raises(ValueError, match="Unknown license type"):
+        calculator.totals(["ZZ"])
+
+
+def test_what_if_recomputes_costs_and_totals(calculator):
+    scenario = calculator.what_if(purchased_counts={"GC": 30}, right_size_types=["GB"])
+
+    assert scenario.loc["GB", "Scenario Purchased"] == 6
+    assert scenario.loc["GB", "Savings"] == 400
+    assert scenario.loc["GC", "Scenario Purchased Cost"] == 1500
+    assert scenario.loc["GC", "Scenario Unused Count"] == 5
+    assert scenario.loc["GC", "Savings"] == -500
+    assert scenario.loc["Total"].to_dict() == scenario.drop(index="Total").sum().to_dict()
+    assert scenario.loc["Total", "Savings"] == -100
+
+
+def test_what_if_rejects_negative_counts(calculator):
+    with pytest.raises(ValueError, match="cannot be negative"):
+        calculator.what_if(purchased_counts={"GB": -1})
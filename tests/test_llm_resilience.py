@@ -0,0 +1,110 @@
+"""
+Tests for the scheduled chat model's deadline, retries and hedging, against
+the load-test fake of the OpenAI API served on a local port.
+"""
+
+import socket
+import threading
+import time
+
+import openai
+import pytest
+import uvicorn
+
+from config.settings import Settings
+from loadtest.fake_llm import FakeLLMConfig, create_app
+from services import llm_scheduler, resilience, usage_ledger
+from services.llm import create_llm
+from services.llm_scheduler import scheduling_context
+from services.resilience import LLMDeadlineExceeded, ResiliencePolicy
+
+
+QUESTION = "Which users hold the most critical risks?"
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Fake OpenAI endpoint; tests script its failures and delays through the config."""
+    config = FakeLLMConfig(first_token=0.0, token_delay=0.0, tool_calls=False)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    monkeypatch.setattr(Settings, "OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    yield config
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def model(runtime, fake_llm, tmp_path, monkeypatch):
+    """A scheduled model on a fresh loop, scheduler and usage ledger."""
+    monkeypatch.setattr(runtime, "_client", None)
+    monkeypatch.setattr(llm_scheduler, "_scheduler", llm_scheduler.LLMScheduler(max_concurrency=4))
+    monkeypatch.setattr(usage_ledger, "_ledger", usage_ledger.UsageLedger(str(tmp_path / "usage.db")))
+
+    def build(**policy):
+        options = dict(deadline_seconds=5.0, max_retries=2, backoff_base_seconds=0.01, hedge_after_seconds=None)
+        options.update(policy)
+        monkeypatch.setattr(resilience, "_policy", ResiliencePolicy(**options))
+        return create_llm(model=Settings.OPENAI_MODEL)
+
+    return build
+
+
+def answer(llm) -> str:
+    with scheduling_context("acme"):
+        return "".join(chunk.content for chunk in llm.stream(QUESTION))
+
+
+def operations():
+    return {
+        row["operation"]: row
+        for row in usage_ledger.get_usage_ledger().summary(group_by=("operation",), tenant="acme")
+    }
+
+
+def test_transient_errors_are_retried(model, fake_llm):
+    fake_llm.failures = [503]
+    assert answer(model()).startswith("This is a simulated answer")
+    assert fake_llm.requests == 2
+
+
+def test_client_errors_are_not_retried(model, fake_llm):
+    fake_llm.failures = [400]
+    with pytest.raises(openai.BadRequestError):
+        answer(model())
+    assert fake_llm.requests == 1
+
+
+def test_a_late_first_token_exceeds_the_deadline(model, fake_llm):
+    fake_llm.first_tokens = [3.0]
+    started = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        answer(model(deadline_seconds=0.5))
+    assert time.monotonic() - started < 2.0
+
+
+def test_a_hedge_wins_and_both_requests_are_accounted(model, fake_llm):
+    fake_llm.first_tokens = [3.0, 0.0]
+    started = time.monotonic()
+    assert answer(model(hedge_after_seconds=0.2)).startswith("This is a simulated answer")
+    assert time.monotonic() - started < 2.0
+    assert fake_llm.requests == 2
+
+    # The cancelled primary records its estimated prompt once its task has unwound
+    deadline = time.monotonic() + 2.0
+    while "stream" not in operations() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    recorded = operations()
+    assert recorded["stream_hedge"]["output_tokens"] > 0
+    assert recorded["stream"]["input_tokens"] > 0
+    assert recorded["stream"]["output_tokens"] == 0
+    assert llm_scheduler.get_scheduler().stats()["in_flight"] == 0
@@ -0,0 +1,82 @@
+"""
+Tests for LLM admission control: per-tenant fairness and queue limits.
+"""
+
+import asyncio
+
+import pytest
+
+from services.llm_scheduler import LLMScheduler, SchedulerOverloaded
+
+
+def scheduler(**limits) -> LLMScheduler:
+    options = dict(max_concurrency=1, tokens_per_minute=1_000_000, max_queue_per_tenant=10, max_queue_total=10)
+    options.update(limits)
+    return LLMScheduler(**options)
+
+
+def test_waiting_tenants_are_admitted_round_robin():
+    llm = scheduler()
+    admitted = []
+
+    async def call(tenant: str, name: str) -> None:
+        ticket = await llm.acquire_async(tenant, 10)
+        admitted.append(name)
+        await asyncio.sleep(0)
+        llm.release(ticket)
+
+    async def main() -> None:
+        busy = llm.acquire("acme", 10)
+        calls = []
+        # acme queues three calls before globex queues one
+        for name in ("acme1", "acme2", "acme3"):
+            calls.append(asyncio.create_task(call("acme", name)))
+            await asyncio.sleep(0)
+        calls.append(asyncio.create_task(call("globex", "globex1")))
+        await asyncio.sleep(0)
+        assert llm.stats()["waiting"] == 4
+        llm.release(busy)
+        await asyncio.gather(*calls)
+
+    asyncio.run(main())
+    assert admitted == ["acme1", "globex1", "acme2", "acme3"]
+
+
+def test_full_queues_reject_new_calls():
+    llm = scheduler(max_queue_per_tenant=1, max_queue_total=2)
+
+    async def main() -> None:
+        busy = llm.acquire("acme", 10)
+        waiting = [asyncio.create_task(llm.acquire_async("acme", 10))]
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloaded):
+            await llm.acquire_async("acme", 10)
+
+        # Another tenant still has room until the global queue is full
+        waiting.append(asyncio.create_task(llm.acquire_async("globex", 10)))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloaded):
+            await llm.acquire_async("initech", 10)
+
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        llm.release(busy)
+
+    asyncio.run(main())
+    assert llm.stats()["waiting"] == 0
+    assert llm.has_spare_capacity()
+
+
+def test_calls_wait_for_the_token_budget():
+    llm = scheduler(max_concurrency=5, tokens_per_minute=60)
+    first = llm.acquire("acme", 60)
+    llm.release(first, actual_tokens=60)
+
+    async def main() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm.acquire_async("acme", 30), 0.2)
+
+    asyncio.run(main())
+    # The cancelled waiter left the queue
+    assert llm.stats()["waiting"] == 0
@@ -0,0 +1,34 @@
+"""
+Smoke test of the load-test harness: concurrent sessions must all complete.
+"""
+
+import json
+import socket
+
+from loadtest import harness
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def test_two_concurrent_sessions_complete(tmp_path):
+    results = tmp_path / "stages.json"
+    code = harness.main(
+        [
+            "--sessions", "2",
+            "--turns", "2",
+            "--first-token", "0.05",
+            "--token-delay", "0",
+            "--port", str(free_port()),
+            "--timeout", "60",
+            "--json", str(results),
+        ]
+    )
+    assert code == 0
+    [stage] = json.loads(results.read_text())
+    assert stage["errors"] == 0
+    assert stage["turns"] == 4
+    assert stage["wall_s"] < 60
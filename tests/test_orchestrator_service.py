@@ -0,0 +1,108 @@
+"""
+Tests for cross-report orchestration: exact joins of the sub-answers' tables
+and the merged answer.
+"""
+
+import logging
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from services import orchestrator_service, result_store
+from services import report_schema as rs
+from services.llm_scheduler import current_tenant, scheduling_context
+from services.orchestrator_service import OrchestratorService, SubQuery
+from services.result_store import TableResult
+
+
+SOD_AGENT = "SAP SOD Risk Report Agent"
+USER_AGENT = "SAP User Report Agent"
+
+
+class FakeLLM:
+    """Streams a fixed merged answer and records the merge prompt."""
+
+    def __init__(self, prompts):
+        self.prompts = prompts
+
+    def stream(self, messages):
+        self.prompts.append(messages[-1].content)
+        yield SimpleNamespace(content="Merged.")
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """Orchestrator whose sub-queries display prepared tables, on a fresh result store."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(result_store, "_store", result_store.ResultStore(directory=str(tmp_path)))
+    prompts = []
+    monkeypatch.setattr(orchestrator_service, "create_llm", lambda **_: FakeLLM(prompts))
+    answers = {}
+    tenants = set()
+
+    def run_sub_query(agent, question):
+        tenants.add(current_tenant())
+        text, frames = answers[agent]
+        tables = [
+            TableResult(result_store.get_result_store().put(frame, persist=True), "", len(frame), len(frame.columns))
+            for frame in frames
+        ]
+        return text, tables
+
+    service = OrchestratorService(run_sub_query)
+    service.answers, service.prompts, service.tenants = answers, prompts, tenants
+    return service
+
+
+AGENT = SimpleNamespace(
+    name="Cross-Report Agent",
+    report_agent=lambda name: name,
+    get_system_prompt=lambda: "Merge the report answers.",
+)
+PLAN = [SubQuery(agent=SOD_AGENT, question="Who executed risks?"), SubQuery(agent=USER_AGENT, question="Who is locked?")]
+
+
+def answer(orchestrator, monkeypatch):
+    monkeypatch.setattr(orchestrator, "plan", lambda *_: PLAN)
+    with scheduling_context("acme"):
+        return list(orchestrator.stream_response(AGENT, [{"role": "user", "content": "Locked users with risks?"}]))
+
+
+def test_sub_query_tables_are_joined_exactly(orchestrator, monkeypatch):
+    risks = pd.DataFrame({rs.SOD_USER_ID: ["U1", "U2", "U3"], rs.SOD_RISK_ID: ["R1", "R2", "R3"]})
+    locked = pd.DataFrame({rs.USER_ID: ["U2", "U3", "U4"], rs.USER_LOCKED: ["X", "X", "X"]})
+    orchestrator.answers.update({SOD_AGENT: ("Three users.", [risks]), USER_AGENT: ("Three locked.", [locked])})
+
+    chunks = answer(orchestrator, monkeypatch)
+    assert chunks[0] == "Merged."
+    joined = chunks[-1]
+    assert isinstance(joined, TableResult) and joined.rows == 2
+    frame = result_store.get_result_store().get(joined.handle, "acme")
+    assert frame[rs.SOD_USER_ID].tolist() == ["U2", "U3"]
+    assert list(frame.columns) == [rs.SOD_USER_ID, rs.SOD_RISK_ID, rs.USER_LOCKED]
+    assert "joined exactly on User ID: 2 matching rows" in orchestrator.prompts[0]
+    # Both sub-queries ran for the caller's tenant
+    assert orchestrator.tenants == {"acme"}
+
+
+def test_answers_without_shared_keys_are_merged_from_text(orchestrator, monkeypatch):
+    orchestrator.answers.update(
+        {SOD_AGENT: ("Three users.", [pd.DataFrame({"Count": [3]})]), USER_AGENT: ("None locked.", [])}
+    )
+    chunks = answer(orchestrator, monkeypatch)
+    assert chunks[0] == "Merged."
+    assert len(chunks) == 2
+    assert "joined exactly" not in orchestrator.prompts[0]
+    assert "Answer: Three users." in orchestrator.prompts[0]
+
+
+def test_errors_are_logged_not_rendered(orchestrator, monkeypatch, caplog):
+    def fail(*_):
+        raise RuntimeError("planner down")
+
+    monkeypatch.setattr(orchestrator, "plan", fail)
+    with caplog.at_level(logging.ERROR, logger="auditbot.orchestrator"):
+        chunks = list(orchestrator.stream_response(AGENT, [{"role": "user", "content": "?"}]))
+    assert chunks == ["I encountered an error while processing your request. Please try again."]
+    assert "planner down" in caplog.text
@@ -0,0 +1,27 @@
+"""
+Tests for the governed Python tool of the pandas agent.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+from langchain_experimental.tools.python.tool import PythonAstREPLTool
+
+from services import result_store
+from services.llm_scheduler import scheduling_context
+from services.output_governor import govern_python_tool
+from services.result_store import ResultStore
+
+
+def test_generated_code_only_reads_results_of_its_tenant(tmp_path, monkeypatch):
+    store = ResultStore(directory=str(tmp_path))
+    monkeypatch.setattr(result_store, "_store", store)
+    theirs = store.put(pd.DataFrame({"user": ["U1"]}), persist=True, owner="globex")
+    ours = store.put(pd.DataFrame({"user": ["U2"]}), persist=True, owner="acme")
+
+    executor = SimpleNamespace(tools=[PythonAstREPLTool()])
+    with scheduling_context("acme"):
+        tool = govern_python_tool(executor)
+    get_result = tool.locals["get_result"]
+    assert get_result(theirs) is None
+    assert get_result(ours)["user"].tolist() == ["U2"]
@@ -0,0 +1,45 @@
+"""
+Tests for the prefetcher's memory of failed questions.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services.answer_cache import AnswerCache
+from services.prefetcher import Prefetcher
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = Prefetcher(AnswerCache(max_entries=2))
+    yield prefetcher
+    prefetcher._pool.shutdown(wait=True)
+
+
+def key(question: str, version: str = "v1"):
+    return "SAP User Report Agent", version, "", question
+
+
+def test_failed_questions_are_not_retried(prefetcher, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(prefetcher._pool, "submit", lambda *args: submitted.append(args))
+    monkeypatch.setattr(prefetcher.cache, "key", lambda agent, previous, question: key(question))
+    agent = SimpleNamespace(name="SAP User Report Agent")
+
+    prefetcher._fail(key("q1"))
+    prefetcher._submit(agent, [], "q1")
+    prefetcher._submit(agent, [], "q2")
+    assert [args[4] for args in submitted] == [key("q2")]
+
+
+def test_failures_are_bounded_like_the_answer_cache(prefetcher):
+    for question in ("q1", "q2", "q3"):
+        prefetcher._fail(key(question))
+    assert list(prefetcher._failed) == [key("q2"), key("q3")]
+
+
+def test_failures_are_forgotten_when_the_reports_change(prefetcher):
+    prefetcher._fail(key("q1"))
+    prefetcher._fail(key("q2", version="v2"))
+    assert list(prefetcher._failed) == [key("q2", version="v2")]
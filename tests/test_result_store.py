@@ -0,0 +1,80 @@
+"""
+Tests for the result store's ownership checks and disk pruning.
+"""
+
+import os
+import time
+
+import pandas as pd
+
+from config.settings import Settings
+from services.result_store import ResultStore
+
+
+def frame(rows: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"user": [f"U{i}" for i in range(rows)], "risks": range(rows)})
+
+
+def parquet_files(directory):
+    return [
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(".parquet")
+    ]
+
+
+def test_handles_are_unguessable(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    handles = {store.put(frame(), owner="acme") for _ in range(3)}
+    assert len(handles) == 3
+    assert all(len(handle) == len("res_") + 32 for handle in handles)
+
+
+def test_results_are_only_readable_by_their_owner(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    handle = store.put(frame(), persist=True, owner="acme")
+    assert store.get(handle, tenant="acme") is not None
+    assert store.get(handle, tenant="globex") is None
+
+    # The check also applies once the result is reloaded from disk
+    reloaded = ResultStore(directory=str(tmp_path))
+    assert reloaded.get(handle, tenant="globex") is None
+    assert len(reloaded.get(handle, tenant="acme")) == 100
+
+
+def test_prefetched_results_are_shared(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    handle = store.put(frame(), persist=True, owner=Settings.PREFETCH_TENANT)
+    assert store.get(handle, tenant="acme") is not None
+    assert ResultStore(directory=str(tmp_path)).get(handle, tenant="globex") is not None
+
+
+def test_oldest_results_are_deleted_beyond_the_disk_limit(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    first = store.put(frame(), persist=True, owner="acme")
+    size = os.path.getsize(parquet_files(str(tmp_path))[0])
+    store.max_disk_bytes = int(size * 2.5)
+    os.utime(parquet_files(str(tmp_path))[0], (time.time() - 60, time.time() - 60))
+    second = store.put(frame(), persist=True, owner="acme")
+    third = store.put(frame(), persist=True, owner="acme")
+
+    assert len(parquet_files(str(tmp_path))) == 2
+    store = ResultStore(directory=str(tmp_path), max_disk_bytes=store.max_disk_bytes)
+    assert store.get(first, "acme") is None
+    assert store.get(second, "acme") is not None
+    assert store.get(third, "acme") is not None
+
+
+def test_results_older_than_the_age_limit_are_deleted(tmp_path):
+    store = ResultStore(directory=str(tmp_path))
+    old = store.put(frame(), persist=True, owner="acme")
+    recent = store.put(frame(), persist=True, owner="acme")
+    for path in parquet_files(str(tmp_path)):
+        if old in path:
+            os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    assert store.prune() == 0
+    store.max_age_seconds = 3600
+    assert store.prune() == 1
+    assert [os.path.basename(path) for path in parquet_files(str(tmp_path))] == [f"{recent}.parquet"]
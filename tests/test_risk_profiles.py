@@ -0,0 +1,66 @@
+"""
+Tests for the user x risk matrix: similarity, peer groups and outliers.
+"""
+
+import pandas as pd
+
+from services import report_schema as rs
+from services.risk_profiles import RiskProfileMatrix
+
+
+def sod(holdings: dict) -> pd.DataFrame:
+    """SOD rows for {user: [risk ids]}; every risk high level and not executed."""
+    rows = [(user, risk) for user, risks in holdings.items() for risk in risks]
+    return pd.DataFrame(
+        {
+            rs.SOD_USER_ID: [user for user, _ in rows],
+            rs.SOD_RISK_ID: [risk for _, risk in rows],
+            rs.SOD_RISK_NAME: [f"Risk {risk}" for _, risk in rows],
+            rs.SOD_RISK_LEVEL: rs.RISK_LEVEL_HIGH,
+            rs.SOD_RISK_EXEC: rs.RISK_NOT_EXECUTED,
+        }
+    )
+
+
+def test_similar_users_share_weighted_risks():
+    frame = sod({"A": ["R1", "R2"], "B": ["R1", "R2"], "C": ["R1", "R3"], "D": ["R9"]})
+    # C's R3 is executed, so it outweighs the R1 it shares with A
+    frame.loc[(frame[rs.SOD_USER_ID] == "C") & (frame[rs.SOD_RISK_ID] == "R3"), rs.SOD_RISK_EXEC] = rs.RISK_EXECUTED
+    profiles = RiskProfileMatrix(frame)
+
+    similar = profiles.similar("a", top_n=5)
+    assert list(similar.index) == ["B", "C"]
+    assert similar.loc["B", "similarity"] == 1.0
+    assert similar.loc["C", "similarity"] == round(1 / (2**0.5 * 5**0.5), 3)
+    assert similar.loc["C", "shared_risks"] == 1
+    assert profiles.similar("nobody") is None
+    assert profiles.common_risks(["A", "B", "C"], top_n=1)[rs.SOD_RISK_ID].tolist() == ["R1"]
+
+
+def test_peer_groups_do_not_chain():
+    # Each user shares four of five risks with the next, so neighbours are
+    # 0.8 similar, but the ends of the chain have nothing in common
+    risks = [f"R{i}" for i in range(14)]
+    chain = {f"U{i}": risks[i : i + 5] for i in range(10)}
+    profiles = RiskProfileMatrix(sod(chain), neighbours=3, peer_min_similarity=0.6)
+
+    sizes = profiles.outliers["peer_group_size"]
+    assert sizes.max() < len(chain)
+    for user in chain:
+        peers = profiles.peers(user)
+        assert user in peers.index
+        # Every member is close enough to every other member, not just to a neighbour
+        for member in peers.index:
+            assert profiles.peers(member)["similarity"].min() >= 0.6 - 1e-6
+
+
+def test_identical_profiles_form_one_group():
+    holdings = {f"U{i}": ["R1", "R2", "R3"] for i in range(6)}
+    holdings.update({"V1": ["R7", "R8"], "V2": ["R7", "R8"], "W": ["R1", "R9"]})
+    profiles = RiskProfileMatrix(sod(holdings), neighbours=3)
+
+    assert sorted(profiles.peers("U0").index) == [f"U{i}" for i in range(6)]
+    assert profiles.peer_group[profiles.position("U0")] == 1
+    assert sorted(profiles.peers("V1").index) == ["V1", "V2"]
+    assert list(profiles.peers("W").index) == ["W"]
+    assert profiles.outliers.loc["U0", "outlier_score"] == 0.0
@@ -0,0 +1,63 @@
+"""
+Tests for the composite per-user risk score.
+"""
+
+import pandas as pd
+
+from services import report_schema as rs
+from services.risk_scoring import RiskScoringEngine
+
+
+SOD = pd.DataFrame(
+    {
+        rs.SOD_USER_ID: ["U1", "U1", "U3", "U3"],
+        rs.SOD_RISK_LEVEL: ["H", "M", "H", "M"],
+        rs.SOD_RISK_EXEC: [rs.RISK_EXECUTED, rs.RISK_NOT_EXECUTED, rs.RISK_NOT_EXECUTED, rs.RISK_NOT_EXECUTED],
+        rs.SOD_RISK_TYPE: [rs.RISK_TYPE_SOD, rs.RISK_TYPE_SOD, rs.RISK_TYPE_SENSITIVE_TCODE, rs.RISK_TYPE_SOD],
+    }
+)
+USERS = pd.DataFrame(
+    {
+        rs.USER_ID: ["U1", "U2"],
+        rs.USER_FIRST_NAME: ["Ada", "Bob"],
+        rs.USER_LAST_NAME: ["Lovelace", None],
+        rs.USER_TYPE: [rs.USER_TYPE_DIALOG, "SYSTEM USER"],
+        rs.USER_LOCKED: ["", rs.FLAG_SET],
+        rs.USER_EXPIRED: ["", ""],
+        rs.USER_ROLE_COUNT: ["4", "2"],
+        rs.USER_LAST_LOGON: ["2024-06-30", "2023-01-01"],
+    }
+)
+
+
+def test_components_cover_users_of_either_report():
+    scores = RiskScoringEngine().score(SOD, USERS)
+    assert sorted(scores.index) == ["U1", "U2", "U3"]
+    u1, u3 = scores.loc["U1"], scores.loc["U3"]
+    assert (u1["high_risks"], u1["medium_risks"], u1["executed_risks"]) == (1, 1, 1)
+    assert u1["name"] == "Ada Lovelace" and u1["dialog_user"] and u1["recent_logon"]
+    assert u3["sensitive_tcode_risks"] == 1 and u3["role_count"] == 0 and not u3["locked"]
+    assert scores.loc["U2", "name"] == "Bob"
+
+
+def test_scores_follow_the_weights():
+    scores = RiskScoringEngine({"high_risks": 1.0, "locked": -1.0}).score(SOD, USERS)
+    # Best attainable maps to 100, worst to 0
+    assert scores["score"].to_dict() == {"U1": 100.0, "U3": 100.0, "U2": 0.0}
+    # Ties are broken by executed risks
+    assert scores["rank"].to_dict() == {"U1": 1, "U3": 2, "U2": 3}
+
+    scores = RiskScoringEngine({"role_count": 2.0, "medium_risks": 2.0}).score(SOD, USERS)
+    assert scores["score"].to_dict() == {"U1": 100.0, "U3": 50.0, "U2": 25.0}
+
+
+def test_default_weights_rank_executed_risks_first():
+    scores = RiskScoringEngine().score(SOD, USERS)
+    assert list(scores.index) == ["U1", "U3", "U2"]
+
+
+def test_queries_filter_the_ranking():
+    scores = RiskScoringEngine().score(SOD, USERS)
+    assert list(RiskScoringEngine.query(scores, top_n=2).index) == ["U1", "U3"]
+    assert list(RiskScoringEngine.query(scores, user_type="system user").index) == ["U2"]
+    assert "U2" not in RiskScoringEngine.query(scores, exclude_locked=True).index
@@ -0,0 +1,57 @@
+"""
+Tests for the sorted date indexes over the User Report.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import report_schema as rs
+from services.temporal_index import UserTimeline, to_day
+
+
+def timeline() -> UserTimeline:
+    users = pd.DataFrame(
+        {
+            rs.USER_ID: ["U1", "U2", "U3", "U4", "U5"],
+            rs.USER_LAST_LOGON: ["2024-06-30", "2024-01-15", None, "2023-11-01", "not a date"],
+            rs.USER_CREATED_ON: ["2020-01-01", "2023-03-10", "2023-03-31", "2024-02-01", "2019-12-31"],
+            rs.USER_VALID_FROM: ["2020-01-01"] * 5,
+            rs.USER_VALID_TO: ["31.12.9999", "2024-09-30", "", "2024-07-15", "2025-01-01"],
+        }
+    )
+    return UserTimeline(users)
+
+
+def ids(users: UserTimeline, positions: np.ndarray) -> list:
+    return users.rows(positions)[rs.USER_ID].tolist()
+
+
+def test_dormancy_is_measured_against_the_report_snapshot():
+    users = timeline()
+    assert users.snapshot == np.datetime64("2024-06-30")
+    # Longest dormant first, then users who never logged on; unparseable dates match nothing
+    assert ids(users, users.dormant(90)) == ["U4", "U2", "U3"]
+    assert ids(users, users.dormant(90, include_never_logged_on=False)) == ["U4", "U2"]
+    assert ids(users, users.dormant(30, as_of=to_day("2024-01-01"))) == ["U4", "U3"]
+
+
+def test_range_bounds_are_inclusive_and_optional():
+    users = timeline()
+    assert ids(users, users.created_between(to_day("2023-03-10"), to_day("2023-03-31"))) == ["U2", "U3"]
+    assert ids(users, users.created_between(None, to_day("2020-01-01"))) == ["U5", "U1"]
+    assert ids(users, users.created_between(to_day("2024-01-01"), None)) == ["U4"]
+
+
+def test_open_ended_validity_is_not_an_expiry():
+    users = timeline()
+    assert ids(users, users.expiring_between(to_day("2024-07-01"), None)) == ["U4", "U2", "U5"]
+    assert ids(users, users.expiring_between(None, to_day("2024-12-31"))) == ["U4", "U2"]
+    assert sorted(ids(users, users.never_expiring())) == ["U1", "U3"]
+
+
+def test_dates_from_the_llm_are_validated():
+    assert to_day("") is None
+    assert to_day("2024-02-29") == np.datetime64("2024-02-29")
+    with pytest.raises(ValueError):
+        to_day("last spring")
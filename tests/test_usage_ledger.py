@@ -0,0 +1,37 @@
+"""
+Tests for the usage ledger's budget checks across processes sharing one database.
+"""
+
+import pytest
+
+from config.settings import Settings
+from services.usage_ledger import BUDGET_EXHAUSTED, BUDGET_OK, UsageLedger
+
+
+# 1M output tokens of the default model cost 0.60 USD
+CALL = {"input_tokens": 0, "output_tokens": 1_000_000}
+
+
+@pytest.fixture
+def replicas(tmp_path, monkeypatch):
+    """Two ledgers on the same database, as two server processes would open it."""
+    monkeypatch.setattr(Settings, "TENANT_BUDGETS_USD", {"acme": 1.0})
+    path = str(tmp_path / "usage.db")
+    return UsageLedger(path), UsageLedger(path)
+
+
+def test_spend_recorded_by_another_process_counts(replicas):
+    first, second = replicas
+    assert first.spend_today("acme") == 0.0
+    second.record("acme", "stream", Settings.OPENAI_MODEL, CALL, 1.0)
+    assert first.spend_today("acme") == pytest.approx(0.60)
+
+
+def test_budget_state_sums_every_process(replicas):
+    first, second = replicas
+    first.record("acme", "stream", Settings.OPENAI_MODEL, CALL, 1.0)
+    assert second.budget_state("acme") == BUDGET_OK
+    second.record("acme", "stream", Settings.OPENAI_MODEL, CALL, 1.0)
+    assert first.budget_state("acme") == BUDGET_EXHAUSTED
+    assert second.budget_state("acme") == BUDGET_EXHAUSTED
+    assert first.budget_state("globex") == BUDGET_OK
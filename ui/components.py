@@ -3,9 +3,41 @@ Reusable UI components for the Audit Bot AI application.
 """
 
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+from agents.agent_spec import AgentSpec
 from agents.base_agent import BaseAgent
 from config.settings import Settings
+from services.dataset_registry import REPORT_LABELS, get_dataset_registry
+from services.ingestion import DONE, FAILED, get_ingestion_service
+from services.result_store import TableResult, get_result_store, iter_csv, to_parquet_bytes
+from services.usage_ledger import BUDGET_DEGRADED, BUDGET_EXHAUSTED
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _export_bytes(handle: str, fmt: str, tenant: str) -> bytes:
+    """Encode a stored table once per handle and format, not on every rerun."""
+    frame = get_result_store().get(handle, tenant)
+    if fmt == "parquet":
+        return to_parquet_bytes(frame)
+    return b"".join(iter_csv(frame))
+
+
+def _render_ingestion_jobs(job_ids: List[str], active: List[str]) -> None:
+    """
+    Show the progress of this session's uploads. Runs as a polling fragment
+    while `active` jobs are ingesting and reruns the app once they finish, so
+    the agents pick up the new datasets.
+    """
+    service = get_ingestion_service()
+    for job in filter(None, (service.job(job_id) for job_id in job_ids)):
+        if job.state == FAILED:
+            st.error(f"{job.filename}: {job.message}", icon="⚠️")
+        elif job.state == DONE:
+            st.success(job.message, icon="✅")
+        else:
+            st.progress(job.progress, text=f"{job.filename}: {job.message}")
+    if any(service.job(job_id) is None or service.job(job_id).finished for job_id in active):
+        st.rerun()
 
 
 class UIComponents:
@@ -25,15 +57,17 @@ class UIComponents:
 
     @staticmethod
     def render_sidebar(
-        agents: Dict[str, BaseAgent],
+        agents: Dict[str, AgentSpec],
         current_agent_name: str,
+        usage: Optional[Dict[str, Any]] = None,
     ) -> Optional[str]:
         """
         Render the sidebar with agent selection and suggested messages.
 
         Args:
-            agents: Dictionary mapping agent names to agent instances
+            agents: Dictionary mapping agent names to agent specs
             current_agent_name: Name of the currently selected agent
+            usage: Today's LLM usage of the tenant (see UsageLedger.tenant_usage)
 
         Returns:
             Selected suggestion message if any button was clicked, None otherwise
@@ -53,9 +87,9 @@ class UIComponents:
             )
 
             # Handle agent change
+            # Each agent keeps its own persisted conversation
             if selected_agent_name != current_agent_name:
                 st.session_state.selected_agent = selected_agent_name
-                st.session_state.messages = []
                 st.rerun()
 
             st.markdown("---")
@@ -72,17 +106,141 @@ class UIComponents:
                 ):
                     selected_suggestion = suggestion
 
+            st.markdown("---")
+            UIComponents.render_report_upload()
+
+            if usage:
+                st.markdown("---")
+                UIComponents.render_usage(usage)
+
             st.markdown("---")
             st.caption(f"Powered by [{Settings.BRAND_NAME}]({Settings.BRAND_URL})")
 
         return selected_suggestion
 
     @staticmethod
-    def render_chat_history(messages: List[Dict[str, str]]) -> None:
-        """Render the chat message history."""
+    def render_report_upload() -> None:
+        """Upload a report for background ingestion and show the datasets in use."""
+        st.markdown("### 📤 Reports")
+        for report_type, entry in get_dataset_registry().entries().items():
+            st.caption(f"{REPORT_LABELS[report_type]}: {entry['source']} ({entry['registered_at']})")
+
+        upload = st.file_uploader(
+            "Add an SOD risk, user list or license summary report",
+            type=Settings.UPLOAD_EXTENSIONS,
+            key="report_upload",
+        )
+        job_ids = st.session_state.setdefault("ingestion_jobs", [])
+        # The uploader keeps its file across reruns; submit each upload once
+        if upload is not None and upload.file_id not in st.session_state.get("ingested_uploads", set()):
+            st.session_state.setdefault("ingested_uploads", set()).add(upload.file_id)
+            job_ids.append(get_ingestion_service().submit(upload.name, upload.getvalue()).job_id)
+
+        service = get_ingestion_service()
+        active = [
+            job_id for job_id in job_ids
+            if service.job(job_id) is not None and not service.job(job_id).finished
+        ]
+        if active:
+            st.fragment(_render_ingestion_jobs, run_every=Settings.INGESTION_POLL_SECONDS)(
+                job_ids, active
+            )
+        else:
+            _render_ingestion_jobs(job_ids, active)
+
+    @staticmethod
+    def render_usage(usage: Dict[str, Any]) -> None:
+        """Show today's token usage and cost against the daily budget."""
+        st.markdown("### 📈 Usage Today")
+        budget = usage["budget"]
+        if budget > 0:
+            st.progress(
+                min(usage["cost"] / budget, 1.0),
+                text=f"${usage['cost']:,.2f} of ${budget:,.2f}",
+            )
+        st.caption(f"{usage['tokens']:,} tokens in {usage['calls']:,} LLM calls")
+        if usage["state"] == BUDGET_DEGRADED:
+            st.caption("Close to budget: using a lighter model.")
+        elif usage["state"] == BUDGET_EXHAUSTED:
+            st.caption("Budget reached: only earlier answers are available.")
+
+    @staticmethod
+    def render_chat_history(
+        messages: List[Dict[str, Any]], tenant: str, has_older: bool = False
+    ) -> bool:
+        """
+        Render the chat message history.
+
+        Args:
+            messages: Messages in the active conversation window
+            tenant: Tenant of the session; only its tables are shown
+            has_older: Whether earlier messages can be loaded from the store
+
+        Returns:
+            True if the user asked to load earlier messages
+        """
+        load_older = False
+        if has_older:
+            load_older = st.button(
+                "⬆️ Load earlier messages",
+                key="load_older_messages",
+                use_container_width=True,
+            )
+
         for message in messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                UIComponents.render_tables(
+                    [TableResult.from_dict(table) for table in message.get("tables", [])], tenant
+                )
+
+        return load_older
+
+    @staticmethod
+    def render_tables(tables: List[TableResult], tenant: str) -> None:
+        """
+        Render result tables natively with CSV and Parquet downloads.
+
+        Args:
+            tables: Tables displayed by the agent's tools
+            tenant: Tenant of the session; tables of other tenants are not shown
+        """
+        for table in tables:
+            frame = get_result_store().get(table.handle, tenant)
+            if frame is None:
+                st.caption(f"📋 {table.title or 'Table'} is no longer available.")
+                continue
+            if table.title:
+                st.caption(f"📋 {table.title} ({table.rows:,} rows)")
+            st.dataframe(frame, use_container_width=True)
+
+            name = (table.title or table.handle).replace(" ", "_").lower()
+            if table.rows > Settings.TABLE_INLINE_EXPORT_MAX_ROWS:
+                # Too large to build in the browser session: stream it from the API server
+                if Settings.API_PUBLIC_URL:
+                    base = f"{Settings.API_PUBLIC_URL.rstrip('/')}/results/{table.handle}"
+                    csv_column, parquet_column = st.columns(2)
+                    csv_column.link_button("⬇️ CSV", f"{base}.csv", use_container_width=True)
+                    parquet_column.link_button("⬇️ Parquet", f"{base}.parquet", use_container_width=True)
+                continue
+
+            csv_column, parquet_column = st.columns(2)
+            csv_column.download_button(
+                "⬇️ CSV",
+                data=_export_bytes(table.handle, "csv", tenant),
+                file_name=f"{name}.csv",
+                mime="text/csv",
+                key=f"csv_{table.handle}",
+                use_container_width=True,
+            )
+            parquet_column.download_button(
+                "⬇️ Parquet",
+                data=_export_bytes(table.handle, "parquet", tenant),
+                file_name=f"{name}.parquet",
+                mime="application/vnd.apache.parquet",
+                key=f"parquet_{table.handle}",
+                use_container_width=True,
+            )
 
     @staticmethod
     def render_chat_input(placeholder: str) -> Optional[str]:
@@ -94,6 +252,16 @@ class UIComponents:
         """Show a thinking indicator in the given placeholder."""
         placeholder.markdown("_Thinking..._")
 
+    @staticmethod
+    def render_queue_position(placeholder, position: int) -> None:
+        """Show the queue position while waiting for LLM capacity."""
+        if position > 0:
+            placeholder.markdown(
+                f"_⏳ High demand - your request is #{position} in the queue..._"
+            )
+        else:
+            UIComponents.render_thinking_indicator(placeholder)
+
     @staticmethod
     def render_streaming_response(
         placeholder, content: str, is_complete: bool = False